@@ -0,0 +1 @@
+"""性能基准脚本，使用合成屏幕运行，不需要真实显示器。"""
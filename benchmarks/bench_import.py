@@ -0,0 +1,67 @@
+"""导入耗时与导入副作用检查。
+
+在全新的子进程中分别导入各模块，记录耗时以及是否拉起了重量级依赖，
+并在空的临时工作目录中运行，确认导入不会创建任何文件。超出预算时以非零状态退出。
+
+用法：
+    python -m benchmarks.bench_import --budget-ms 50
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 这些模块的导入应当是轻量的
+LIGHT_MODULES = ["src.cli", "src.generate_color", "src.data", "src.auto_paint", "src.gui"]
+HEAVY = ["cv2", "numpy", "PIL", "pyautogui", "keyboard", "tkinter", "rapidfuzz"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module, repeat):
+    """返回 (最短耗时 ms, 被导入的重量级模块, 导入后工作目录中新出现的文件)。"""
+    best, heavy, created = None, [], []
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as cwd:
+            out = subprocess.run(
+                [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY)],
+                cwd=cwd, env=env, capture_output=True, text=True, check=True,
+            )
+            created = sorted(os.listdir(cwd))
+        data = json.loads(out.stdout.strip().splitlines()[-1])
+        heavy = data["heavy"]
+        best = data["ms"] if best is None else min(best, data["ms"])
+    return best, heavy, created
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=50.0, help="每个模块的导入耗时预算")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    results, ok = [], True
+    for module in LIGHT_MODULES:
+        ms, heavy, created = measure(module, args.repeat)
+        passed = ms <= args.budget_ms and not heavy and not created
+        ok &= passed
+        results.append({"module": module, "ms": round(ms, 2), "heavy_imports": heavy,
+                        "created_files": created, "passed": passed})
+
+    print(json.dumps({"budget_ms": args.budget_ms, "results": results}, indent=2, ensure_ascii=False))
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
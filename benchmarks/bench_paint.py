@@ -0,0 +1,203 @@
+"""匹配、选择与完整绘制循环的合成屏幕基准。
+
+三组测量，均不需要显示器与真实鼠标：
+- match: 各检测引擎对一帧的 AutoPainter._get_matches 耗时与召回率
+- select: 模板匹配结果的非极大值抑制（peaks_from_result）与各点击顺序的 plan_order 耗时
+- loop: FakeCapture + RecordingInput 跑完整的 AutoPainter.run，直到所有目标都被点中（或超时），
+  点击时把对应格子涂成背景色以模拟绘制效果；clicks 与 hits 之差即误点次数
+
+结果以 JSON 输出；--compare 指定以前的结果文件时，任一指标变差超过 --tolerance 即以非零状态退出。
+
+用法：
+    python -m benchmarks.bench_paint --width 1920 --height 1080 --density 0.05 --json-out base.json
+    python -m benchmarks.bench_paint --compare base.json --tolerance 0.3
+"""
+import argparse
+import contextlib
+import io
+import json
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from benchmarks.synthetic import make_screen, make_template, paint_cell
+from src.auto_paint.auto_painter import AutoPainter
+from src.auto_paint.capture import FakeCapture
+from src.auto_paint.input import RecordingInput
+from src.auto_paint.matches import peaks_from_result
+from src.auto_paint.ordering import ORDERS, plan_order
+
+# 越小越好 / 越大越好的指标，用于 --compare
+LOWER_IS_BETTER = ("ms", "seconds")
+# 小于该绝对差（毫秒 / 秒）的变化视为计时噪声
+MIN_DELTA = {"ms": 0.1, "seconds": 0.01}
+HIGHER_IS_BETTER = ("fps", "clicks_per_second", "recall", "precision")
+
+
+class _BenchPainter(AutoPainter):
+    """直接使用内存中的模板，不读模板文件。"""
+
+    def __init__(self, template, **kwargs):
+        super().__init__(use_gui=False, **kwargs)
+        self._template = template
+
+    def _load_target_image(self, path):
+        return self._template
+
+
+def _timed(fn, repeat):
+    """返回 (repeat 次中最短的耗时 ms, 最后一次的结果)；取最短值以减少调度噪声。"""
+    result = fn()  # 预热
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000, result
+
+
+def _hit_rate(points, reference, tolerance=0):
+    """points 中有多少比例在 reference 某点的 tolerance 像素（每个方向）以内。"""
+    if not len(points):
+        return 1.0
+    ref = set(map(tuple, reference.tolist()))
+    near = [(dx, dy) for dx in range(-tolerance, tolerance + 1) for dy in range(-tolerance, tolerance + 1)]
+    hits = sum(any((x + dx, y + dy) in ref for dx, dy in near) for x, y in points.tolist())
+    return hits / len(points)
+
+
+def bench_match(frame, template, expected, engines, repeat):
+    rows = []
+    for engine in engines:
+        painter = _BenchPainter(template, engine=engine)
+        ms, found = _timed(lambda: painter._get_matches(frame, template), repeat)
+        points = np.stack([found["x"], found["y"]], axis=1)
+        rows.append({"name": engine, "ms": round(ms, 3), "found": len(found), "expected": len(expected),
+                     "recall": round(_hit_rate(expected, points), 4),
+                     "precision": round(_hit_rate(points, expected), 4)})
+    return rows
+
+
+def bench_select(frame, template, repeat, batch):
+    rows = []
+    result = cv2.matchTemplate(frame, template, cv2.TM_CCOEFF_NORMED)
+    ms, matches = _timed(lambda: peaks_from_result(result, 0.8, template.shape[:2]), repeat)
+    rows.append({"name": "nms", "ms": round(ms, 3), "matches": len(matches)})
+    last = (int(matches["x"][len(matches) // 2]), int(matches["y"][len(matches) // 2])) if len(matches) else None
+    for order in ORDERS:
+        ms, _ = _timed(lambda: plan_order(matches, last, batch, order, template.shape[0]), repeat)
+        rows.append({"name": f"order-{order}-{batch}", "ms": round(ms, 3), "matches": len(matches)})
+    return rows
+
+
+def bench_loop(frame, template, expected, engines, batch, time_limit):
+    rows = []
+    for engine in engines:
+        screen = frame.copy()
+        color = template[template.shape[0] // 2, template.shape[1] // 2]
+        hits = [0]
+
+        def on_click(x, y):
+            # 点在仍未绘制的目标上才算命中
+            hits[0] += bool((screen[y, x] == color).all())
+            paint_cell(screen, x, y)
+
+        inp = RecordingInput(on_click=on_click)
+        painter = _BenchPainter(template, engine=engine, capture=FakeCapture([screen]), input_backend=inp,
+                                batch_size=batch, batch_verify=False, order="serpentine")
+        total = len(expected)
+        start = time.perf_counter()
+        deadline = time.monotonic() + time_limit
+        # 每次点击都会打印坐标，基准中丢弃这些输出
+        with contextlib.redirect_stdout(io.StringIO()):
+            painter.run(lambda: "synthetic", lambda: hits[0] < total and time.monotonic() < deadline)
+        seconds = time.perf_counter() - start
+        summary = painter.metrics.summary()
+        rows.append({
+            "name": engine,
+            "seconds": round(seconds, 3),
+            "clicks": inp.click_count,
+            "hits": hits[0],
+            "targets": total,
+            "fps": round(summary["frames"] / seconds, 2) if seconds else 0.0,
+            "clicks_per_second": round(inp.click_count / seconds, 2) if seconds else 0.0,
+            "stages_p50_ms": {k: round(v["p50_ms"], 3) for k, v in summary["stages"].items()},
+        })
+    return rows
+
+
+def compare(current, baseline, tolerance):
+    """返回变差超过 tolerance 的指标描述列表。"""
+    regressions = []
+    for section in ("match", "select", "loop"):
+        before = {row["name"]: row for row in baseline.get(section, [])}
+        for row in current.get(section, []):
+            old = before.get(row["name"])
+            if old is None:
+                continue
+            for key in LOWER_IS_BETTER:
+                if (key in row and key in old and row[key] > old[key] * (1 + tolerance)
+                        and row[key] - old[key] > MIN_DELTA[key]):
+                    regressions.append(f"{section}/{row['name']}/{key}: {old[key]} -> {row[key]}")
+            for key in HIGHER_IS_BETTER:
+                if key in row and key in old and row[key] < old[key] * (1 - tolerance):
+                    regressions.append(f"{section}/{row['name']}/{key}: {old[key]} -> {row[key]}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--density", type=float, default=0.05, help="成为目标的格子比例")
+    parser.add_argument("--noise", type=float, default=0.0, help="高斯噪声标准差")
+    parser.add_argument("--clutter", type=float, default=0.3, help="非目标格子中出现其他颜色色块的比例")
+    parser.add_argument("--background", help="背景色 r,g,b，默认 generate_color.BACKGROUND")
+    parser.add_argument("--color", default="black", help="目标颜色键")
+    parser.add_argument("--engines", default="template,grid,lattice")
+    parser.add_argument("--batch", type=int, default=16, help="loop 与 select 中每帧点击的目标数")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--loop-limit", type=float, default=60.0, help="每个 loop 基准最多运行的秒数")
+    parser.add_argument("--skip-loop", action="store_true")
+    parser.add_argument("--json-out", help="同时把结果写到该文件")
+    parser.add_argument("--compare", help="以前的结果文件，用于回归检查")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="允许的相对变差")
+    args = parser.parse_args(argv)
+
+    background = tuple(int(c) for c in args.background.split(",")) if args.background else None
+    engines = [e.strip() for e in args.engines.split(",") if e.strip()]
+    frame, targets = make_screen(args.width, args.height, args.density, (args.color,), background,
+                                 args.noise, args.clutter)
+    template = make_template(args.color, background)
+    expected = targets[args.color]
+
+    report = {
+        "config": {"width": args.width, "height": args.height, "density": args.density, "noise": args.noise,
+                   "clutter": args.clutter,
+                   "background": background, "color": args.color, "batch": args.batch, "targets": len(expected)},
+        "match": bench_match(frame, template, expected, engines, args.repeat),
+        "select": bench_select(frame, template, args.repeat, args.batch),
+    }
+    if not args.skip_loop:
+        report["loop"] = bench_loop(frame, template, expected, engines, args.batch, args.loop_limit)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print("性能回归:\n  " + "\n  ".join(regressions), file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
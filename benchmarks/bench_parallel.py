@@ -0,0 +1,60 @@
+"""多线程分带匹配随核心数的扩展性基准。
+
+用法：
+    python -m benchmarks.bench_parallel --width 3840 --height 2160 --repeat 3
+"""
+import argparse
+import json
+import os
+import time
+
+import cv2
+
+from benchmarks.synthetic import make_screen, make_template
+from src.auto_paint.matches import peaks_from_result
+from src.auto_paint.parallel import ParallelMatcher
+
+
+def template_match(frame, template, threshold):
+    result = cv2.matchTemplate(frame, template, cv2.TM_CCOEFF_NORMED)
+    return peaks_from_result(result, threshold, template.shape[:2])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--width", type=int, default=2560)
+    parser.add_argument("--height", type=int, default=1440)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    frame, _ = make_screen(args.width, args.height, density=0.25)
+    template = make_template()
+    expected = len(template_match(frame, template, 0.8))
+
+    results = []
+    baseline = None
+    workers = 1
+    while workers <= args.max_workers:
+        matcher = ParallelMatcher(template_match, workers=workers)
+        matcher.match(frame, template, 0.8)  # 预热线程池
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            found = matcher.match(frame, template, 0.8)
+        elapsed = (time.perf_counter() - start) / args.repeat
+        matcher.close()
+        baseline = baseline or elapsed
+        results.append({
+            "workers": workers,
+            "seconds": round(elapsed, 4),
+            "speedup": round(baseline / elapsed, 2),
+            "matches": len(found),
+            "correct": len(found) == expected,
+        })
+        workers *= 2
+
+    print(json.dumps({"width": args.width, "height": args.height, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""回放录制的绘制日志，离线测量检测引擎的耗时与准确率。
+
+日志由 `python -m src.cli --record session.wplog ...`（或 AutoPainter(recorder=FrameRecorder(...))）生成。
+每帧按日志中记录的模板送入指定配置的 AutoPainter._get_matches，不截图也不点击；
+agreement 为录制时的点击中，能在点击前最近一帧的回放匹配里找到（2 像素容差）的比例。
+
+用法：
+    python -m benchmarks.bench_replay session.wplog --engine grid
+    python -m benchmarks.bench_replay session.wplog --engine template --incremental --json-out replay.json
+"""
+import argparse
+import json
+import sys
+
+import numpy as np
+
+from src.auto_paint.auto_painter import AutoPainter
+from src.auto_paint.recording import CLICK, FRAME, FrameLogReader, replay_matches
+
+
+def _agreement(path, results, tolerance=2):
+    """录制时的点击在回放匹配中出现的比例；没有点击时返回 None。"""
+    # 每帧的匹配按帧时间排列，点击归属于时间不晚于它的最近一帧
+    times = np.array([meta["t"] for meta, _, _ in results])
+    clicks = [meta for kind, meta, _ in FrameLogReader(path) if kind == CLICK]
+    if not clicks or not len(times):
+        return None
+    hits = 0
+    for click in clicks:
+        i = int(np.searchsorted(times, click["t"], side="right")) - 1
+        if i < 0:
+            continue
+        found = results[i][1]
+        near = (np.abs(found["x"] - click["x"]) <= tolerance) & (np.abs(found["y"] - click["y"]) <= tolerance)
+        hits += bool(near.any())
+    return hits / len(clicks)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("log", help="FrameRecorder 写出的日志文件")
+    parser.add_argument("--engine", choices=AutoPainter.ENGINES, default="template")
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--incremental", action="store_true")
+    parser.add_argument("--pyramid-levels", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--json-out", help="同时把结果写到该文件")
+    args = parser.parse_args(argv)
+
+    painter = AutoPainter(threshold=args.threshold, engine=args.engine, incremental=args.incremental,
+                          pyramid_levels=args.pyramid_levels, workers=args.workers, use_gui=False)
+    results = replay_matches(args.log, painter)
+    frames = sum(1 for kind, _, _ in FrameLogReader(args.log) if kind == FRAME)
+    ms = np.array([seconds * 1000 for _, _, seconds in results]) if results else np.zeros(1)
+    report = {
+        "log": args.log,
+        "engine": args.engine,
+        "frames": frames,
+        "matched_frames": len(results),
+        "matches": int(sum(len(found) for _, found, _ in results)),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p90_ms": round(float(np.percentile(ms, 90)), 3),
+        "agreement": _agreement(args.log, results),
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            f.write(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""合成屏幕生成器。
+
+用 generate_color 的调色板与模板格式生成与 Blue Marble 覆盖层相同结构的屏幕：画布按 PIXEL_SIZE
+分格，被选为目标的格子中央为调色板颜色、四周为背景色，其余格子为背景色。可配置分辨率、目标密度、
+背景色、颜色种类与高斯噪声，并记录每个目标的位置，便于检查匹配结果是否正确。
+"""
+import numpy as np
+
+from src import generate_color
+
+__all__ = ["palette", "make_template", "make_screen", "paint_cell"]
+
+
+def palette(names=None):
+    """{颜色键: BGR}；names 为 None 时返回全部调色板颜色。"""
+    colors = {name: tuple(rgb[::-1]) for name, rgb in generate_color.palette_colors().items()}
+    if names is None:
+        return colors
+    return {name: colors[name] for name in names}
+
+
+def make_template(color="black", background=None, unit=generate_color.UNIT_SIZE):
+    """颜色键 color 的模板（BGR）。background 为 (r, g, b)，默认 generate_color.BACKGROUND。"""
+    bgr = palette([color])[color]
+    return generate_color.make_template(bgr[::-1], background, unit)
+
+
+def make_screen(width=1920, height=1080, density=0.05, colors=("black",), background=None,
+                noise=0.0, clutter=0.0, unit=generate_color.UNIT_SIZE, seed=0):
+    """生成一帧合成屏幕。
+
+    density: 成为目标的格子比例
+    colors: 目标颜色键，目标在其中均匀分配
+    background: (r, g, b)，默认 generate_color.BACKGROUND
+    noise: 高斯噪声标准差（像素值），0 表示无噪声
+    clutter: 非目标格子中，中央为其他调色板颜色（干扰色块）的比例
+    返回 (BGR 帧, {颜色键: (k, 2) 目标模板左上角 (x, y)})
+    """
+    rng = np.random.default_rng(seed)
+    background = generate_color.get_background() if background is None else background
+    size = unit * 3
+    rows, cols = height // size, width // size
+    screen = np.empty((height, width, 3), dtype=np.uint8)
+    screen[:] = background[::-1]
+
+    chosen = rng.random((rows, cols)) < density
+    ys, xs = np.nonzero(chosen)
+    which = rng.integers(0, len(colors), len(ys))
+    bgr = palette(colors)
+    targets = {}
+    for i, name in enumerate(colors):
+        sel = which == i
+        tops = ys[sel] * size
+        lefts = xs[sel] * size
+        for top, left in zip(tops.tolist(), lefts.tolist()):
+            screen[top + unit:top + 2 * unit, left + unit:left + 2 * unit] = bgr[name]
+        targets[name] = np.stack([lefts, tops], axis=1)
+
+    if clutter:
+        others = np.array([c for name, c in palette().items() if name not in bgr], dtype=np.uint8)
+        ys, xs = np.nonzero(~chosen & (rng.random((rows, cols)) < clutter))
+        fills = others[rng.integers(0, len(others), len(ys))]
+        for top, left, fill in zip((ys * size).tolist(), (xs * size).tolist(), fills):
+            screen[top + unit:top + 2 * unit, left + unit:left + 2 * unit] = fill
+
+    if noise:
+        noisy = screen.astype(np.float32) + rng.normal(0, noise, screen.shape).astype(np.float32)
+        screen = np.clip(np.rint(noisy), 0, 255).astype(np.uint8)
+    return screen, targets
+
+
+def paint_cell(screen, x, y, background=None, unit=generate_color.UNIT_SIZE):
+    """模拟在屏幕坐标 (x, y) 处点击后像素被画好：把所在格子的中央色块涂成背景色。"""
+    background = generate_color.get_background() if background is None else background
+    size = unit * 3
+    top, left = (y // size) * size, (x // size) * size
+    screen[top + unit:top + 2 * unit, left + unit:left + 2 * unit] = background[::-1]
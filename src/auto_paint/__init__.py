@@ -1,3 +1,9 @@
-from .auto_painter import AutoPainter
-
 __all__ = ["AutoPainter"]
+
+
+def __getattr__(name):
+    # 惰性导入：import src.auto_paint 不会立即加载 cv2 / numpy 等重量级依赖
+    if name == "AutoPainter":
+        from .auto_painter import AutoPainter
+        return AutoPainter
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
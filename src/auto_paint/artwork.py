@@ -0,0 +1,112 @@
+"""按已知图稿直接绘制。
+
+对已知的图稿不必在屏幕上寻找 Blue Marble 覆盖层的色块：把源图量化到调色板，
+得到每种颜色要绘制的画布坐标，再按锚点与像素间距换算成屏幕坐标直接点击。
+每帧只在这些坐标上采样一次，与目标颜色一致的像素视为已完成，不再做模板匹配。
+
+- quantize(image): 经调色板查找表（palette_lut.load_lut）逐像素查最近色，返回调色板下标（透明像素为 -1）
+- ArtworkPlan: 量化结果 + 锚点，按颜色给出画布坐标与当前帧中待绘制的屏幕坐标
+"""
+import cv2
+import numpy as np
+
+from src import generate_color
+from src.palette_lut import load_lut
+
+__all__ = ["quantize", "ArtworkPlan"]
+
+
+def quantize(image, colors=None, alpha_threshold=128, lut=None):
+    """把 BGR / BGRA 图像量化为调色板下标 (h, w) int16，透明像素为 -1。
+
+    colors: {颜色键: (r, g, b)}，默认 generate_color.palette_colors()
+    lut: 可选的 palette_lut.PaletteLUT（须与 colors 一致），默认 load_lut(colors=colors)
+    """
+    if lut is None:
+        lut = load_lut(colors=colors)
+    indices = lut.classify(image[:, :, :3])[0].astype(np.int16)
+    if image.ndim == 3 and image.shape[2] == 4:
+        indices[image[:, :, 3] < alpha_threshold] = -1
+    return indices
+
+
+class ArtworkPlan:
+    """一幅量化后的图稿及其在屏幕上的位置。
+
+    indices: quantize 的结果
+    anchor: 图稿左上角像素在画布上的中心点对应的帧内坐标 (x, y)
+    pitch: 画布一个像素在屏幕上的边长；None 表示每帧由 LatticeDetector 推断
+    colors: {颜色键: (r, g, b)}，默认 generate_color.palette_colors()，须与 quantize 用的调色板顺序一致
+    lut: 与 colors 一致的 palette_lut.PaletteLUT，用于在帧上判断目标点是否已是正确颜色；默认 load_lut(colors=colors)
+    """
+
+    def __init__(self, indices, anchor, pitch=None, colors=None, lut=None):
+        if colors is None:
+            colors = generate_color.palette_colors()
+        self.names = list(colors.keys())
+        self.lut = lut if lut is not None else load_lut(colors=colors)
+        self.indices = indices
+        self.anchor = anchor
+        self.pitch = pitch
+
+        # 按颜色分组的画布坐标（相对锚点的列、行），组内为行优先顺序
+        flat = indices.ravel()
+        order = np.argsort(flat, kind="stable")
+        bounds = np.searchsorted(flat[order], np.arange(len(self.names) + 1))
+        width = indices.shape[1]
+        self.targets = {}
+        for i, name in enumerate(self.names):
+            cells = order[bounds[i]:bounds[i + 1]]
+            if len(cells):
+                self.targets[name] = np.stack([cells % width, cells // width], axis=1)
+
+    @classmethod
+    def from_image(cls, image, anchor, pitch=None, colors=None, lut=None):
+        """由图片路径或 BGR(A) 数组生成计划；lut 见 quantize。"""
+        if isinstance(image, str):
+            path = image
+            image = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+            if image is None:
+                raise FileNotFoundError(f"无法加载图稿: {path}")
+        if image.ndim == 2:
+            image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+        if lut is None:
+            lut = load_lut(colors=colors)
+        return cls(quantize(image, colors, lut=lut), anchor, pitch, colors, lut)
+
+    def canvas_coordinates(self, name):
+        """颜色 name 的全部画布坐标 (k, 2)，每行为相对锚点的 (列, 行)。"""
+        return self.targets.get(name, np.empty((0, 2), dtype=np.intp))
+
+    def counts(self):
+        """{颜色键: 像素数}，按调色板顺序。"""
+        return {name: len(cells) for name, cells in self.targets.items()}
+
+    def screen_points(self, name, pitch):
+        """颜色 name 的全部目标在帧内的像素中心坐标 (xs, ys)。pitch 为 (pitch_x, pitch_y)。"""
+        cells = self.canvas_coordinates(name)
+        xs = np.rint(self.anchor[0] + cells[:, 0] * pitch[0]).astype(np.intp)
+        ys = np.rint(self.anchor[1] + cells[:, 1] * pitch[1]).astype(np.intp)
+        return xs, ys
+
+    def pending(self, frame, pitch, names=None, tolerance=2):
+        """在 frame 上采样全部目标点，返回 ([(颜色键, xs, ys), ...], 帧外点数)。
+
+        列表只含帧内且颜色尚不正确的点；帧外的点无法判断是否已完成，单独计数，
+        列表为空且帧外点数为 0 才表示图稿已全部绘制完成。
+        """
+        height, width = frame.shape[:2]
+        result = []
+        hidden = 0
+        for name in names or self.targets:
+            if name not in self.targets:
+                continue
+            xs, ys = self.screen_points(name, pitch)
+            inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+            hidden += int(len(inside) - np.count_nonzero(inside))
+            xs, ys = xs[inside], ys[inside]
+            indices, _ = self.lut.classify(frame[ys, xs], tolerance)
+            done = indices == self.names.index(name)
+            if not done.all():
+                result.append((name, xs[~done], ys[~done]))
+        return result, hidden
@@ -2,10 +2,39 @@ import time
 import os
 import cv2
 import numpy as np
-import pyautogui
-import keyboard
-from tkinter import messagebox
 from src import color_tackle
+from src.template_cache import load_template, synth_template
+from src.auto_paint.capture import create_capture
+from src.auto_paint.input import create_input
+from src.auto_paint.grid_detector import GridColorDetector
+from src.auto_paint.palette_classifier import PaletteClassifier
+from src.auto_paint.matches import peaks_from_result
+from src.auto_paint.ordering import ORDERS, plan_order
+from src.auto_paint.incremental import IncrementalMatcher
+from src.auto_paint.pyramid import PyramidMatcher
+from src.auto_paint.parallel import ParallelMatcher
+from src.auto_paint.lattice import LatticeDetector
+from src.auto_paint.pipeline import PaintPipeline
+from src.auto_paint.metrics import PaintMetrics
+from src.auto_paint.background import BackgroundTracker
+
+# keyboard / pyautogui / tkinter 只在运行时才导入，import 本模块不会拉起这些依赖
+_keyboard = None
+
+
+def _esc_pressed():
+    """ESC 是否被按下；keyboard 不可用（如无权限的 Linux 无头环境）时视为未按下。"""
+    global _keyboard
+    if _keyboard is None:
+        try:
+            import keyboard
+            keyboard.is_pressed('esc')
+            _keyboard = keyboard
+        except Exception:
+            _keyboard = False
+    if not _keyboard:
+        return False
+    return _keyboard.is_pressed('esc')
 
 
 class AutoPainter:
@@ -14,12 +43,71 @@ class AutoPainter:
     run 方法接受两个可调用对象：
     - target_path_getter(): 返回当前要寻找的目标图片路径（字符串）
     - running_getter(): 返回布尔值，表示是否继续运行
+
+    run_palette 为多颜色模式：每帧对整张调色板分类一次，再按颜色依次点击完所有目标。
+    run_artwork 按已知图稿（见 artwork.py）直接点击画布坐标，不做模板匹配。
+
+    capture: 截图后端（见 capture.py），None 时在首次截图时自动选择。
+    input_backend: 鼠标输入后端（见 input.py），None 时在首次点击时自动选择，
+      并按 clicks_per_second / click_burst 限速（clicks_per_second 为 None 表示不限速）。
+    use_gui: 为 True 时用 tkinter 弹窗提示错误，否则只打印到控制台（无头运行）。
+    engine: 检测引擎
+      - "template": cv2.matchTemplate(TM_CCOEFF_NORMED)，threshold 为相关系数阈值
+      - "grid": 精确颜色网格检测（见 grid_detector.py），threshold 为背景外圈占比阈值
+      - "lattice": 推断画布网格后只在格子中心采样（见 lattice.py），threshold 为外圈采样点中背景的占比阈值
+    batch_size: 每帧最多点击的目标数。大于 1 时由一帧生成点击计划，依次点击后再重新截图；
+      batch_verify 为 True 时，每次点击前只截取下一个目标所在的小块与原帧比较，画面变化（如地图被拖动）则提前重新截图。
+    incremental: 为 True 时只在与上一帧相比发生变化的块上重新匹配（见 incremental.py）。
+    pyramid_levels: 大于 0 时 "template" 引擎改用由粗到细的金字塔匹配（见 pyramid.py），适合高分辨率屏幕。
+    workers: 大于 1 时把帧切成横带在线程池中并发匹配（见 parallel.py）。
+    adaptive_scale: 为 True 时从当前帧推断画布像素大小，并在内存中按该尺寸重新生成模板，
+      地图缩放与模板尺寸不一致时也能匹配；推断出的网格未通过 lattice.verify_lattice 时沿用原模板。
+    order: 点击顺序（见 ordering.py）："row" 行优先，"serpentine" 蛇形，"nearest" 最近邻，
+      后两者减少鼠标移动距离；均从 last_found 之后继续。
+    budget: 可选的 budget.ChargeBudget。给出时每次点击都记账，charge 用完立即提交并等待恢复；
+      连续 budget.confirm_frames 帧找不到目标即提交并停止，不再等满 unmatched_threshold 帧。
+    metrics: 分阶段计时（见 metrics.py），None 时自动创建；每次 run* 开始时清零。
+    auto_background: 为 True 时 run（包括流水线模式）在找不到目标时从帧中估计实际背景色（见 background.py），
+      与模板背景不一致则在内存中按新背景重新生成模板，而不是空转到 unmatched_threshold 帧。
+    recorder: 可选的 recording.FrameRecorder，记录每帧截图、模板与点击，用于离线回放；由调用方关闭。
+    pipeline: 为 True 时 run 改为流水线执行（见 pipeline.py）：截图、匹配在后台线程中与点击重叠进行；
+      此模式下不做 batch_verify 抽查（截图后端被截图线程占用），改由点击时间判定目标是否过期。
     """
 
-    def __init__(self, click_offset_x=0, click_offset_y=0, threshold=0.8):
+    ENGINES = ("template", "grid", "lattice")
+
+    def __init__(self, click_offset_x=0, click_offset_y=0, threshold=0.8, capture=None, engine="template",
+                 input_backend=None, clicks_per_second=None, click_burst=1, batch_size=1, batch_verify=True, incremental=False, pyramid_levels=0,
+                 workers=1, adaptive_scale=False, order="row", budget=None, metrics=None,
+                 recorder=None, pipeline=False, auto_background=False, use_gui=True):
+        if engine not in self.ENGINES:
+            raise ValueError(f"未知的检测引擎: {engine}")
+        if order not in ORDERS:
+            raise ValueError(f"未知的点击顺序: {order}")
         self.click_offset_x = click_offset_x
         self.click_offset_y = click_offset_y
         self.threshold = threshold
+        self.capture = capture
+        self.input_backend = input_backend
+        self.clicks_per_second = clicks_per_second
+        self.click_burst = click_burst
+        self.engine = engine
+        self.grid_detector = GridColorDetector()
+        self.lattice_detector = LatticeDetector()
+        self.batch_size = batch_size
+        self.batch_verify = batch_verify
+        self.incremental = incremental
+        self.incremental_matcher = IncrementalMatcher(self._match_frame)
+        self.pyramid_matcher = PyramidMatcher(levels=pyramid_levels)
+        self.parallel_matcher = ParallelMatcher(self._match_single, workers=workers)
+        self.adaptive_scale = adaptive_scale
+        self.order = order
+        self.budget = budget
+        self.metrics = metrics if metrics is not None else PaintMetrics()
+        self.recorder = recorder
+        self.background_tracker = BackgroundTracker() if auto_background else None
+        self.pipeline = pipeline
+        self.use_gui = use_gui
         # 记录上一次找到的目标图像的 top-left 坐标 (x, y)
         # 下一次检测将从该位置开始按行优先（先向右再向下）选择下一个匹配
         self.last_found = None
@@ -28,13 +116,24 @@ class AutoPainter:
         self.unmatched_threshold = 50
 
     def run(self, target_path_getter, running_getter):
+        self.metrics.reset()
+        if self.pipeline:
+            try:
+                PaintPipeline(self).run(target_path_getter, running_getter, _esc_pressed)
+            except Exception as e:
+                self._notify("showerror", "错误", f"运行出错: {str(e)}")
+            return
+
         current_path = None
         target_image = None
 
         try:
             while running_getter():
                 # 优先响应 ESC
-                if keyboard.is_pressed('esc'):
+                if _esc_pressed():
+                    break
+                # charge 用完时提交并等待恢复
+                if not self._recharge(running_getter):
                     break
 
                 # 获取目标路径并在必要时加载图像
@@ -48,109 +147,390 @@ class AutoPainter:
                     target_image = self._load_target_image(current_path)
                     if target_image is None:
                         return
+                    if self.background_tracker is not None:
+                        target_image = self.background_tracker.apply(target_image)
+                    if self.recorder is not None:
+                        self.recorder.template(target_image, current_path)
                     # 目标图片变了，重置上次位置
                     self.last_found = None
 
                 # 截图
                 screenshot = self._screenshot()
 
+                # 按当前缩放调整模板尺寸
+                template = target_image
+                if self.adaptive_scale:
+                    with self.metrics.stage("scale"):
+                        template = self._scaled_template(screenshot, target_image)
+
                 # 查找匹配项
-                matches = self._get_matches(screenshot, target_image)
+                matches = self._get_matches(screenshot, template)
 
-                if matches:
+                if len(matches) and self.batch_size > 1:
+                    # 批量模式：按计划点击多个目标后再重新截图
+                    self._run_click_plan(screenshot, matches, template.shape[:2], running_getter)
+                    self.unmatched_count = 0
+                elif len(matches):
                     # 选择下一个匹配并点击
-                    next_match = self._select_next_match(matches)
+                    with self.metrics.stage("select"):
+                        next_match = self._select_next_match(matches, template.shape[0])
                     top_left = (next_match[0], next_match[1])
                     # 点击；如果中途停止则退出 run
-                    self._click(top_left, target_image)
+                    self._click(top_left, template.shape[:2])
                     # 找到匹配则重置未匹配计数
                     self.unmatched_count = 0
                 else:
                     # 没有匹配，重置上次位置以便下次从头开始
                     self.last_found = None
-                    # 未匹配计数递增，超出阈值则尝试点击提交按钮并停止
-                    self.unmatched_count += 1
-                    if self.unmatched_count > self.unmatched_threshold:
-                        try:
-                            color_tackle.click_submit()
-                        except Exception:
-                            # 如果外部模块不可用或执行失败，仍然优雅地停止
-                            pass
-                        try:
-                            messagebox.showwarning("提示", "多次未匹配到目标图像，已尝试提交并停止点击")
-                        except Exception:
-                            print("多次未匹配到目标图像，已尝试提交并停止点击")
+                    if self._background_drifted(screenshot, template):
+                        target_image = self.background_tracker.apply(target_image)
+                        if self.recorder is not None:
+                            self.recorder.template(target_image, current_path)
+                        self.unmatched_count = 0
+                    elif self._on_unmatched():
                         return
 
                 # 小延迟以避免 CPU 飙升
-                time.sleep(0.01)
+                with self.metrics.stage("sleep"):
+                    time.sleep(0.01)
 
         except Exception as e:
             # 在 GUI 环境下显示错误
+            self._notify("showerror", "错误", f"运行出错: {str(e)}")
+
+    def run_palette(self, colors_getter, running_getter, select_color=None):
+        """多颜色模式。
+
+        colors_getter(): 返回要绘制的颜色键列表（按绘制顺序），None 或空表示调色板全部颜色
+        running_getter(): 返回布尔值，表示是否继续运行
+        select_color(name): 切换到某颜色前调用（例如点击 wplace 调色板中的色块）；
+          为 None 时点击使用 wplace 中当前选中的颜色，colors_getter() 只能给出一种颜色，否则抛出 ValueError
+
+        每帧只做一次 PaletteClassifier.classify，得到各颜色的目标列表后逐颜色按 self.order 点击完，再重新截图。
+        """
+        classifier = PaletteClassifier()
+        target_size = (classifier.template_size, classifier.template_size)
+        self._palette_names(colors_getter, classifier, select_color)
+        self.metrics.reset()
+
+        try:
+            while running_getter():
+                if _esc_pressed():
+                    break
+                if not self._recharge(running_getter):
+                    break
+
+                names = self._palette_names(colors_getter, classifier, select_color)
+                screenshot = self._screenshot()
+                with self.metrics.stage("classify"):
+                    targets = classifier.classify(screenshot, self.threshold, names=names)
+
+                pending = [(name, targets[name]) for name in names if len(targets.get(name, ()))]
+                if not pending:
+                    self.last_found = None
+                    if self._on_unmatched():
+                        return
+                    time.sleep(0.01)
+                    continue
+
+                self.unmatched_count = 0
+                for name, matches in pending:
+                    if not self._has_charge():
+                        break
+                    if select_color is not None:
+                        select_color(name)
+                    # 同一帧内按 self.order 依次点击该颜色的全部目标
+                    with self.metrics.stage("select"):
+                        ordered = plan_order(matches, self.last_found, len(matches), self.order, target_size[0])
+                    for x, y, _ in ordered.tolist():
+                        if not running_getter() or _esc_pressed():
+                            return
+                        if not self._has_charge():
+                            break
+                        self._click((x, y), target_size)
+                        self.last_found = (x, y)
+
+                with self.metrics.stage("sleep"):
+                    time.sleep(0.01)
+
+        except Exception as e:
+            self._notify("showerror", "错误", f"运行出错: {str(e)}")
+
+    @staticmethod
+    def _palette_names(colors_getter, classifier, select_color):
+        """本帧要绘制的颜色键；没有 select_color 时无法切换颜色，多于一种即抛出 ValueError。"""
+        names = colors_getter() or classifier.names
+        if select_color is None and len(names) > 1:
+            raise ValueError(f"要绘制 {len(names)} 种颜色，但没有 select_color 回调切换颜色")
+        return names
+
+    def run_artwork(self, plan, running_getter, select_color=None, names=None):
+        """按图稿绘制。
+
+        plan: artwork.ArtworkPlan；plan.pitch 为 None 时每帧由 lattice_detector 推断像素间距
+        running_getter(): 返回布尔值，表示是否继续运行
+        select_color(name): 切换到某颜色前调用；为 None 时只能绘制一种颜色，点击使用 wplace 中当前选中的颜色
+        names: 只绘制这些颜色键，None 表示图稿中的全部颜色
+
+        每帧只在图稿的目标点上采样，颜色已正确的点跳过；全部点都在帧内且颜色正确时结束，
+        有点在帧外且帧内无事可做时按未匹配处理。
+        """
+        names = [name for name in (plan.targets if names is None else names) if name in plan.targets]
+        if select_color is None and len(names) > 1:
+            raise ValueError(f"图稿包含 {len(names)} 种颜色，没有 select_color 时需用 names 指定一种颜色")
+        if not names:
+            self._notify("showwarning", "提示", "图稿中没有要绘制的颜色")
+            return
+
+        self.metrics.reset()
+        try:
+            while running_getter():
+                if _esc_pressed():
+                    break
+                if not self._recharge(running_getter):
+                    break
+
+                screenshot = self._screenshot()
+                if plan.pitch is not None:
+                    pitch = (plan.pitch, plan.pitch)
+                else:
+                    lattice = self.lattice_detector.ensure_lattice(screenshot)
+                    if lattice is None:
+                        if self._on_unmatched():
+                            return
+                        time.sleep(0.01)
+                        continue
+                    pitch = (lattice.pitch_x, lattice.pitch_y)
+
+                with self.metrics.stage("sample"):
+                    pending, hidden = plan.pending(screenshot, pitch, names)
+                if not pending and hidden:
+                    # 帧内的点都已正确，但图稿有一部分不在画面内（被拖走或锚点错误），无法继续
+                    if self._on_unmatched():
+                        return
+                    time.sleep(0.01)
+                    continue
+                if not pending:
+                    self._submit()
+                    self._notify("showinfo", "提示", "图稿已全部绘制完成")
+                    return
+
+                self.unmatched_count = 0
+                for name, xs, ys in pending:
+                    if not self._has_charge():
+                        break
+                    if select_color is not None:
+                        select_color(name)
+                    for x, y in zip(xs.tolist(), ys.tolist()):
+                        if not running_getter() or _esc_pressed():
+                            return
+                        if not self._has_charge():
+                            break
+                        # 坐标已是像素中心，按 0 尺寸目标点击
+                        self._click((x, y), (0, 0))
+
+                with self.metrics.stage("sleep"):
+                    time.sleep(0.01)
+
+        except Exception as e:
+            self._notify("showerror", "错误", f"运行出错: {str(e)}")
+
+    def _on_unmatched(self):
+        """未匹配计数递增，超出阈值则尝试点击提交按钮；返回 True 表示应停止运行。"""
+        self.unmatched_count += 1
+        limit = self.budget.confirm_frames if self.budget is not None else self.unmatched_threshold
+        if self.unmatched_count <= limit:
+            return False
+        self._submit()
+        self._notify("showwarning", "提示", "多次未匹配到目标图像，已尝试提交并停止点击")
+        return True
+
+    def _background_drifted(self, screenshot, template):
+        """估计实际背景色（未启用 auto_background 时总为 False）；与模板背景不一致时返回 True。"""
+        if self.background_tracker is None:
+            return False
+        with self.metrics.stage("background"):
+            drifted = self.background_tracker.update(screenshot, template, self.unmatched_count + 1)
+        if drifted:
+            old = tuple(int(c) for c in template[0, 0][::-1])
+            new = self.background_tracker.background[::-1]
+            print(f"背景色由 {old} 变为 {new}，已在内存中重新生成模板")
+        return drifted
+
+    def _submit(self):
+        """点击提交按钮；有预算时只在有待提交像素时提交。"""
+        if self.budget is not None:
+            if not self.budget.pending:
+                return
+            self.budget.mark_submitted()
+        try:
+            # 流水线模式下截图后端归截图线程所有，此时由定位器用自己的截图后端查找按钮
+            capture = None if self.pipeline else self.capture
+            color_tackle.click_submit(capture=capture, input_backend=self.input_backend)
+        except Exception:
+            # 如果外部模块不可用或执行失败，仍然优雅地继续
+            pass
+
+    def _has_charge(self):
+        """是否还有可用的 charge（未设置预算时总为 True）。"""
+        return self.budget is None or self.budget.available() >= 1
+
+    def _recharge(self, running_getter):
+        """charge 用完时提交并 sleep 到恢复 budget.resume_at 个；返回 False 表示等待期间被停止。"""
+        if self._has_charge():
+            return True
+        self._submit()
+        self.last_found = None
+        wait = self.budget.time_until(self.budget.resume_at)
+        print(f"charge 已用完，等待 {wait:.0f} 秒后继续")
+        with self.metrics.stage("recharge"):
+            while wait > 0:
+                # 分段 sleep，等待期间仍响应停止与 ESC
+                if not running_getter() or _esc_pressed():
+                    return False
+                time.sleep(min(wait, 0.5))
+                wait = self.budget.time_until(self.budget.resume_at)
+        return True
+
+    def _notify(self, kind, title, message):
+        """弹窗提示（kind 为 messagebox 的方法名）；无 GUI 或弹窗失败时打印到控制台。"""
+        if self.use_gui:
             try:
-                messagebox.showerror("错误", f"运行出错: {str(e)}")
+                from tkinter import messagebox
+                getattr(messagebox, kind)(title, message)
+                return
             except Exception:
-                print("运行出错:", e)
+                pass
+        print(f"{title}: {message}")
 
     def _load_target_image(self, path):
-        """加载目标图像并做基本校验，失败时在 GUI 报错并返回 None。"""
-        if not os.path.exists(path):
-            messagebox.showerror("错误", f"无法找到目标图像: {path}")
-            return None
-        target_image = cv2.imread(path)
+        """从模板缓存（调色板图集或 PNG 文件）加载目标图像，失败时在 GUI 报错并返回 None。"""
+        target_image = load_template(path)
         if target_image is None:
-            messagebox.showerror("错误", f"无法加载目标图像: {path}")
+            if not os.path.exists(path):
+                self._notify("showerror", "错误", f"无法找到目标图像: {path}")
+            else:
+                self._notify("showerror", "错误", f"无法加载目标图像: {path}")
             return None
         return target_image
 
+    def _scaled_template(self, screenshot, target_image):
+        """按帧中推断出的画布格子大小，返回内存中生成的同色模板；推断失败或网格未通过校验时返回原模板。"""
+        lattice = self.lattice_detector.verified_lattice(screenshot)
+        if lattice is None:
+            return target_image
+        unit = max(1, int(round((lattice.pitch_x + lattice.pitch_y) / 6)))
+        height, width = target_image.shape[:2]
+        if unit * 3 == height == width:
+            return target_image
+        color = target_image[height // 2, width // 2]
+        background = target_image[0, 0]
+        return synth_template(color.tolist(), background.tolist(), unit)
+
     def _screenshot(self):
-        shot = pyautogui.screenshot()
-        return cv2.cvtColor(np.array(shot), cv2.COLOR_RGB2BGR)
+        """通过截图后端获取 BGR 帧（缓冲区会被下一次截图复用）。"""
+        if self.capture is None:
+            self.capture = create_capture()
+        with self.metrics.stage("capture"):
+            frame = self.capture.grab()
+        self.metrics.frame()
+        if self.recorder is not None:
+            with self.metrics.stage("record"):
+                self.recorder.frame(frame)
+        return frame
 
     def _get_matches(self, screenshot, target_image):
-        """返回匹配列表 [(x,y,score), ...]，未排序。"""
-        result = cv2.matchTemplate(screenshot, target_image, cv2.TM_CCOEFF_NORMED)
-        ys, xs = np.where(result >= self.threshold)
-        matches = []
-        for x, y in zip(xs, ys):
-            matches.append((int(x), int(y), float(result[y, x])))
-        return matches
-
-    def _select_next_match(self, matches):
-        """按行优先从 matches 中选择下一个要点击的项，并更新 self.last_found。
-
-        matches: list of (x,y,score)，未排序。
+        """返回匹配结构化数组（字段 x, y, score，见 matches.MATCH_DTYPE），未排序。
+
+        模板匹配结果先做模板尺寸窗口的非极大值抑制，每个目标只保留一个峰值。
+        """
+        with self.metrics.stage("match"):
+            # lattice 引擎本身只采样格子中心，且网格需要在整帧上推断，不做分块/分带
+            if self.incremental and self.engine != "lattice":
+                return self.incremental_matcher.match(screenshot, target_image, self.threshold)
+            return self._match_frame(screenshot, target_image, self.threshold)
+
+    def _match_frame(self, frame, target_image, threshold):
+        """用当前检测引擎对整帧（或帧的一部分）做一次完整匹配。"""
+        if self.parallel_matcher.workers > 1 and self.engine != "lattice":
+            return self.parallel_matcher.match(frame, target_image, threshold)
+        return self._match_single(frame, target_image, threshold)
+
+    def _match_single(self, frame, target_image, threshold):
+        """在当前线程中用检测引擎匹配 frame。"""
+        if self.engine == "grid":
+            return self.grid_detector.detect(frame, target_image, threshold)
+        if self.engine == "lattice":
+            return self.lattice_detector.detect(frame, target_image, threshold)
+        if self.pyramid_matcher.levels > 0:
+            return self.pyramid_matcher.match(frame, target_image, threshold)
+        result = cv2.matchTemplate(frame, target_image, cv2.TM_CCOEFF_NORMED)
+        return peaks_from_result(result, threshold, target_image.shape[:2])
+
+    def _select_next_match(self, matches, row_height=1):
+        """按 self.order 从 matches 中选择下一个要点击的项，并更新 self.last_found。
+
+        matches: 匹配结构化数组，未排序。
+        row_height: 蛇形顺序中视为同一行的高度，一般为模板高度
         返回选中的 (x,y,score)
         """
-        # 按行优先排序（先 y 再 x）
-        matches.sort(key=lambda t: (t[1], t[0]))
-        next_match = None
-        if self.last_found is None:
-            next_match = matches[0]
-        else:
-            lx, ly = self.last_found
-            same_row = [m for m in matches if m[1] == ly and m[0] > lx]
-            if same_row:
-                next_match = min(same_row, key=lambda t: t[0])
-            else:
-                below = [m for m in matches if m[1] > ly]
-                if below:
-                    min_y = min(m[1] for m in below)
-                    row = [m for m in below if m[1] == min_y]
-                    next_match = min(row, key=lambda t: t[0])
-                else:
-                    next_match = matches[0]
+        x, y, score = plan_order(matches, self.last_found, 1, self.order, row_height)[0].tolist()
 
         # 更新 last_found 为所选项的 top-left
-        self.last_found = (next_match[0], next_match[1])
-        return next_match
-
-    def _click(self, top_left, target_image):
-        """在 top_left 所在位置执行一次点击。"""
-        target_height, target_width = target_image.shape[:2]
-        center_x = top_left[0] + target_width // 2 + self.click_offset_x
-        center_y = top_left[1] + target_height // 2 + self.click_offset_y
-        pyautogui.moveTo(center_x, center_y)
-        pyautogui.click()
+        self.last_found = (x, y)
+        return x, y, score
+
+    def _plan_clicks(self, matches, row_height=1):
+        """由一帧的匹配生成点击计划：从 last_found 之后按 self.order 取最多 batch_size 个 (x, y)，
+        有预算时不超过可用的 charge 数。"""
+        count = self.batch_size if self.budget is None else min(self.batch_size, self.budget.available())
+        with self.metrics.stage("select"):
+            plan = plan_order(matches, self.last_found, count, self.order, row_height)
+        return list(zip(plan["x"].tolist(), plan["y"].tolist()))
+
+    def _view_changed(self, screenshot, top_left, target_size, tolerance=8, ratio=0.25):
+        """只截取 top_left 处模板大小的一块，抽样比较它与原帧是否仍一致。"""
+        height, width = target_size
+        x, y = top_left
+        frame_h, frame_w = screenshot.shape[:2]
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + width, frame_w), min(y + height, frame_h)
+        if x1 <= x0 or y1 <= y0:
+            return False
+        patch = self.capture.grab_patch(x0, y0, x1 - x0, y1 - y0)
+        before = screenshot[y0:y1, x0:x1]
+        if patch.shape != before.shape:
+            return True
+        # 每隔 2 像素抽样一次即可判断
+        diff = cv2.absdiff(patch[::2, ::2], before[::2, ::2]).max(axis=2)
+        return np.count_nonzero(diff > tolerance) > ratio * diff.size
+
+    def _run_click_plan(self, screenshot, matches, target_size, running_getter):
+        """执行一帧的点击计划；停止、按下 ESC 或画面变化时提前结束。"""
+        for i, top_left in enumerate(self._plan_clicks(matches, target_size[0])):
+            if i:
+                if not running_getter() or _esc_pressed():
+                    return
+                if self.batch_verify and self._view_changed(screenshot, top_left, target_size):
+                    return
+            self._click(top_left, target_size)
+            self.last_found = top_left
+
+    def _click(self, top_left, target_size):
+        """在 top_left（帧内坐标）所在位置执行一次点击，target_size 为模板 (高, 宽)。"""
+        target_height, target_width = target_size
+        # 截图区域可能不是整个屏幕，需要加上区域左上角的屏幕坐标
+        origin_x, origin_y = self.capture.offset if self.capture is not None else (0, 0)
+        center_x = origin_x + top_left[0] + target_width // 2 + self.click_offset_x
+        center_y = origin_y + top_left[1] + target_height // 2 + self.click_offset_y
+        if self.input_backend is None:
+            self.input_backend = create_input(rate=self.clicks_per_second, burst=self.click_burst)
+        with self.metrics.stage("click"):
+            self.input_backend.click(center_x, center_y)
+        self.metrics.click()
+        if self.recorder is not None:
+            self.recorder.click(top_left, (center_x, center_y))
+        if self.budget is not None:
+            self.budget.spend()
         print(f"点击位置: ({center_x}, {center_y})")
 
@@ -0,0 +1,99 @@
+"""从实时画面估计背景色。
+
+模板四周一圈是 generate_color.BACKGROUND，背景色需要用吸管手动设置并持久化在 background.json 中；
+设置错了（或换了地图样式）时所有引擎的匹配都会失败，run 要空转 unmatched_threshold 帧才放弃。
+BackgroundTracker 在找不到目标时，从帧中疑似目标（与模板中央同色的像素）周围一圈统计颜色直方图：
+把像素按每通道高 bits 位打包成整数后 np.bincount，取最多的一格，再在该格内取出现最多的精确颜色。
+估计出的背景色与模板背景相差超过 tolerance 时，在内存中按新背景重新生成模板（经 template_cache 缓存），
+不写文件、不修改 generate_color.BACKGROUND。
+"""
+import cv2
+import numpy as np
+
+from src.template_cache import synth_template
+from src.auto_paint.grid_detector import in_range
+
+__all__ = ["dominant_color", "BackgroundTracker"]
+
+
+def _pack(pixels, bits):
+    """把 (N, 3) 的 uint8 像素按每通道高 bits 位打包为整数。"""
+    shift = 8 - bits
+    q = (pixels >> shift).astype(np.int32)
+    return (q[:, 0] << (2 * bits)) | (q[:, 1] << bits) | q[:, 2]
+
+
+def dominant_color(pixels, bits=5):
+    """返回 (N, 3) 像素中最主要的颜色与其占比：(颜色元组, 占比)；没有像素时返回 (None, 0.0)。
+
+    先按 bits 位量化做 bincount 找出最多的一格（允许抗锯齿与压缩噪声），再在格内取精确颜色的众数。
+    """
+    pixels = np.asarray(pixels, dtype=np.uint8).reshape(-1, 3)
+    if not len(pixels):
+        return None, 0.0
+    coarse = _pack(pixels, bits)
+    counts = np.bincount(coarse, minlength=1 << (3 * bits))
+    top = int(counts.argmax())
+    members = pixels[coarse == top]
+    exact = np.bincount(_pack(members, 8)).argmax()
+    color = ((exact >> 16) & 0xFF, (exact >> 8) & 0xFF, exact & 0xFF)
+    return tuple(int(c) for c in color), float(counts[top] / len(pixels))
+
+
+class BackgroundTracker:
+    """跟踪画面中的实际背景色，并按需重新生成模板。
+
+    tolerance: 估计值与模板背景每通道相差超过该值才视为漂移（与检测引擎的 background_tolerance 一致）
+    min_share: 估计的背景色在采样像素中的最低占比，低于该值不采信
+    color_tolerance: 判定“疑似目标”时中央颜色每通道允许的误差
+    recheck: 持续找不到目标时，每隔多少帧重新估计一次
+    background: 最近一次确认的背景色（BGR），None 表示尚未估计或与模板一致
+    """
+
+    def __init__(self, tolerance=6, min_share=0.4, color_tolerance=2, recheck=10):
+        self.tolerance = tolerance
+        self.min_share = min_share
+        self.color_tolerance = color_tolerance
+        self.recheck = recheck
+        self.background = None
+        self.estimates = 0
+
+    def estimate(self, frame, template):
+        """从 frame 中模板颜色的疑似目标周围估计背景色，返回 (BGR 元组, 占比)；没有疑似目标时返回 (None, 0.0)。"""
+        self.estimates += 1
+        height, width = template.shape[:2]
+        unit = max(1, min(height, width) // 3)
+        color = template[height // 2, width // 2]
+        mask = in_range(frame, color, self.color_tolerance)
+        if not cv2.countNonZero(mask):
+            return None, 0.0
+        # 目标色块向外扩一个 unit 即模板中背景所在的一圈
+        ring = cv2.dilate(mask, np.ones((2 * unit + 1, 2 * unit + 1), dtype=np.uint8))
+        ring[mask > 0] = 0
+        return dominant_color(frame[ring > 0])
+
+    def drifted(self, background, template):
+        """background 与模板背景是否相差超过 tolerance。"""
+        current = template[0, 0].astype(np.int16)
+        return bool((np.abs(np.asarray(background, dtype=np.int16) - current) > self.tolerance).any())
+
+    def apply(self, template):
+        """按已确认的背景色返回模板（背景一致时原样返回）。"""
+        if self.background is None or not self.drifted(self.background, template):
+            return template
+        height = template.shape[0]
+        color = template[height // 2, template.shape[1] // 2]
+        return synth_template(color.tolist(), list(self.background), max(1, height // 3))
+
+    def update(self, frame, template, misses=1):
+        """找不到目标时调用；misses 为连续未匹配的帧数，只在第 1 帧及此后每 recheck 帧估计一次。
+
+        背景发生漂移时记录新背景色（之后由 apply 生成模板）并返回 True。
+        """
+        if misses != 1 and (misses - 1) % self.recheck:
+            return False
+        background, share = self.estimate(frame, template)
+        if background is None or share < self.min_share or not self.drifted(background, template):
+            return False
+        self.background = background
+        return True
@@ -0,0 +1,57 @@
+"""绘制次数（charges）预算。
+
+wplace 每点一个像素消耗一次 charge，charge 按固定时间间隔恢复，上限固定。原来的做法是连续
+unmatched_threshold（50）帧找不到目标才提交，这些帧每帧都要整屏截图和匹配，也无法在 charge
+用完的那一刻停下。ChargeBudget 直接记账：
+
+- 每次点击 spend()，charge 用完时立即提交并 sleep 到恢复足够的 charge 再继续
+- 找不到目标时只需 confirm_frames 帧确认即提交并停止
+"""
+import math
+import time
+
+from src.auto_paint.input import TokenBucket
+
+__all__ = ["ChargeBudget"]
+
+
+class ChargeBudget(TokenBucket):
+    """按恢复速率记账的 charge 预算（令牌桶，桶容量为 charge 上限）。
+
+    charges: 当前可用的 charge 数
+    max_charges: charge 上限，None 表示与 charges 相同
+    regen_seconds: 恢复一个 charge 需要的秒数
+    resume_at: 用完后恢复到多少 charge 才继续绘制，None 表示恢复满
+    confirm_frames: 连续多少帧找不到目标即视为目标已画完
+    """
+
+    def __init__(self, charges, max_charges=None, regen_seconds=30.0, resume_at=None,
+                 confirm_frames=2, clock=time.monotonic, sleep=time.sleep):
+        max_charges = max_charges or charges
+        super().__init__(1.0 / regen_seconds, max_charges, clock=clock, sleep=sleep)
+        self.tokens = float(min(charges, max_charges))
+        self.resume_at = min(resume_at or max_charges, max_charges)
+        self.confirm_frames = confirm_frames
+        # 已点击但尚未提交的像素数
+        self.pending = 0
+
+    def available(self):
+        """当前可用的整数 charge 数。"""
+        self._refill()
+        return int(math.floor(self.tokens + 1e-9))
+
+    def spend(self, count=1):
+        """记一次（或 count 次）点击。"""
+        self._refill()
+        self.tokens = max(self.tokens - count, 0.0)
+        self.pending += count
+
+    def time_until(self, count):
+        """距离可用 charge 达到 count 还需多少秒。"""
+        self._refill()
+        missing = min(count, self.burst) - self.tokens
+        return max(missing, 0.0) / self.rate
+
+    def mark_submitted(self):
+        """提交后清零待提交计数。"""
+        self.pending = 0
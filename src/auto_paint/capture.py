@@ -0,0 +1,192 @@
+"""截图后端。
+
+AutoPainter 通过 CaptureBackend.grab() 获取 BGR 帧，不再直接调用 pyautogui.screenshot()。
+- MssCapture: 基于 mss（Linux 下走 XShm，Windows 下走 BitBlt），速度最快，可选依赖（pip install .[native]）
+- PyAutoGuiCapture: 基于 pyautogui，总是可用的回退方案
+- FakeCapture: 内存中回放合成帧，用于无显示环境下跑完整循环
+
+所有后端都支持 region=(left, top, width, height) 只截取部分屏幕，并复用预分配的 BGR 缓冲区。
+grab() 返回的数组会在下一次 grab() 时被覆盖，调用方若要跨帧保存需自行 copy()。
+"""
+import threading
+
+import cv2
+import numpy as np
+
+__all__ = [
+    "CaptureBackend",
+    "MssCapture",
+    "PyAutoGuiCapture",
+    "FakeCapture",
+    "create_capture",
+]
+
+
+class CaptureBackend:
+    """截图后端基类。
+
+    region: (left, top, width, height)，屏幕坐标；None 表示整个主屏幕。
+    offset: 最近一帧左上角在屏幕上的坐标，用于把帧内坐标换算回屏幕坐标。
+    """
+
+    def __init__(self, region=None):
+        self.region = region
+        self.offset = (0, 0) if region is None else (region[0], region[1])
+        self._buffer = None
+
+    def set_region(self, region):
+        """切换截图区域，下一次 grab() 时生效。"""
+        self.region = region
+        self.offset = (0, 0) if region is None else (region[0], region[1])
+
+    def grab(self):
+        """截取一帧，返回 (H, W, 3) 的 BGR uint8 数组。"""
+        raise NotImplementedError
+
+    def grab_patch(self, x, y, width, height):
+        """截取帧内坐标 (x, y) 处 width×height 的小块，返回独立的 BGR 数组。
+
+        不影响 region 与主缓冲区，用于低成本地抽查画面是否变化。
+        """
+        saved = (self.region, self.offset, self._buffer)
+        origin_x, origin_y = self.offset
+        self.region = (origin_x + x, origin_y + y, width, height)
+        self._buffer = None
+        try:
+            return self.grab()
+        finally:
+            self.region, self.offset, self._buffer = saved
+
+    def close(self):
+        """释放后端持有的资源。"""
+        self._buffer = None
+
+    def _ensure_buffer(self, height, width):
+        """按需（尺寸变化时）重新分配 BGR 缓冲区。"""
+        if self._buffer is None or self._buffer.shape[:2] != (height, width):
+            self._buffer = np.empty((height, width, 3), dtype=np.uint8)
+        return self._buffer
+
+
+class MssCapture(CaptureBackend):
+    """基于 mss 的原生截图后端。
+
+    mss 的句柄不能跨线程使用，因此在第一次 grab() 的线程里惰性创建，换线程时重建。
+    """
+
+    def __init__(self, region=None, monitor=1):
+        import mss  # noqa: F401  可选依赖，缺失时由 create_capture 回退
+
+        super().__init__(region)
+        self.monitor = monitor
+        self._sct = None
+        self._owner = None
+
+    def _handle(self):
+        ident = threading.get_ident()
+        if self._sct is None or self._owner != ident:
+            import mss
+
+            if self._sct is not None:
+                try:
+                    self._sct.close()
+                except Exception:
+                    pass
+            self._sct = mss.mss()
+            self._owner = ident
+        return self._sct
+
+    def grab(self):
+        sct = self._handle()
+        if self.region is None:
+            mon = sct.monitors[self.monitor]
+            area = {"left": mon["left"], "top": mon["top"], "width": mon["width"], "height": mon["height"]}
+        else:
+            left, top, width, height = self.region
+            area = {"left": left, "top": top, "width": width, "height": height}
+        shot = sct.grab(area)
+        bgra = np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+        buf = self._ensure_buffer(shot.height, shot.width)
+        cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR, dst=buf)
+        self.offset = (area["left"], area["top"])
+        return buf
+
+    def close(self):
+        if self._sct is not None:
+            try:
+                self._sct.close()
+            except Exception:
+                pass
+        self._sct = None
+        super().close()
+
+
+class PyAutoGuiCapture(CaptureBackend):
+    """基于 pyautogui 的截图后端（兼容原有实现）。"""
+
+    def grab(self):
+        import pyautogui
+
+        shot = pyautogui.screenshot(region=self.region)
+        rgb = np.asarray(shot)
+        buf = self._ensure_buffer(rgb.shape[0], rgb.shape[1])
+        cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR, dst=buf)
+        return buf
+
+
+class FakeCapture(CaptureBackend):
+    """回放内存中合成帧的截图后端。
+
+    frames: BGR 帧列表（均视为整屏截图，region 会在其上裁剪）。
+    loop: 帧用完后是否从头循环；否则一直返回最后一帧。
+    """
+
+    def __init__(self, frames=(), region=None, loop=False):
+        super().__init__(region)
+        self.frames = list(frames)
+        self.loop = loop
+        self.index = 0
+        self.grab_count = 0
+
+    def push(self, frame):
+        """追加一帧到回放队列末尾。"""
+        self.frames.append(frame)
+
+    def grab(self):
+        if not self.frames:
+            raise RuntimeError("FakeCapture 没有可回放的帧")
+        if self.index >= len(self.frames):
+            self.index = 0 if self.loop else len(self.frames) - 1
+        frame = self.frames[self.index]
+        self.index += 1
+        self.grab_count += 1
+
+        if self.region is not None:
+            left, top, width, height = self.region
+            frame = frame[top:top + height, left:left + width]
+        buf = self._ensure_buffer(frame.shape[0], frame.shape[1])
+        np.copyto(buf, frame)
+        return buf
+
+    def grab_patch(self, x, y, width, height):
+        # 从“当前屏幕”（最近一次回放的帧）读取，不推进回放进度
+        frame = self.frames[max(self.index - 1, 0)]
+        left = self.offset[0] + x
+        top = self.offset[1] + y
+        return frame[top:top + height, left:left + width].copy()
+
+
+def create_capture(name="auto", region=None):
+    """按名称创建截图后端。
+
+    name: "auto"（优先 mss，失败回退 pyautogui）、"mss"、"pyautogui"
+    """
+    if name in ("auto", "mss"):
+        try:
+            return MssCapture(region=region)
+        except ImportError:
+            if name == "mss":
+                raise
+    if name in ("auto", "pyautogui"):
+        return PyAutoGuiCapture(region=region)
+    raise ValueError(f"未知的截图后端: {name}")
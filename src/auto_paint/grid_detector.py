@@ -0,0 +1,109 @@
+"""精确颜色网格检测器。
+
+generate_color 生成的模板总是 PIXEL_SIZE×PIXEL_SIZE 的色块：中央 UNIT_SIZE×UNIT_SIZE 为调色板颜色，
+四周一圈为纯色 BACKGROUND。与其在整屏上跑 TM_CCOEFF_NORMED，不如直接做颜色相等判断：
+1. cv2.inRange 得到中央颜色掩码与背景掩码（支持容差）
+2. 对颜色掩码做连通域分析，保留尺寸接近 UNIT_SIZE 的色块
+3. 用背景掩码的积分图一次性算出每个色块外圈中背景像素的占比，作为匹配分数
+
+返回与 AutoPainter._get_matches 相同的匹配结构化数组（见 matches.py），其中 (x, y) 为模板左上角。
+"""
+import cv2
+import numpy as np
+
+from src.auto_paint.matches import make_matches, empty_matches
+
+__all__ = ["GridColorDetector", "in_range", "unit_components", "ring_scores"]
+
+
+def in_range(frame, color, tolerance):
+    """返回 frame 中每通道与 color 相差不超过 tolerance 的像素掩码（0/255）。"""
+    color = np.asarray(color, dtype=np.int16)
+    lower = np.clip(color - tolerance, 0, 255).astype(np.uint8)
+    upper = np.clip(color + tolerance, 0, 255).astype(np.uint8)
+    return cv2.inRange(frame, lower, upper)
+
+
+def unit_components(mask, unit, size_tolerance):
+    """对掩码做连通域分析，返回边长接近 unit 的色块 (xs, ys, ws, hs)；没有则返回 None。"""
+    count, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    if count <= 1:
+        return None
+
+    # 第 0 个连通域是掩码背景，跳过
+    stats = stats[1:]
+    xs = stats[:, cv2.CC_STAT_LEFT]
+    ys = stats[:, cv2.CC_STAT_TOP]
+    ws = stats[:, cv2.CC_STAT_WIDTH]
+    hs = stats[:, cv2.CC_STAT_HEIGHT]
+    low = unit * (1 - size_tolerance)
+    high = unit * (1 + size_tolerance)
+    keep = (ws >= low) & (ws <= high) & (hs >= low) & (hs <= high)
+    if not keep.any():
+        return None
+    return xs[keep], ys[keep], ws[keep], hs[keep]
+
+
+def ring_scores(bg_mask, xs, ys, ws, hs, unit):
+    """计算每个色块外圈（向四周扩展 unit 像素的方框减去色块本身）中背景像素的占比。"""
+    frame_h, frame_w = bg_mask.shape[:2]
+    ox0 = np.clip(xs - unit, 0, frame_w)
+    oy0 = np.clip(ys - unit, 0, frame_h)
+    ox1 = np.clip(xs + ws + unit, 0, frame_w)
+    oy1 = np.clip(ys + hs + unit, 0, frame_h)
+
+    integral = cv2.integral(bg_mask // 255)
+
+    def box_sum(x0, y0, x1, y1):
+        return integral[y1, x1] - integral[y0, x1] - integral[y1, x0] + integral[y0, x0]
+
+    outer = box_sum(ox0, oy0, ox1, oy1)
+    inner = box_sum(xs, ys, xs + ws, ys + hs)
+    # 外圈面积按理想尺寸计算，贴近屏幕边缘被截断的色块分数会相应降低
+    ring_area = (ws + 2 * unit) * (hs + 2 * unit) - ws * hs
+    return (outer - inner) / ring_area
+
+
+class GridColorDetector:
+    """基于颜色相等 + 背景外圈校验的检测器。
+
+    color_tolerance: 中央颜色每通道允许的误差
+    background_tolerance: 背景颜色每通道允许的误差
+    size_tolerance: 色块边长相对 UNIT_SIZE 允许的偏差比例
+    """
+
+    def __init__(self, color_tolerance=2, background_tolerance=6, size_tolerance=0.35):
+        self.color_tolerance = color_tolerance
+        self.background_tolerance = background_tolerance
+        self.size_tolerance = size_tolerance
+
+    @staticmethod
+    def describe_template(template):
+        """从模板中取出 (中央颜色 BGR, 背景颜色 BGR, unit 边长)。"""
+        height, width = template.shape[:2]
+        unit = min(height, width) // 3
+        color = template[height // 2, width // 2].astype(np.int16)
+        background = template[0, 0].astype(np.int16)
+        return color, background, unit
+
+    def detect(self, frame, template, threshold):
+        """在 frame 中查找 template 对应的色块，返回匹配结构化数组。"""
+        color, background, unit = self.describe_template(template)
+        if unit <= 0:
+            return empty_matches()
+
+        color_mask = in_range(frame, color, self.color_tolerance)
+        boxes = unit_components(color_mask, unit, self.size_tolerance)
+        if boxes is None:
+            return empty_matches()
+        xs, ys, ws, hs = boxes
+
+        bg_mask = in_range(frame, background, self.background_tolerance)
+        scores = ring_scores(bg_mask, xs, ys, ws, hs, unit)
+
+        ok = scores >= threshold
+        # 以色块中心反推模板左上角，使 _click 计算出的中心落在色块中心
+        tpl_h, tpl_w = template.shape[:2]
+        left = xs + ws // 2 - tpl_w // 2
+        top = ys + hs // 2 - tpl_h // 2
+        return make_matches(left[ok], top[ok], scores[ok])
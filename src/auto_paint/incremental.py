@@ -0,0 +1,131 @@
+"""脏块增量匹配。
+
+相邻两帧之间，屏幕上绝大部分区域不变：只有刚点击过的像素和少量 UI 会变化。
+IncrementalMatcher 把帧划分为 tile_size×tile_size 的块，与上一帧做一次向量化差分找出变化的块，
+只对这些块（外加模板大小的边缘）重新匹配，其余块沿用上一帧的匹配结果。
+"""
+import hashlib
+
+import cv2
+import numpy as np
+
+from src.auto_paint.matches import empty_matches
+
+__all__ = ["IncrementalMatcher"]
+
+
+class IncrementalMatcher:
+    """包装一个整帧匹配函数，使其只在变化的块上重新计算。
+
+    match_fn(frame, template, threshold) -> 匹配结构化数组
+    tile_size: 分块边长（像素）
+    full_ratio: 变化块占比超过该值时直接整帧匹配
+    """
+
+    def __init__(self, match_fn, tile_size=128, full_ratio=0.5):
+        self.match_fn = match_fn
+        self.tile_size = tile_size
+        self.full_ratio = full_ratio
+        self.reset()
+
+    def reset(self):
+        """丢弃缓存的上一帧与匹配结果，下一次 match 将整帧匹配。"""
+        self._prev = None
+        self._matches = empty_matches()
+        self._key = None
+        # 统计信息：最近一次 match 重新计算的块数 / 总块数
+        self.last_dirty = 0
+        self.last_total = 0
+
+    def match(self, frame, template, threshold):
+        key = (hashlib.blake2b(template.tobytes(), digest_size=8).digest(), template.shape, threshold)
+        tile = self.tile_size
+        rows = -(-frame.shape[0] // tile)
+        cols = -(-frame.shape[1] // tile)
+        self.last_total = rows * cols
+
+        if self._prev is None or self._prev.shape != frame.shape or key != self._key:
+            return self._full(frame, template, threshold, key)
+
+        dirty = self._dirty_tiles(frame)
+        self.last_dirty = int(dirty.sum())
+        if not self.last_dirty:
+            return self._matches
+        if self.last_dirty > self.full_ratio * dirty.size:
+            return self._full(frame, template, threshold, key)
+
+        # 丢弃模板区域与变化块相交的旧匹配
+        tpl_h, tpl_w = template.shape[:2]
+        old = self._matches
+        xs = np.clip(old["x"], 0, frame.shape[1] - 1)
+        ys = np.clip(old["y"], 0, frame.shape[0] - 1)
+        tx0, ty0 = xs // tile, ys // tile
+        tx1 = np.minimum((xs + tpl_w - 1) // tile, cols - 1)
+        ty1 = np.minimum((ys + tpl_h - 1) // tile, rows - 1)
+        stale = dirty[ty0, tx0] | dirty[ty0, tx1] | dirty[ty1, tx0] | dirty[ty1, tx1]
+        fresh = [self._match_box(frame, template, threshold, *box) for box in self._dirty_runs(dirty, frame.shape)]
+        fresh = np.concatenate(fresh)
+        # 跨越两行变化块的模板会被两个矩形各找到一次，按坐标去重
+        _, first = np.unique(fresh[["y", "x"]], return_index=True)
+
+        self._matches = np.concatenate([old[~stale], fresh[first]])
+        self._remember(frame)
+        return self._matches
+
+    def _full(self, frame, template, threshold, key):
+        self._matches = self.match_fn(frame, template, threshold)
+        self._key = key
+        self.last_dirty = self.last_total
+        self._remember(frame)
+        return self._matches
+
+    def _remember(self, frame):
+        # 截图缓冲区会被复用，必须拷贝一份
+        if self._prev is None or self._prev.shape != frame.shape:
+            self._prev = frame.copy()
+        else:
+            np.copyto(self._prev, frame)
+
+    def _dirty_tiles(self, frame):
+        """返回 (rows, cols) 的布尔数组，标记与上一帧有差异的块。"""
+        height, width = frame.shape[:2]
+        tile = self.tile_size
+        # 三个通道展开为一行，先用 cv2.reduce 对每条横带按列求最大值，再在列方向按块合并
+        diff = cv2.absdiff(frame, self._prev).reshape(height, -1)
+        bands = np.vstack([cv2.reduce(diff[top:top + tile], 0, cv2.REDUCE_MAX) for top in range(0, height, tile)])
+        col_starts = np.arange(0, width * 3, tile * 3)
+        return np.maximum.reduceat(bands, col_starts, axis=1) > 0
+
+    def _dirty_runs(self, dirty, shape):
+        """把每一行中连续的变化块合并为一个像素矩形 (x0, y0, x1, y1)。"""
+        tile = self.tile_size
+        height, width = shape[:2]
+        for row in range(dirty.shape[0]):
+            cols = np.flatnonzero(dirty[row])
+            if not len(cols):
+                continue
+            # 按不连续处切分
+            for run in np.split(cols, np.flatnonzero(np.diff(cols) > 1) + 1):
+                yield (int(run[0]) * tile, row * tile,
+                       min((int(run[-1]) + 1) * tile, width), min((row + 1) * tile, height))
+
+    def _match_box(self, frame, template, threshold, x0, y0, x1, y1):
+        """重新匹配模板区域与矩形相交的所有位置。
+
+        左上角的有效范围为 [x0 - tpl_w + 1, x1 - 1]；再多留一个模板宽度的边缘，使非极大值抑制能看到邻居。
+        """
+        tpl_h, tpl_w = template.shape[:2]
+        height, width = frame.shape[:2]
+        rx0 = max(x0 - 2 * tpl_w + 1, 0)
+        ry0 = max(y0 - 2 * tpl_h + 1, 0)
+        rx1 = min(x1 + 2 * tpl_w - 1, width)
+        ry1 = min(y1 + 2 * tpl_h - 1, height)
+        if rx1 - rx0 < tpl_w or ry1 - ry0 < tpl_h:
+            return empty_matches()
+
+        found = self.match_fn(frame[ry0:ry1, rx0:rx1], template, threshold).copy()
+        found["x"] += rx0
+        found["y"] += ry0
+        keep = ((found["x"] > x0 - tpl_w) & (found["x"] < x1)
+                & (found["y"] > y0 - tpl_h) & (found["y"] < y1))
+        return found[keep]
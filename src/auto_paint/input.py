@@ -0,0 +1,201 @@
+"""鼠标输入后端与点击限速。
+
+AutoPainter 通过 InputBackend.click(x, y) 点击屏幕坐标，不再直接调用 pyautogui.moveTo / click：
+pyautogui 每次调用后会 sleep PAUSE（默认 0.1 秒），点击速度由库默认值决定而不是由配置决定。
+- NativeInput: Windows 下用 user32 SendInput，Linux/X11 下用 Xlib 的 XTest，无额外延迟，
+  可选依赖（pip install .[native]）
+- PyAutoGuiInput: 基于 pyautogui 的回退方案，关闭 PAUSE 与移动动画
+- RecordingInput: 只记录点击（可选回调模拟绘制效果），用于测试与基准
+
+速度由 TokenBucket 控制：rate 为每秒点击数，burst 为允许连续突发的点击数，rate 为 None 时不限速。
+"""
+import sys
+import time
+
+__all__ = [
+    "TokenBucket",
+    "InputBackend",
+    "NativeInput",
+    "PyAutoGuiInput",
+    "RecordingInput",
+    "create_input",
+]
+
+
+class TokenBucket:
+    """令牌桶限速器。
+
+    rate: 每秒补充的令牌数（即长期平均的每秒点击数）
+    burst: 桶容量，空闲后最多可连续点击的次数
+    clock / sleep: 可替换的时钟与等待函数，便于测试
+    """
+
+    def __init__(self, rate, burst=1, clock=time.monotonic, sleep=time.sleep):
+        if rate <= 0:
+            raise ValueError(f"rate 必须大于 0: {rate}")
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = float(self.burst)
+        self._stamp = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def wait_time(self):
+        """还需等待多少秒才能取到一个令牌。"""
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        """取一个令牌，不足时阻塞等待；返回等待的秒数。"""
+        waited = self.wait_time()
+        if waited > 0:
+            self.sleep(waited)
+            self._refill()
+        self.tokens -= 1
+        return waited
+
+
+class InputBackend:
+    """输入后端基类。
+
+    rate / burst: 见 TokenBucket；rate 为 None 表示不限速。
+    click_count: 已执行的点击次数。
+    """
+
+    def __init__(self, rate=None, burst=1):
+        self.limiter = TokenBucket(rate, burst) if rate else None
+        self.click_count = 0
+
+    def click(self, x, y):
+        """在屏幕坐标 (x, y) 处左键单击（超出速率时先等待）。"""
+        if self.limiter is not None:
+            self.limiter.acquire()
+        self._click(int(x), int(y))
+        self.click_count += 1
+
+    def _click(self, x, y):
+        raise NotImplementedError
+
+    def close(self):
+        """释放后端持有的资源。"""
+
+
+class NativeInput(InputBackend):
+    """直接调用系统接口注入鼠标事件。
+
+    Windows: user32.SetCursorPos + SendInput；Linux: X11 XTest（需要 Xlib，由 python3-xlib 提供）。
+    其余平台或依赖缺失时构造抛出 ImportError，由 create_input 回退。
+    """
+
+    def __init__(self, rate=None, burst=1):
+        super().__init__(rate, burst)
+        if sys.platform == "win32":
+            self._init_windows()
+        elif sys.platform.startswith("linux"):
+            self._init_xtest()
+        else:
+            raise ImportError(f"NativeInput 不支持当前平台: {sys.platform}")
+
+    def _init_windows(self):
+        import ctypes
+        from ctypes import wintypes
+
+        class MOUSEINPUT(ctypes.Structure):
+            _fields_ = [("dx", wintypes.LONG), ("dy", wintypes.LONG), ("mouseData", wintypes.DWORD),
+                        ("dwFlags", wintypes.DWORD), ("time", wintypes.DWORD),
+                        ("dwExtraInfo", ctypes.c_size_t)]
+
+        class INPUT(ctypes.Structure):
+            _fields_ = [("type", wintypes.DWORD), ("mi", MOUSEINPUT)]
+
+        user32 = ctypes.windll.user32
+        # 按下与抬起打包在一次 SendInput 中发送
+        events = (INPUT * 2)(INPUT(0, MOUSEINPUT(0, 0, 0, 0x0002, 0, 0)),
+                             INPUT(0, MOUSEINPUT(0, 0, 0, 0x0004, 0, 0)))
+        size = ctypes.sizeof(INPUT)
+
+        def click(x, y):
+            user32.SetCursorPos(x, y)
+            user32.SendInput(2, events, size)
+
+        self._click = click
+
+    def _init_xtest(self):
+        from Xlib import X, display
+        from Xlib.ext import xtest
+
+        self._display = display.Display()
+        if not self._display.has_extension("XTEST"):
+            self._display.close()
+            raise ImportError("X 服务器不支持 XTEST 扩展")
+
+        def click(x, y):
+            d = self._display
+            xtest.fake_input(d, X.MotionNotify, x=x, y=y)
+            xtest.fake_input(d, X.ButtonPress, 1)
+            xtest.fake_input(d, X.ButtonRelease, 1)
+            d.sync()
+
+        self._click = click
+
+    def close(self):
+        display = getattr(self, "_display", None)
+        if display is not None:
+            display.close()
+            self._display = None
+
+
+class PyAutoGuiInput(InputBackend):
+    """基于 pyautogui 的输入后端；每次点击不做 PAUSE 等待，也不做移动动画。"""
+
+    def __init__(self, rate=None, burst=1):
+        import pyautogui  # noqa: F401
+
+        super().__init__(rate, burst)
+
+    def _click(self, x, y):
+        import pyautogui
+
+        pyautogui.click(x, y, _pause=False)
+
+
+class RecordingInput(InputBackend):
+    """不操作真实鼠标，只记录点击。
+
+    clicks: [(时间, x, y), ...]，时间取自 clock
+    on_click(x, y): 可选回调，例如在 FakeCapture 的帧上画出点击效果
+    """
+
+    def __init__(self, rate=None, burst=1, on_click=None, clock=time.monotonic):
+        super().__init__(rate, burst)
+        self.on_click = on_click
+        self.clock = clock
+        self.clicks = []
+
+    def _click(self, x, y):
+        self.clicks.append((self.clock(), x, y))
+        if self.on_click is not None:
+            self.on_click(x, y)
+
+
+def create_input(name="auto", rate=None, burst=1):
+    """按名称创建输入后端。
+
+    name: "auto"（优先 native，失败回退 pyautogui）、"native"、"pyautogui"、"fake"
+    """
+    if name in ("auto", "native"):
+        try:
+            return NativeInput(rate, burst)
+        except Exception:
+            if name == "native":
+                raise
+    if name in ("auto", "pyautogui"):
+        return PyAutoGuiInput(rate, burst)
+    if name == "fake":
+        return RecordingInput(rate, burst)
+    raise ValueError(f"未知的输入后端: {name}")
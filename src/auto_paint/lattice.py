@@ -0,0 +1,269 @@
+"""像素网格推断与按格采样检测。
+
+wplace 的画布是规则网格，其间距（pitch）和相位只取决于当前缩放与平移。知道网格后，
+查找目标只需在每个格子中心读一个像素，而不必在每个屏幕位置上做 24×24 的相关运算。
+
+- estimate_lattice(frame): 由相邻像素的颜色跳变得到一维边缘分布，用 FFT 自相关求间距，
+  用三次谐波的相位求格子中心，再按采样结果消除间距（1/3、2 倍）与 1/3 格相位的歧义
+- LatticeDetector: 缓存网格，在格子中心采样中央颜色、在中心 ±pitch/3 处采样外圈背景；
+  采样到的外圈不再一致（地图被拖动或缩放）时重新推断网格
+- verify_lattice(frame, lattice): 间距是否为正方形、且至少有一个格子通过中央/外圈检查，
+  按推断的间距重新生成模板（AutoPainter.adaptive_scale）前先确认网格可信
+"""
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+from src.auto_paint.matches import make_matches, empty_matches
+
+__all__ = ["Lattice", "estimate_lattice", "verify_lattice", "LatticeDetector"]
+
+# pitch_*: 格子间距（像素，可为小数）；origin_*: 第一个格子中心的坐标（像素中心坐标系）
+Lattice = namedtuple("Lattice", "pitch_x pitch_y origin_x origin_y")
+
+# 外圈采样点相对格子中心的偏移（以 pitch/3 为单位）
+_RING = ((-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (1, -1), (-1, 1), (1, 1))
+_SMOOTH = np.array([0.25, 0.5, 0.25])
+
+
+def _edge_profile(frame, axis):
+    """沿 axis 方向统计相邻像素之间颜色跳变的次数，axis=1 得到每一列之间的边缘数。
+
+    每个通道分别计数后相加，再做轻微平滑，使小数间距下落在相邻整数位置上的边缘也能相互对齐。
+    """
+    if axis == 1:
+        diff = cv2.absdiff(frame[:, 1:], frame[:, :-1])
+    else:
+        diff = cv2.absdiff(frame[1:], frame[:-1])
+    _, changed = cv2.threshold(diff, 0, 1, cv2.THRESH_BINARY)
+    rows, cols = changed.shape[:2]
+    if axis == 1:
+        counts = cv2.reduce(changed.reshape(rows, -1), 0, cv2.REDUCE_SUM, dtype=cv2.CV_32S).reshape(cols, 3)
+    else:
+        counts = cv2.reduce(changed.reshape(rows, -1), 1, cv2.REDUCE_SUM, dtype=cv2.CV_32S)
+        return np.convolve(counts.ravel().astype(np.float64), _SMOOTH, mode="same")
+    return np.convolve(counts.sum(axis=1).astype(np.float64), _SMOOTH, mode="same")
+
+
+def _estimate_pitch(profile, min_pitch, max_pitch):
+    """由边缘分布的自相关估计间距，返回浮点间距；失败返回 None。"""
+    n = len(profile)
+    if n < 2 * min_pitch or not profile.any():
+        return None
+    centered = profile - profile.mean()
+    spectrum = np.fft.rfft(centered, n=2 * n)
+    # 除以重叠长度，去掉自相关随延迟线性衰减的影响
+    ac = np.fft.irfft(spectrum * np.conj(spectrum))[:n] / (n - np.arange(n))
+    hi = min(max_pitch, n // 2)
+    if hi <= min_pitch:
+        return None
+    peak = ac[min_pitch:hi + 1].max()
+    if peak <= 0:
+        return None
+    # 取第一个接近最大值的局部极大，避免选到间距的整数倍或 1/3 间距；
+    # 小数间距下峰值会分摊到相邻两个整数延迟上，因此阈值不能太高
+    base = None
+    for lag in range(min_pitch, hi + 1):
+        if ac[lag] >= 0.65 * peak and ac[lag] >= ac[lag - 1] and ac[lag] >= ac[lag + 1]:
+            base = lag
+            break
+    if base is None:
+        return None
+
+    # 用较远的整数倍峰值细化小数间距；倍数不超过 base/2，保证搜索窗口内不会出现相邻倍数的峰
+    multiple = max(1, min((n // 4) // base, base // 2))
+    around = base * multiple
+    reach = multiple // 2 + 1
+    lo, hi = max(around - reach, 1), min(around + reach, n - 2)
+    best = lo + int(np.argmax(ac[lo:hi + 1]))
+    # 抛物线插值得到亚像素峰值位置
+    a, b, c = ac[best - 1], ac[best], ac[best + 1]
+    denom = a - 2 * b + c
+    shift = 0.5 * (a - c) / denom if denom else 0.0
+    return (best + shift) / multiple
+
+
+def _third_harmonic_center(profile, pitch):
+    """由边缘分布的三次谐波相位求格子中心（模 pitch/3）。
+
+    中央色块的边缘位于中心 ±pitch/6，格子边界位于中心 ±pitch/2，二者在三次谐波上同相。
+    坐标以像素边界计：像素 i 占 [i, i+1)，profile[i] 是像素 i 与 i+1 之间的边缘，位于 i+1。
+    """
+    positions = np.arange(len(profile)) + 1.0
+    z = np.sum(profile * np.exp(-2j * np.pi * 3 * positions / pitch))
+    angle = np.angle(z)
+    return ((np.pi - angle) / (2 * np.pi) * pitch / 3) % (pitch / 3)
+
+
+def _sample_grid(frame, lattice):
+    """返回格子中心的采样坐标 (ys, xs)（整数），只保留外圈采样点也在帧内的格子。
+
+    中心坐标以像素边界计。偶数间距时中心落在两个像素之间，取右（下）侧像素，
+    与模板中心像素 左上角 + 边长 // 2 的约定一致，各引擎因此给出相同的左上角。
+    """
+    height, width = frame.shape[:2]
+    px, py = lattice.pitch_x, lattice.pitch_y
+    margin_x, margin_y = px / 3, py / 3
+    xs = np.arange(lattice.origin_x, width, px)
+    ys = np.arange(lattice.origin_y, height, py)
+    xs = xs[(xs - margin_x >= 0) & (xs + margin_x <= width - 1)]
+    ys = ys[(ys - margin_y >= 0) & (ys + margin_y <= height - 1)]
+    return np.floor(ys + 0.25).astype(np.intp), np.floor(xs + 0.25).astype(np.intp)
+
+
+def _ring_samples(frame, lattice, ys, xs):
+    """返回 (中心采样 (ny, nx, 3), 外圈采样 (8, ny, nx, 3))。"""
+    center = frame[ys[:, None], xs[None, :]]
+    dx = int(round(lattice.pitch_x / 3))
+    dy = int(round(lattice.pitch_y / 3))
+    ring = np.stack([frame[(ys + oy * dy)[:, None], (xs + ox * dx)[None, :]] for ox, oy in _RING])
+    return center, ring
+
+
+def _alignment(frame, lattice):
+    """外圈采样完全一致的格子占比；网格对齐时几乎所有格子的外圈都落在同一格内。"""
+    ys, xs = _sample_grid(frame, lattice)
+    if not len(ys) or not len(xs):
+        return 0.0
+    _, ring = _ring_samples(frame, lattice, ys, xs)
+    uniform = (ring == ring[:1]).all(axis=(0, 3))
+    return float(uniform.mean())
+
+
+def _pitch_candidates(pitch, min_pitch):
+    """自相关给出的间距及其可能的真实值。
+
+    目标稀疏时，中央色块（pitch/3）的边缘可能比格子边界更突出，自相关会选中 1/3 间距；
+    只有隔行出现目标时又可能选中两倍间距。三者都交给采样打分决定。
+    """
+    candidates = [pitch, pitch * 3]
+    if pitch / 2 >= min_pitch:
+        candidates.append(pitch / 2)
+    return candidates
+
+
+def _pack(frame):
+    """把 BGR 帧打包为 (h, w) int32，便于反复按格子采样比较颜色。"""
+    packed = frame[..., 0].astype(np.int32) << 16
+    packed |= frame[..., 1].astype(np.int32) << 8
+    packed |= frame[..., 2]
+    return packed
+
+
+def _center_score(packed, lattice):
+    """中央颜色与上下左右外圈都不同的格子数；网格正确时即为帧内色块数。packed 为 _pack 的结果。"""
+    ys, xs = _sample_grid(packed, lattice)
+    if not len(ys) or not len(xs):
+        return -1
+    center = packed[ys[:, None], xs[None, :]]
+    dx = int(round(lattice.pitch_x / 3))
+    dy = int(round(lattice.pitch_y / 3))
+    differs = np.ones(center.shape, dtype=bool)
+    for ox, oy in _RING[:4]:
+        differs &= packed[(ys + oy * dy)[:, None], (xs + ox * dx)[None, :]] != center
+    return int(np.count_nonzero(differs))
+
+
+def estimate_lattice(frame, min_pitch=6, max_pitch=240):
+    """从一帧推断画布网格，失败返回 None。"""
+    profile_x = _edge_profile(frame, 1)
+    profile_y = _edge_profile(frame, 0)
+    pitch_x = _estimate_pitch(profile_x, min_pitch, max_pitch)
+    pitch_y = _estimate_pitch(profile_y, min_pitch, max_pitch)
+    if pitch_x is None or pitch_y is None:
+        return None
+
+    # 每个候选间距各自求中心；三次谐波只确定到 1/3 格，逐一尝试：
+    # 正确的间距与中心处，中央颜色与四周外圈都不同
+    height, width = frame.shape[:2]
+    packed = _pack(frame)
+    best, best_score = None, -1
+    for px in _pitch_candidates(pitch_x, min_pitch):
+        if px > min(max_pitch, width // 2):
+            continue
+        cx = _third_harmonic_center(profile_x, px)
+        for py in _pitch_candidates(pitch_y, min_pitch):
+            if py > min(max_pitch, height // 2):
+                continue
+            cy = _third_harmonic_center(profile_y, py)
+            for kx in range(3):
+                for ky in range(3):
+                    candidate = Lattice(float(px), float(py),
+                                        float(cx + kx * px / 3), float(cy + ky * py / 3))
+                    score = _center_score(packed, candidate)
+                    if score > best_score:
+                        best, best_score = candidate, score
+    return best
+
+
+def verify_lattice(frame, lattice, square_tolerance=0.05):
+    """网格是否可信：两个方向的间距一致（画布像素是正方形），且至少一个格子通过中央/外圈检查。"""
+    if abs(lattice.pitch_x - lattice.pitch_y) > square_tolerance * max(lattice.pitch_x, lattice.pitch_y):
+        return False
+    return _center_score(_pack(frame), lattice) > 0
+
+
+class LatticeDetector:
+    """基于网格采样的检测器，复杂度为 O(格子数)。
+
+    color_tolerance / background_tolerance: 中央颜色与外圈背景每通道允许的误差
+    realign_drop: 外圈一致率比推断网格时下降超过该值时，认为地图被拖动或缩放，重新推断
+    """
+
+    def __init__(self, color_tolerance=2, background_tolerance=6, realign_drop=0.1):
+        self.color_tolerance = color_tolerance
+        self.background_tolerance = background_tolerance
+        self.realign_drop = realign_drop
+        self.reset()
+
+    def reset(self):
+        """丢弃缓存的网格。"""
+        self.lattice = None
+        self._baseline = 0.0
+        self._shape = None
+        self._verified = False
+
+    def ensure_lattice(self, frame):
+        """返回 frame 对应的网格（可能为 None），网格仍对齐时直接复用缓存。"""
+        if self.lattice is not None and self._shape == frame.shape:
+            if _alignment(frame, self.lattice) >= self._baseline - self.realign_drop:
+                return self.lattice
+        self.lattice = estimate_lattice(frame)
+        self._shape = frame.shape
+        self._baseline = _alignment(frame, self.lattice) if self.lattice is not None else 0.0
+        self._verified = False
+        return self.lattice
+
+    def verified_lattice(self, frame):
+        """同 ensure_lattice，但只返回通过 verify_lattice 的网格，否则返回 None。
+
+        检查结果随缓存的网格保存；未通过时每帧重新检查，画面上出现色块后即可通过。
+        """
+        lattice = self.ensure_lattice(frame)
+        if lattice is None:
+            return None
+        if not self._verified:
+            self._verified = verify_lattice(frame, lattice)
+        return lattice if self._verified else None
+
+    def detect(self, frame, template, threshold):
+        """返回匹配结构化数组，(x, y) 为以格子中心对齐的模板左上角。"""
+        lattice = self.ensure_lattice(frame)
+        if lattice is None:
+            return empty_matches()
+        ys, xs = _sample_grid(frame, lattice)
+        if not len(ys) or not len(xs):
+            return empty_matches()
+
+        tpl_h, tpl_w = template.shape[:2]
+        color = template[tpl_h // 2, tpl_w // 2].astype(np.int16)
+        background = template[0, 0].astype(np.int16)
+
+        center, ring = _ring_samples(frame, lattice, ys, xs)
+        is_color = (np.abs(center.astype(np.int16) - color) <= self.color_tolerance).all(axis=2)
+        is_bg = (np.abs(ring.astype(np.int16) - background) <= self.background_tolerance).all(axis=3)
+        scores = is_bg.mean(axis=0)
+
+        hit_y, hit_x = np.nonzero(is_color & (scores >= threshold))
+        return make_matches(xs[hit_x] - tpl_w // 2, ys[hit_y] - tpl_h // 2, scores[hit_y, hit_x])
@@ -0,0 +1,72 @@
+"""匹配结果的紧凑表示与向量化后处理。
+
+所有检测引擎都返回 MATCH_DTYPE 结构化数组，字段 x/y 为模板左上角（帧内坐标），score 为匹配分数。
+"""
+import cv2
+import numpy as np
+
+__all__ = [
+    "MATCH_DTYPE",
+    "make_matches",
+    "empty_matches",
+    "peaks_from_result",
+    "row_major",
+    "next_row_major",
+]
+
+MATCH_DTYPE = np.dtype([("x", np.int32), ("y", np.int32), ("score", np.float32)])
+
+
+def make_matches(xs, ys, scores):
+    """由三个等长数组构造匹配结构化数组。"""
+    matches = np.empty(len(xs), dtype=MATCH_DTYPE)
+    matches["x"] = xs
+    matches["y"] = ys
+    matches["score"] = scores
+    return matches
+
+
+def empty_matches():
+    return np.empty(0, dtype=MATCH_DTYPE)
+
+
+def peaks_from_result(result, threshold, window):
+    """对 matchTemplate 的结果图做向量化非极大值抑制。
+
+    window: (高, 宽)，通常为模板尺寸；每个窗口内只保留分数最高的一个峰值。
+    先用 dilate 求窗口内最大值得到局部极大点；相邻的局部极大点互在对方窗口内，分数必然相同，
+    构成一个平台，按 8 连通域合并，每个平台只保留行优先顺序的第一个点。
+    """
+    candidates = np.where(result >= threshold, result, np.float32(-1))
+    kernel = np.ones((max(1, window[0]), max(1, window[1])), dtype=np.uint8)
+    local_max = cv2.dilate(candidates, kernel)
+    peaks = ((candidates >= threshold) & (candidates == local_max)).astype(np.uint8)
+    ys, xs = np.nonzero(peaks)
+    if len(xs) == 0:
+        return empty_matches()
+
+    _, labels = cv2.connectedComponents(peaks, connectivity=8)
+    # np.nonzero 按行优先返回，return_index 即每个平台的第一个点
+    _, first = np.unique(labels[ys, xs], return_index=True)
+    return make_matches(xs[first], ys[first], result[ys[first], xs[first]])
+
+
+def row_major(matches):
+    """按行优先（先 y 再 x）排序后返回新数组。"""
+    return matches[np.lexsort((matches["x"], matches["y"]))]
+
+
+def next_row_major(matches, last_found):
+    """返回按行优先顺序排在 last_found 之后的第一个匹配的下标；没有则回到第一个。
+
+    matches 必须已按 row_major 排序。
+    """
+    if last_found is None or len(matches) == 0:
+        return 0
+    lx, ly = last_found
+    ys = matches["y"]
+    # 先定位同一行，再在该行内二分查找 x
+    start = np.searchsorted(ys, ly, side="left")
+    end = np.searchsorted(ys, ly, side="right")
+    idx = start + np.searchsorted(matches["x"][start:end], lx, side="right")
+    return int(idx) if idx < len(matches) else 0
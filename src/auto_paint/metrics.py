@@ -0,0 +1,150 @@
+"""绘制循环的分阶段计时。
+
+PaintMetrics 记录每个阶段（截图、匹配、选择、点击、等待……）最近 window 次的耗时，
+以及帧与点击的时间戳，由此给出分位数、每秒帧数与每秒点击数。开销为每阶段一次 perf_counter
+与一次 deque.append，可以一直开着；运行中在 GUI 状态栏显示，结束后导出为 JSON / CSV 用于调参。
+"""
+import csv
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+__all__ = ["PaintMetrics"]
+
+# 状态栏中显示的阶段名
+_LABELS = {
+    "capture": "截图",
+    "scale": "缩放",
+    "match": "匹配",
+    "classify": "分类",
+    "sample": "采样",
+    "select": "选择",
+    "click": "点击",
+    "sleep": "等待",
+    "recharge": "恢复",
+    "record": "录制",
+    "background": "背景",
+}
+
+
+class PaintMetrics:
+    """分阶段计时器（可跨线程记录）。
+
+    window: 每个阶段保留的最近样本数，分位数与速率都按该窗口计算
+    """
+
+    def __init__(self, window=512):
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        """清空全部记录，开始新的会话。"""
+        self.started = time.monotonic()
+        self._samples = {}
+        self._totals = {}
+        self._frames = deque(maxlen=self.window)
+        self._clicks = deque(maxlen=self.window)
+        self.frame_count = 0
+        self.click_count = 0
+
+    @contextmanager
+    def stage(self, name):
+        """计时 with 语句块，记入阶段 name。"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        samples = self._samples.get(name)
+        if samples is None:
+            samples = self._samples.setdefault(name, deque(maxlen=self.window))
+            self._totals.setdefault(name, [0, 0.0])
+        samples.append(seconds)
+        totals = self._totals[name]
+        totals[0] += 1
+        totals[1] += seconds
+
+    def frame(self):
+        """记一帧截图。"""
+        self._frames.append(time.monotonic())
+        self.frame_count += 1
+
+    def click(self):
+        """记一次点击。"""
+        self._clicks.append(time.monotonic())
+        self.click_count += 1
+
+    @staticmethod
+    def _rate(stamps):
+        if len(stamps) < 2:
+            return 0.0
+        span = stamps[-1] - stamps[0]
+        return (len(stamps) - 1) / span if span > 0 else 0.0
+
+    def fps(self):
+        """最近窗口内的每秒帧数。"""
+        return self._rate(list(self._frames))
+
+    def clicks_per_second(self):
+        """最近窗口内的每秒点击数。"""
+        return self._rate(list(self._clicks))
+
+    def percentiles(self, name, qs=(50, 90, 99)):
+        """阶段 name 最近窗口内耗时的分位数（毫秒），{q: ms}；没有样本时返回空 dict。"""
+        samples = self._samples.get(name)
+        if not samples:
+            return {}
+        values = np.percentile(np.fromiter(samples, dtype=np.float64), qs) * 1000
+        return {q: float(v) for q, v in zip(qs, values)}
+
+    def summary(self):
+        """当前统计的字典形式。"""
+        stages = {}
+        for name, (count, total) in list(self._totals.items()):
+            p = self.percentiles(name)
+            stages[name] = {
+                "count": count,
+                "total_ms": total * 1000,
+                "mean_ms": total * 1000 / count if count else 0.0,
+                "p50_ms": p.get(50, 0.0),
+                "p90_ms": p.get(90, 0.0),
+                "p99_ms": p.get(99, 0.0),
+            }
+        return {
+            "elapsed_s": time.monotonic() - self.started,
+            "frames": self.frame_count,
+            "clicks": self.click_count,
+            "fps": self.fps(),
+            "clicks_per_second": self.clicks_per_second(),
+            "stages": stages,
+        }
+
+    def status_line(self):
+        """一行简要统计，用于状态栏。"""
+        parts = [f"{self.fps():.1f} 帧/秒", f"{self.clicks_per_second():.1f} 点击/秒"]
+        for name in ("capture", "match", "classify", "sample", "click"):
+            p = self.percentiles(name, (50,))
+            if p:
+                parts.append(f"{_LABELS[name]} {p[50]:.1f}ms")
+        return " | ".join(parts)
+
+    def export(self, path):
+        """按扩展名写出 JSON（默认）或 CSV（每个阶段一行）。"""
+        summary = self.summary()
+        if str(path).lower().endswith(".csv"):
+            fields = ["stage", "count", "total_ms", "mean_ms", "p50_ms", "p90_ms", "p99_ms"]
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=fields)
+                writer.writeheader()
+                for name, row in summary["stages"].items():
+                    writer.writerow({"stage": name, **row})
+                for key in ("elapsed_s", "frames", "clicks", "fps", "clicks_per_second"):
+                    writer.writerow({"stage": key, "count": summary[key]})
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(summary, f, ensure_ascii=False, indent=2)
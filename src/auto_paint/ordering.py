@@ -0,0 +1,149 @@
+"""点击顺序。
+
+行优先顺序每到行尾都要把鼠标拉回最左边，目标稀疏时大部分时间花在移动上。这里每帧建一次索引，
+再按以下顺序之一给出接下来要点击的目标，并保持“从 last_found 之后继续”的语义：
+
+- "row": 行优先（先 y 再 x），与原来的顺序一致
+- "serpentine": 蛇形，按行分组后偶数行向右、奇数行向左
+- "nearest": 贪心最近邻，从 last_found（即鼠标当前位置）出发每次走到最近的未点击目标，
+  最近邻由网格分桶的 GridIndex 查询
+"""
+import numpy as np
+
+from src.auto_paint.matches import row_major, next_row_major
+
+__all__ = ["ORDERS", "GridIndex", "serpentine", "next_serpentine", "plan_order"]
+
+ORDERS = ("row", "serpentine", "nearest")
+
+
+def _serpentine_keys(xs, ys, row_height):
+    rows = ys.astype(np.int64) // max(int(row_height), 1)
+    # 奇数行 x 取反，使同一行内按相反方向排序
+    along = np.where(rows % 2 == 0, xs, -xs.astype(np.int64))
+    return rows, along
+
+
+def serpentine(matches, row_height):
+    """按蛇形顺序排序后返回新数组；row_height 内的 y 视为同一行（一般取模板高度）。"""
+    rows, along = _serpentine_keys(matches["x"], matches["y"], row_height)
+    return matches[np.lexsort((along, rows))]
+
+
+def next_serpentine(matches, last_found, row_height):
+    """返回按蛇形顺序排在 last_found 之后的第一个匹配的下标；没有则回到第一个。
+
+    matches 必须已按 serpentine 排序。
+    """
+    if last_found is None or len(matches) == 0:
+        return 0
+    rows, along = _serpentine_keys(matches["x"], matches["y"], row_height)
+    last_row, last_along = _serpentine_keys(np.array([last_found[0]]), np.array([last_found[1]]), row_height)
+    start = np.searchsorted(rows, last_row[0], side="left")
+    end = np.searchsorted(rows, last_row[0], side="right")
+    idx = start + np.searchsorted(along[start:end], last_along[0], side="right")
+    return int(idx) if idx < len(matches) else 0
+
+
+class GridIndex:
+    """把点按 cell×cell 的网格分桶，支持“查询最近点并删除”。
+
+    查询从所在格开始逐圈向外扩展，已找到的最近距离不超过已查范围的半径时即停止，
+    每次查询只访问附近的桶，与总点数无关。
+    """
+
+    def __init__(self, xs, ys, cell):
+        self.xs = np.asarray(xs, dtype=np.int64)
+        self.ys = np.asarray(ys, dtype=np.int64)
+        self.cell = max(int(cell), 1)
+        self.alive = np.ones(len(self.xs), dtype=bool)
+        self.remaining = len(self.xs)
+
+        cx = self.xs // self.cell
+        cy = self.ys // self.cell
+        self._buckets = {}
+        if len(self.xs):
+            order = np.lexsort((cx, cy))
+            keys = np.stack([cx[order], cy[order]], axis=1)
+            uniq, starts = np.unique(keys, axis=0, return_index=True)
+            bounds = list(starts[1:]) + [len(order)]
+            for (bx, by), lo, hi in zip(uniq.tolist(), starts.tolist(), bounds):
+                self._buckets[(bx, by)] = order[lo:hi]
+            self._min = (int(cx.min()), int(cy.min()))
+            self._max = (int(cx.max()), int(cy.max()))
+
+    def _ring(self, bx, by, r):
+        if r == 0:
+            yield bx, by
+            return
+        for dx in range(-r, r + 1):
+            yield bx + dx, by - r
+            yield bx + dx, by + r
+        for dy in range(-r + 1, r):
+            yield bx - r, by + dy
+            yield bx + r, by + dy
+
+    def nearest(self, x, y):
+        """返回离 (x, y) 最近的未删除点的下标，没有则返回 None。"""
+        if not self.remaining:
+            return None
+        bx, by = int(x) // self.cell, int(y) // self.cell
+        # 查询点可能在所有桶之外，最多扩展到能覆盖全部桶的圈数
+        limit = max(abs(bx - self._min[0]), abs(bx - self._max[0]),
+                    abs(by - self._min[1]), abs(by - self._max[1])) + 1
+        best, best_d = None, None
+        for r in range(limit + 1):
+            for key in self._ring(bx, by, r):
+                members = self._buckets.get(key)
+                if members is None:
+                    continue
+                members = members[self.alive[members]]
+                if not len(members):
+                    continue
+                d = (self.xs[members] - x) ** 2 + (self.ys[members] - y) ** 2
+                i = int(np.argmin(d))
+                if best_d is None or d[i] < best_d:
+                    best, best_d = int(members[i]), int(d[i])
+            # 第 r 圈之外的点距离至少为 r*cell
+            if best_d is not None and best_d <= (r * self.cell) ** 2:
+                break
+        return best
+
+    def remove(self, i):
+        if self.alive[i]:
+            self.alive[i] = False
+            self.remaining -= 1
+
+
+def plan_order(matches, last_found, count, order="row", row_height=1):
+    """从一帧的匹配中按 order 取出接下来最多 count 个目标，返回按点击顺序排列的新数组。
+
+    last_found: 上一次点击的左上角 (x, y)，None 表示从头开始；
+      "row" / "serpentine" 从它之后继续，"nearest" 从它的位置出发且不再选它本身。
+    """
+    if order not in ORDERS:
+        raise ValueError(f"未知的点击顺序: {order}")
+    if len(matches) == 0 or count <= 0:
+        return matches[:0]
+    if order == "row":
+        ordered = row_major(matches)
+        return np.roll(ordered, -next_row_major(ordered, last_found))[:count]
+    if order == "serpentine":
+        ordered = serpentine(matches, row_height)
+        return np.roll(ordered, -next_serpentine(ordered, last_found, row_height))[:count]
+
+    index = GridIndex(matches["x"], matches["y"], 4 * max(int(row_height), 1))
+    x, y = last_found if last_found is not None else (0, 0)
+    if last_found is not None:
+        same = np.nonzero((index.xs == x) & (index.ys == y))[0]
+        if len(same) and len(same) < len(matches):
+            index.remove(int(same[0]))
+    picked = []
+    while len(picked) < count:
+        i = index.nearest(x, y)
+        if i is None:
+            break
+        picked.append(i)
+        index.remove(i)
+        x, y = int(index.xs[i]), int(index.ys[i])
+    return matches[np.array(picked, dtype=np.intp)]
@@ -0,0 +1,83 @@
+"""单次遍历的多颜色分类器。
+
+逐颜色跑模板匹配时，绘制 N 种颜色需要 N 次整屏截图与匹配。这里对每帧只做一次：
+1. 非背景像素掩码 -> 连通域，保留尺寸接近 UNIT_SIZE 的色块
+2. 取每个色块中心像素，经调色板查找表（palette_lut.load_lut）一次查出最近色
+3. 背景外圈校验后按颜色分组
+
+返回 {颜色键: 匹配结构化数组}，坐标为模板左上角，与 AutoPainter._get_matches 的格式一致。
+"""
+import cv2
+import numpy as np
+
+from src import generate_color
+from src.palette_lut import load_lut
+from src.auto_paint.matches import make_matches
+from src.auto_paint.grid_detector import in_range, unit_components, ring_scores
+
+__all__ = ["PaletteClassifier"]
+
+
+class PaletteClassifier:
+    """把一帧中的所有候选色块一次性分类到调色板颜色。
+
+    colors: {颜色键: (r, g, b)}，默认使用 generate_color.palette_colors()
+    background: (r, g, b)，默认使用 generate_color.BACKGROUND
+    unit: 中央色块边长，默认 generate_color.UNIT_SIZE
+    color_tolerance: 中心像素每通道与调色板颜色允许的误差
+    lut: 与 colors 一致的 palette_lut.PaletteLUT，默认 load_lut(colors=colors)
+    """
+
+    def __init__(self, colors=None, background=None, unit=None,
+                 color_tolerance=2, background_tolerance=6, size_tolerance=0.35, lut=None):
+        if colors is None:
+            colors = generate_color.palette_colors()
+        self.names = list(colors.keys())
+        self.lut = lut if lut is not None else load_lut(colors=colors)
+        self.background = background if background is not None else generate_color.BACKGROUND
+        self.unit = unit if unit is not None else generate_color.UNIT_SIZE
+        self.color_tolerance = color_tolerance
+        self.background_tolerance = background_tolerance
+        self.size_tolerance = size_tolerance
+
+    @property
+    def template_size(self):
+        """对应模板的边长（PIXEL_SIZE）。"""
+        return self.unit * 3
+
+    def classify(self, frame, threshold, names=None):
+        """对一帧分类，返回 {颜色键: 匹配结构化数组}。
+
+        names: 只关心的颜色键集合，None 表示全部。
+        """
+        unit = self.unit
+        bg_mask = in_range(frame, self.background[::-1], self.background_tolerance)
+        boxes = unit_components(cv2.bitwise_not(bg_mask), unit, self.size_tolerance)
+        if boxes is None:
+            return {}
+        xs, ys, ws, hs = boxes
+
+        scores = ring_scores(bg_mask, xs, ys, ws, hs, unit)
+        ok = scores >= threshold
+        xs, ys, ws, hs, scores = xs[ok], ys[ok], ws[ok], hs[ok], scores[ok]
+        if len(xs) == 0:
+            return {}
+
+        # 每个色块取中心像素查表；超出 color_tolerance 的下标为 255，不属于任何颜色
+        cx = xs + ws // 2
+        cy = ys + hs // 2
+        nearest, _ = self.lut.classify(frame[cy, cx], self.color_tolerance)
+        within = nearest != 255
+
+        half = self.template_size // 2
+        left = cx - half
+        top = cy - half
+        wanted = None if names is None else set(names)
+        result = {}
+        for idx in np.unique(nearest[within]):
+            name = self.names[idx]
+            if wanted is not None and name not in wanted:
+                continue
+            sel = within & (nearest == idx)
+            result[name] = make_matches(left[sel], top[sel], scores[sel])
+        return result
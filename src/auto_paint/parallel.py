@@ -0,0 +1,68 @@
+"""多线程分带模板匹配。
+
+单次 cv2.matchTemplate 只用到一个大缓冲区，绘制机器上的大部分核心处于空闲。
+ParallelMatcher 把帧切成若干条上下重叠的横带，在线程池中并发匹配（OpenCV 计算期间会释放 GIL），
+再按左上角所在的横带合并结果：每个左上角只归属一条横带，接缝处不会重复。
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.auto_paint.matches import empty_matches
+
+__all__ = ["ParallelMatcher"]
+
+
+class ParallelMatcher:
+    """包装一个整帧匹配函数，使其在多条横带上并发执行。
+
+    match_fn(frame, template, threshold) -> 匹配结构化数组
+    workers: 线程数，None 表示 os.cpu_count()
+    bands: 横带条数，None 表示与 workers 相同
+    """
+
+    def __init__(self, match_fn, workers=None, bands=None):
+        self.match_fn = match_fn
+        self.workers = workers or os.cpu_count() or 1
+        self.bands = bands or self.workers
+        self._pool = None
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="match")
+        return self._pool
+
+    def close(self):
+        """关闭线程池。"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+    def split(self, height, tpl_h):
+        """返回每条横带负责的左上角行范围 [(y0, y1), ...]。"""
+        positions = height - tpl_h + 1
+        if positions <= 0:
+            return []
+        count = max(1, min(self.bands, positions // max(tpl_h, 1)))
+        edges = np.linspace(0, positions, count + 1).astype(int)
+        return [(int(a), int(b)) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+
+    def match(self, frame, template, threshold):
+        tpl_h = template.shape[0]
+        height = frame.shape[0]
+        ranges = self.split(height, tpl_h)
+        if len(ranges) <= 1:
+            return self.match_fn(frame, template, threshold)
+
+        def work(y0, y1):
+            # 横带需包含 [y0, y1) 内每个左上角对应的整块模板，再上下各多留一个模板高度给非极大值抑制
+            top = max(y0 - tpl_h, 0)
+            bottom = min(y1 + 2 * tpl_h - 1, height)
+            found = self.match_fn(frame[top:bottom], template, threshold).copy()
+            found["y"] += top
+            return found[(found["y"] >= y0) & (found["y"] < y1)]
+
+        futures = [self._executor().submit(work, y0, y1) for y0, y1 in ranges]
+        parts = [f.result() for f in futures]
+        return np.concatenate(parts) if parts else empty_matches()
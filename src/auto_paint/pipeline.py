@@ -0,0 +1,212 @@
+"""截图 / 匹配 / 点击 三段流水线。
+
+AutoPainter.run 原本是串行的：截图 -> 转换 -> 匹配 -> 选择 -> 点击 -> sleep，
+鼠标移动时 CPU 空闲，匹配时鼠标空闲。PaintPipeline 把截图和匹配放到两个后台线程，
+通过容量为 1 的队列相连，主线程只负责点击：点击第 N-1 帧目标的同时，
+第 N 帧在匹配、第 N+1 帧在截图。
+
+失效处理：
+- 目标图片变化（包括 auto_background 按新背景重新生成模板）或等待 charge 恢复之后递增 epoch，
+  旧 epoch 的帧与结果直接丢弃
+- 每次点击记录时间；截图时间早于 点击时间 + settle 的帧里，同一位置的目标视为过期，
+  避免对刚点过、但尚未在画面上体现的像素重复点击
+
+截图后端只由截图线程使用：主线程提交时（AutoPainter._submit）不传入该后端，
+由 color_tackle 的提交按钮定位器使用自己的截图后端。
+"""
+import queue
+import threading
+import time
+
+import numpy as np
+
+__all__ = ["PaintPipeline"]
+
+
+def _keys(xs, ys):
+    # 把 (x, y) 打包为一个 int64，允许少量负坐标
+    return (ys.astype(np.int64) + (1 << 20)) * (1 << 21) + (xs.astype(np.int64) + (1 << 20))
+
+
+class PaintPipeline:
+    """为一个 AutoPainter 实例驱动流水线运行。
+
+    settle: 点击后多少秒内截取的帧仍可能看不到点击效果
+    queue_size: 截图与匹配结果队列的容量，越小延迟越低
+    """
+
+    def __init__(self, painter, settle=0.5, queue_size=1):
+        self.painter = painter
+        self.settle = settle
+        self.queue_size = queue_size
+        # (epoch, 当前模板)：作为一个元组整体替换，截图线程一次读取，不会拿到新 epoch 配旧模板
+        self._current = (0, None)
+        self._stop = threading.Event()
+        self._error = None
+        # 打包坐标 -> 点击时间
+        self._clicked = {}
+
+    def run(self, target_path_getter, running_getter, esc_pressed):
+        """运行直到 running_getter() 为假、esc_pressed() 为真或出现错误；后台线程出错时在此重新抛出。"""
+        painter = self.painter
+        frames = queue.Queue(maxsize=self.queue_size)
+        results = queue.Queue(maxsize=self.queue_size)
+        workers = [
+            threading.Thread(target=self._guard, args=(self._capture_loop, frames), daemon=True),
+            threading.Thread(target=self._guard, args=(self._match_loop, frames, results), daemon=True),
+        ]
+        current_path = None
+        for worker in workers:
+            worker.start()
+
+        try:
+            while running_getter() and not self._stop.is_set():
+                if esc_pressed():
+                    break
+
+                path = target_path_getter()
+                if not path:
+                    # 之后即使回到同一路径也要重新加载
+                    current_path = None
+                    self._publish(None)
+                    time.sleep(0.1)
+                    continue
+                if path != current_path:
+                    current_path = path
+                    template = painter._load_target_image(current_path)
+                    if template is None:
+                        return
+                    if painter.background_tracker is not None:
+                        template = painter.background_tracker.apply(template)
+                    if painter.recorder is not None:
+                        painter.recorder.template(template, current_path)
+                    self._publish(template)
+                    painter.last_found = None
+
+                if not painter._has_charge():
+                    if not painter._recharge(running_getter):
+                        break
+                    # 等待前截取的帧（包括队列中的和两个线程手上的）都已过期，而等待期间
+                    # 点击记录可能已被 _fresh 清理，必须按 epoch 整体作废，不能只清空结果队列
+                    self._publish(self._current[1])
+                    self._drain(results)
+                    continue
+
+                try:
+                    epoch, captured_at, frame, template, matches = results.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if epoch != self._current[0]:
+                    continue
+
+                matches = self._fresh(matches, captured_at)
+                if len(matches):
+                    painter.unmatched_count = 0
+                    self._click_plan(matches, template.shape[:2], running_getter, esc_pressed)
+                else:
+                    painter.last_found = None
+                    if painter._background_drifted(frame, template):
+                        # 按新背景重新生成模板，旧模板的帧与结果随 epoch 一起作废
+                        template = painter.background_tracker.apply(self._current[1])
+                        if painter.recorder is not None:
+                            painter.recorder.template(template, current_path)
+                        self._publish(template)
+                        painter.unmatched_count = 0
+                    elif painter._on_unmatched():
+                        return
+        finally:
+            self._stop.set()
+            for worker in workers:
+                worker.join(timeout=1)
+
+        if self._error is not None:
+            raise self._error
+
+    def _publish(self, template):
+        """递增 epoch 并换上 template（可为 None），此前各 epoch 的帧与结果全部作废。"""
+        self._current = (self._current[0] + 1, template)
+
+    def _guard(self, loop, *args):
+        try:
+            loop(*args)
+        except Exception as e:
+            self._error = e
+            self._stop.set()
+
+    def _put(self, q, item):
+        """带停止检查的阻塞入队，返回 False 表示流水线已停止。"""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.05)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q):
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.05)
+            except queue.Empty:
+                continue
+        return None
+
+    def _drain(self, q):
+        while True:
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                return
+
+    def _capture_loop(self, frames):
+        painter = self.painter
+        while not self._stop.is_set():
+            epoch, template = self._current
+            if template is None:
+                time.sleep(0.05)
+                continue
+            captured_at = time.monotonic()
+            # 截图缓冲区会被下一次截图复用，跨线程传递前需要拷贝
+            frame = painter._screenshot().copy()
+            if not self._put(frames, (epoch, captured_at, frame, template)):
+                return
+
+    def _match_loop(self, frames, results):
+        painter = self.painter
+        while not self._stop.is_set():
+            item = self._get(frames)
+            if item is None:
+                return
+            epoch, captured_at, frame, template = item
+            if epoch != self._current[0]:
+                continue
+            if painter.adaptive_scale:
+                template = painter._scaled_template(frame, template)
+            matches = painter._get_matches(frame, template)
+            if not self._put(results, (epoch, captured_at, frame, template, matches)):
+                return
+
+    def _fresh(self, matches, captured_at):
+        """去掉在该帧截取之后（考虑 settle）才点击过的目标，并清理过旧的点击记录。"""
+        now = time.monotonic()
+        if self._clicked:
+            self._clicked = {k: t for k, t in self._clicked.items() if now - t < self.settle + 5}
+        if not self._clicked or not len(matches):
+            return matches
+        keys = np.fromiter(self._clicked.keys(), dtype=np.int64, count=len(self._clicked))
+        times = np.fromiter(self._clicked.values(), dtype=np.float64, count=len(self._clicked))
+        recent = keys[captured_at < times + self.settle]
+        if not len(recent):
+            return matches
+        return matches[~np.isin(_keys(matches["x"], matches["y"]), recent)]
+
+    def _click_plan(self, matches, target_size, running_getter, esc_pressed):
+        painter = self.painter
+        for i, top_left in enumerate(painter._plan_clicks(matches, target_size[0])):
+            if i and (not running_getter() or esc_pressed()):
+                return
+            if not painter._has_charge():
+                return
+            painter._click(top_left, target_size)
+            painter.last_found = top_left
+            self._clicked[int(_keys(np.array([top_left[0]]), np.array([top_left[1]]))[0])] = time.monotonic()
@@ -0,0 +1,80 @@
+"""由粗到细的金字塔模板匹配。
+
+cv2.matchTemplate 的耗时与 屏幕面积 × 模板面积 成正比，在 4K 或多显示器上会很慢。
+PyramidMatcher 先在缩小 2**levels 倍的帧和模板上匹配，得到候选位置后，
+只在每个候选附近的小块内做全分辨率匹配。粗匹配没有结果时回退到整帧匹配。
+"""
+import cv2
+import numpy as np
+
+from src.auto_paint.matches import make_matches, empty_matches, peaks_from_result
+
+__all__ = ["PyramidMatcher"]
+
+
+class PyramidMatcher:
+    """金字塔匹配器。
+
+    levels: 缩小级数，每级边长减半
+    coarse_ratio: 粗匹配阈值 = threshold * coarse_ratio，缩小后分数偏低，需放宽以免漏检
+    fallback: 粗匹配没有候选时是否回退到整帧匹配
+    """
+
+    def __init__(self, levels=1, coarse_ratio=0.85, fallback=True):
+        self.levels = levels
+        self.coarse_ratio = coarse_ratio
+        self.fallback = fallback
+        # 统计信息：最近一次 match 是否回退到了整帧匹配
+        self.last_fallback = False
+
+    def _downscale(self, image):
+        for _ in range(self.levels):
+            image = cv2.pyrDown(image)
+        return image
+
+    def match(self, frame, template, threshold):
+        """返回与 AutoPainter._get_matches 相同格式的匹配结构化数组。"""
+        self.last_fallback = False
+        tpl_h, tpl_w = template.shape[:2]
+        scale = 2 ** self.levels
+        small_tpl = self._downscale(template)
+        small_frame = self._downscale(frame)
+        if (self.levels <= 0 or min(small_tpl.shape[:2]) < 2
+                or small_frame.shape[0] < small_tpl.shape[0] or small_frame.shape[1] < small_tpl.shape[1]):
+            return self._full(frame, template, threshold)
+
+        coarse = cv2.matchTemplate(small_frame, small_tpl, cv2.TM_CCOEFF_NORMED)
+        candidates = peaks_from_result(coarse, threshold * self.coarse_ratio, small_tpl.shape[:2])
+        if not len(candidates):
+            if self.fallback:
+                self.last_fallback = True
+                return self._full(frame, template, threshold)
+            return empty_matches()
+
+        # 每个候选在全分辨率下的搜索窗口：映射回原坐标后向四周各扩展 scale 个像素
+        height, width = frame.shape[:2]
+        x0s = np.clip(candidates["x"] * scale - scale, 0, width - tpl_w)
+        y0s = np.clip(candidates["y"] * scale - scale, 0, height - tpl_h)
+        x1s = np.minimum(x0s + tpl_w + 2 * scale, width)
+        y1s = np.minimum(y0s + tpl_h + 2 * scale, height)
+
+        xs, ys, scores = [], [], []
+        for x0, y0, x1, y1 in zip(x0s.tolist(), y0s.tolist(), x1s.tolist(), y1s.tolist()):
+            fine = cv2.matchTemplate(frame[y0:y1, x0:x1], template, cv2.TM_CCOEFF_NORMED)
+            _, best, _, (bx, by) = cv2.minMaxLoc(fine)
+            if best >= threshold:
+                xs.append(x0 + bx)
+                ys.append(y0 + by)
+                scores.append(best)
+        if not xs:
+            return empty_matches()
+
+        matches = make_matches(xs, ys, scores)
+        # 相邻候选的窗口可能收敛到同一位置
+        _, first = np.unique(matches[["y", "x"]], return_index=True)
+        return matches[first]
+
+    @staticmethod
+    def _full(frame, template, threshold):
+        result = cv2.matchTemplate(frame, template, cv2.TM_CCOEFF_NORMED)
+        return peaks_from_result(result, threshold, template.shape[:2])
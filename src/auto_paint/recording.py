@@ -0,0 +1,235 @@
+"""绘制会话的录制与回放。
+
+线上遇到的性能与识别问题取决于当时的真实屏幕，事后无法复现。FrameRecorder 把会话写成紧凑的日志：
+- 每帧只保存与上一帧相比发生变化的最小矩形（zlib 压缩），每隔 keyframe_interval 帧或尺寸变化时存一整帧
+- 目标模板、每次点击（帧内与屏幕坐标）以及时间戳
+- 结束时的分阶段统计
+
+FrameLogReader 顺序读出日志并还原完整帧；ReplayCapture 作为截图后端按顺序回放，
+replay_matches 则把每帧直接送入任意检测引擎，不需要显示器，可用于确定性的性能与准确率回归。
+
+文件格式：魔数 MAGIC，其后为若干条记录，每条为 struct "<BII"（类型, 元数据长度, 数据长度）
++ UTF-8 JSON 元数据 + 二进制数据。
+"""
+import json
+import struct
+import threading
+import time
+import zlib
+
+import cv2
+import numpy as np
+
+from src.auto_paint.capture import CaptureBackend
+
+__all__ = ["FrameRecorder", "FrameLogReader", "ReplayCapture", "replay_matches"]
+
+MAGIC = b"WPLOG1\n"
+_HEADER = struct.Struct("<BII")
+
+# 记录类型
+TEMPLATE, FRAME, CLICK, SUMMARY = 1, 2, 3, 4
+
+
+def _changed_box(frame, prev):
+    """返回 frame 与 prev 不同的最小矩形 (x, y, w, h)，完全相同时返回 None。"""
+    diff = cv2.absdiff(frame, prev)
+    height, width = frame.shape[:2]
+    flat = diff.reshape(height, -1)
+    rows = cv2.reduce(flat, 1, cv2.REDUCE_MAX).ravel()
+    ys = np.flatnonzero(rows)
+    if not len(ys):
+        return None
+    cols = cv2.reduce(flat[ys[0]:ys[-1] + 1], 0, cv2.REDUCE_MAX).reshape(width, -1).max(axis=1)
+    xs = np.flatnonzero(cols)
+    return int(xs[0]), int(ys[0]), int(xs[-1] - xs[0] + 1), int(ys[-1] - ys[0] + 1)
+
+
+class FrameRecorder:
+    """把一次绘制会话写入日志文件。
+
+    path: 日志文件路径
+    keyframe_interval: 每隔多少帧保存一次整帧，便于从中途开始读取与限制误差传播
+    level: zlib 压缩级别，1 最快
+
+    流水线模式下截图与点击来自不同线程，写入由锁串行化。
+    """
+
+    def __init__(self, path, keyframe_interval=300, level=1):
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self.level = level
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+        self._prev = None
+        self._since_key = 0
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+        self.frame_count = 0
+        self.bytes_raw = 0
+
+    def _now(self):
+        return time.monotonic() - self._start
+
+    def _write(self, kind, meta, data=b""):
+        meta_bytes = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+        with self._lock:
+            self._file.write(_HEADER.pack(kind, len(meta_bytes), len(data)) + meta_bytes + data)
+
+    def template(self, image, name=None):
+        """记录当前使用的目标模板（BGR）。"""
+        image = np.ascontiguousarray(image)
+        self._write(TEMPLATE, {"t": self._now(), "name": name, "shape": list(image.shape)},
+                    zlib.compress(image.tobytes(), self.level))
+
+    def frame(self, frame):
+        """记录一帧截图（BGR，调用返回后可被复用）。"""
+        self.frame_count += 1
+        self.bytes_raw += frame.nbytes
+        key = (self._prev is None or self._prev.shape != frame.shape
+               or self._since_key >= self.keyframe_interval)
+        if key:
+            box = (0, 0, frame.shape[1], frame.shape[0])
+            self._since_key = 0
+        else:
+            box = _changed_box(frame, self._prev)
+            self._since_key += 1
+
+        meta = {"t": self._now(), "key": key, "shape": list(frame.shape), "box": box}
+        if box is None:
+            self._write(FRAME, meta)
+        else:
+            x, y, w, h = box
+            patch = np.ascontiguousarray(frame[y:y + h, x:x + w])
+            self._write(FRAME, meta, zlib.compress(patch.tobytes(), self.level))
+
+        if self._prev is None or self._prev.shape != frame.shape:
+            self._prev = frame.copy()
+        elif box is not None:
+            x, y, w, h = box
+            self._prev[y:y + h, x:x + w] = frame[y:y + h, x:x + w]
+
+    def click(self, top_left, screen_xy):
+        """记录一次点击：top_left 为帧内模板左上角，screen_xy 为实际点击的屏幕坐标。"""
+        self._write(CLICK, {"t": self._now(), "x": int(top_left[0]), "y": int(top_left[1]),
+                            "screen": [int(screen_xy[0]), int(screen_xy[1])]})
+
+    def close(self, summary=None):
+        """写入可选的统计摘要（如 PaintMetrics.summary()）并关闭文件。"""
+        if self._file is None:
+            return
+        if summary is not None:
+            self._write(SUMMARY, summary)
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FrameLogReader:
+    """顺序读取 FrameRecorder 写出的日志。
+
+    迭代得到 (类型, 元数据, 数据)：FRAME 的数据为还原后的完整帧（只读，下一帧会重新分配），
+    TEMPLATE 的数据为模板数组，其余为 None。
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def __iter__(self):
+        with open(self.path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"不是绘制日志文件: {self.path}")
+            current = None
+            while True:
+                header = f.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    return
+                kind, meta_len, data_len = _HEADER.unpack(header)
+                meta = json.loads(f.read(meta_len).decode("utf-8"))
+                data = f.read(data_len)
+                if kind == TEMPLATE:
+                    image = np.frombuffer(zlib.decompress(data), dtype=np.uint8).reshape(meta["shape"])
+                    yield kind, meta, image
+                elif kind == FRAME:
+                    shape = tuple(meta["shape"])
+                    if meta["key"] or current is None or current.shape != shape:
+                        current = np.empty(shape, dtype=np.uint8)
+                    elif meta["box"] is not None:
+                        # 已交出的帧保持不变，在副本上应用变化
+                        current = current.copy()
+                    if meta["box"] is not None:
+                        x, y, w, h = meta["box"]
+                        patch = np.frombuffer(zlib.decompress(data), dtype=np.uint8)
+                        current[y:y + h, x:x + w] = patch.reshape(h, w, *shape[2:])
+                    current.setflags(write=False)
+                    yield kind, meta, current
+                else:
+                    yield kind, meta, None
+
+    def frames(self):
+        """只迭代帧：(元数据, 帧)。"""
+        for kind, meta, data in self:
+            if kind == FRAME:
+                yield meta, data
+
+    def templates(self):
+        """日志中出现过的全部模板 [(元数据, 模板), ...]。"""
+        return [(meta, data) for kind, meta, data in self if kind == TEMPLATE]
+
+    def clicks(self):
+        return [meta for kind, meta, _ in self if kind == CLICK]
+
+
+class ReplayCapture(CaptureBackend):
+    """按日志顺序回放帧的截图后端；回放完后 exhausted 为 True，并一直返回最后一帧。"""
+
+    def __init__(self, path, region=None):
+        super().__init__(region)
+        self._frames = FrameLogReader(path).frames()
+        self._last = None
+        self.exhausted = False
+        self.grab_count = 0
+
+    def grab(self):
+        try:
+            _, self._last = next(self._frames)
+        except StopIteration:
+            self.exhausted = True
+            if self._last is None:
+                raise RuntimeError("日志中没有帧")
+        self.grab_count += 1
+        frame = self._last
+        if self.region is not None:
+            left, top, width, height = self.region
+            frame = frame[top:top + height, left:left + width]
+        buf = self._ensure_buffer(frame.shape[0], frame.shape[1])
+        np.copyto(buf, frame)
+        return buf
+
+    def grab_patch(self, x, y, width, height):
+        left = self.offset[0] + x
+        top = self.offset[1] + y
+        return self._last[top:top + height, left:left + width].copy()
+
+
+def replay_matches(path, painter, template=None):
+    """把日志中的每一帧送入 painter._get_matches，返回 [(元数据, 匹配, 耗时秒), ...]。
+
+    template: 使用的模板，None 表示依次使用日志中记录的模板（帧之前最近的一个）。
+    painter 的检测引擎、阈值、增量匹配等设置决定了回放的匹配方式，不会执行任何点击。
+    """
+    results = []
+    current = template
+    for kind, meta, data in FrameLogReader(path):
+        if kind == TEMPLATE and template is None:
+            current = data
+        elif kind == FRAME and current is not None:
+            start = time.perf_counter()
+            matches = painter._get_matches(data, current)
+            results.append((meta, matches, time.perf_counter() - start))
+    return results
@@ -0,0 +1,235 @@
+"""无界面命令行入口。
+
+用法示例：
+    python -m src.cli --color black --engine grid --batch-size 8
+    python -m src.cli --colors red --duration 600
+    python -m src.cli --config painter.json --threshold 0.85
+    python -m src.cli --artwork art.png --anchor 640,360 --color black
+
+--config 指向一个 JSON 文件，键与命令行参数同名（下划线形式，如 "batch_size"），命令行参数优先。
+本模块顶层只导入标准库，cv2 / numpy / pyautogui 等在真正开始绘制时才加载。
+"""
+import argparse
+import json
+import sys
+import time
+
+# 各参数的默认值；同时也是 --config 文件允许出现的键
+DEFAULTS = {
+    "color": None,
+    "template": None,
+    "colors": None,
+    "artwork": None,
+    "anchor": None,
+    "pitch": None,
+    "engine": "template",
+    "threshold": 0.8,
+    "offset": "0,0",
+    "region": None,
+    "capture": "auto",
+    "input": "auto",
+    "clicks_per_second": None,
+    "click_burst": 1,
+    "batch_size": 1,
+    "batch_verify": True,
+    "incremental": False,
+    "pyramid_levels": 0,
+    "workers": 1,
+    "adaptive_scale": False,
+    "auto_background": False,
+    "order": "row",
+    "pipeline": False,
+    "charges": None,
+    "max_charges": None,
+    "regen_seconds": 30.0,
+    "duration": 0.0,
+    "metrics_out": None,
+    "record": None,
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cli",
+        description="wplace-auto-painter 无界面运行",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    target = parser.add_argument_group("目标")
+    target.add_argument("--color", help="要绘制的颜色键（见 src/data/colors.json），如 black；图稿模式下只绘制该颜色的像素")
+    target.add_argument("--template", help="直接指定模板图片路径，优先于 --color")
+    target.add_argument("--colors", help="调色板分类模式：逗号分隔的颜色键；命令行无法切换 wplace 中的颜色，目前只能给出一种")
+    target.add_argument("--artwork", help="图稿模式：按源图量化到调色板后直接点击对应坐标；多种颜色时需用 --color 选择一种")
+    target.add_argument("--anchor", help="图稿左上角像素中心在截图区域内的坐标：x,y")
+    target.add_argument("--pitch", type=float, help="画布一个像素在屏幕上的边长，缺省时自动推断")
+
+    match = parser.add_argument_group("匹配")
+    match.add_argument("--engine", choices=("template", "grid", "lattice"))
+    match.add_argument("--threshold", type=float)
+    match.add_argument("--incremental", action="store_true", default=None, help="只在变化的块上重新匹配")
+    match.add_argument("--pyramid-levels", type=int, help="金字塔匹配的缩小级数，0 表示关闭")
+    match.add_argument("--workers", type=int, help="分带并发匹配的线程数")
+    match.add_argument("--adaptive-scale", action="store_true", default=None, help="按当前缩放在内存中生成模板")
+    match.add_argument("--auto-background", action="store_true", default=None,
+                       help="找不到目标时从画面估计背景色，不一致则在内存中重新生成模板")
+
+    io = parser.add_argument_group("截图与点击")
+    io.add_argument("--capture", choices=("auto", "mss", "pyautogui"))
+    io.add_argument("--input", choices=("auto", "native", "pyautogui"), help="鼠标输入后端")
+    io.add_argument("--clicks-per-second", type=float, help="每秒最多点击次数，缺省不限速")
+    io.add_argument("--click-burst", type=int, help="限速时允许连续突发的点击数")
+    io.add_argument("--region", help="只截取屏幕的一部分：left,top,width,height")
+    io.add_argument("--offset", help="点击偏移：x,y")
+    io.add_argument("--batch-size", type=int, help="每帧最多点击的目标数")
+    io.add_argument("--no-batch-verify", dest="batch_verify", action="store_false", default=None,
+                    help="批量点击时不抽查画面是否变化")
+    io.add_argument("--order", choices=("row", "serpentine", "nearest"), help="点击顺序")
+    io.add_argument("--pipeline", action="store_true", default=None, help="截图、匹配与点击流水线并行执行")
+
+    budget = parser.add_argument_group("charge 预算")
+    budget.add_argument("--charges", type=int, help="当前可用的 charge 数；给出时按预算提交并等待恢复")
+    budget.add_argument("--max-charges", type=int, help="charge 上限，缺省与 --charges 相同")
+    budget.add_argument("--regen-seconds", type=float, help="恢复一个 charge 需要的秒数")
+
+    parser.add_argument("--config", help="JSON 配置文件")
+    parser.add_argument("--duration", type=float, help="运行指定秒数后停止，0 表示一直运行直到 ESC / Ctrl+C")
+    parser.add_argument("--record", help="把截图、模板与点击记录到该日志文件，可用 benchmarks.bench_replay 回放")
+    parser.add_argument("--metrics-out", help="结束时把分阶段耗时统计写到该文件（.json 或 .csv）")
+    return parser
+
+
+def load_options(argv=None):
+    """合并 默认值 < 配置文件 < 命令行参数，返回 dict。"""
+    args = build_parser().parse_args(argv)
+    options = dict(DEFAULTS)
+    if args.config:
+        with open(args.config, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        unknown = set(config) - set(DEFAULTS)
+        if unknown:
+            raise SystemExit(f"配置文件中有未知的键: {', '.join(sorted(unknown))}")
+        options.update(config)
+    for key in DEFAULTS:
+        value = getattr(args, key, None)
+        if value is not None:
+            options[key] = value
+    return options
+
+
+def _ints(text, count, name):
+    parts = [int(p) for p in str(text).split(",")]
+    if len(parts) != count:
+        raise SystemExit(f"--{name} 需要 {count} 个以逗号分隔的整数")
+    return parts
+
+
+def make_painter(options):
+    """按选项构造 AutoPainter（此时才导入重量级依赖）。"""
+    from src.auto_paint import AutoPainter
+    from src.auto_paint.capture import create_capture
+    from src.auto_paint.input import create_input
+
+    budget = None
+    if options["charges"]:
+        from src.auto_paint.budget import ChargeBudget
+
+        budget = ChargeBudget(options["charges"], options["max_charges"], options["regen_seconds"])
+    recorder = None
+    if options["record"]:
+        from src.auto_paint.recording import FrameRecorder
+
+        recorder = FrameRecorder(options["record"])
+    region = tuple(_ints(options["region"], 4, "region")) if options["region"] else None
+    offset_x, offset_y = _ints(options["offset"], 2, "offset")
+    return AutoPainter(
+        click_offset_x=offset_x,
+        click_offset_y=offset_y,
+        threshold=options["threshold"],
+        capture=create_capture(options["capture"], region=region),
+        input_backend=create_input(options["input"], rate=options["clicks_per_second"],
+                                   burst=options["click_burst"]),
+        engine=options["engine"],
+        batch_size=options["batch_size"],
+        batch_verify=options["batch_verify"],
+        incremental=options["incremental"],
+        pyramid_levels=options["pyramid_levels"],
+        workers=options["workers"],
+        adaptive_scale=options["adaptive_scale"],
+        auto_background=options["auto_background"],
+        order=options["order"],
+        budget=budget,
+        pipeline=options["pipeline"],
+        recorder=recorder,
+        use_gui=False,
+    )
+
+
+def make_artwork_plan(options):
+    """按选项量化图稿；命令行无法切换 wplace 的调色板颜色，多种颜色时必须用 --color 只选一种。"""
+    from src.auto_paint.artwork import ArtworkPlan
+
+    anchor = tuple(_ints(options["anchor"], 2, "anchor"))
+    plan = ArtworkPlan.from_image(options["artwork"], anchor, options["pitch"])
+    counts = plan.counts()
+    color = options["color"]
+    if color is None and len(counts) > 1:
+        listed = ", ".join(f"{name}({count})" for name, count in counts.items())
+        raise SystemExit(f"图稿包含多种颜色: {listed}；请用 --color 每次只绘制其中一种，并在 wplace 中选中该颜色")
+    if color is not None and color not in counts:
+        raise SystemExit(f"图稿中没有颜色: {color}")
+    return plan
+
+
+def parse_colors(options):
+    """解析 --colors（字符串或配置文件中的列表）；没有切换调色板颜色的回调，多于一种颜色（包括 all）时直接退出。"""
+    value = options["colors"]
+    if isinstance(value, str):
+        value = None if value.strip() == "all" else value.split(",")
+    colors = None if value is None else [c.strip() for c in value if c.strip()]
+    if colors is None or len(colors) != 1:
+        raise SystemExit("--colors 目前只能指定一种颜色（命令行无法切换 wplace 中选中的颜色），多种颜色请分多次运行")
+    return colors
+
+
+def main(argv=None):
+    options = load_options(argv)
+    if not (options["template"] or options["color"] or options["colors"] or options["artwork"]):
+        raise SystemExit("请通过 --color、--template、--colors 或 --artwork 指定要绘制的目标")
+    if options["artwork"] and not options["anchor"]:
+        raise SystemExit("--artwork 需要同时指定 --anchor")
+
+    # 在创建截图与输入后端之前检查图稿与 --colors，参数有误时直接退出
+    plan = make_artwork_plan(options) if options["artwork"] else None
+    colors = parse_colors(options) if options["colors"] and plan is None else None
+    painter = make_painter(options)
+    deadline = time.monotonic() + options["duration"] if options["duration"] else None
+
+    def running():
+        return deadline is None or time.monotonic() < deadline
+
+    try:
+        if plan is not None:
+            painter.run_artwork(plan, running, names=[options["color"]] if options["color"] else None)
+        elif colors is not None:
+            painter.run_palette(lambda: colors, running)
+        else:
+            path = options["template"]
+            if not path:
+                from src.data import load_color_map
+
+                path = load_color_map().get(options["color"])
+                if path is None:
+                    raise SystemExit(f"未知的颜色: {options['color']}")
+            painter.run(lambda: path, running)
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        if painter.recorder is not None:
+            painter.recorder.close(painter.metrics.summary())
+        if options["metrics_out"]:
+            painter.metrics.export(options["metrics_out"])
+        print(painter.metrics.status_line())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
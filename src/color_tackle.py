@@ -1,6 +1,6 @@
-import pyautogui
 import cv2
 import numpy as np
+from src.template_cache import load_template
 
 def init_color():
     color_list = [
@@ -23,7 +23,8 @@ def init_color():
     return color_map
 
 def run_script(target_image_path):
-    
+    import pyautogui
+
     running = True
     
     click_offset_x = 0
@@ -66,23 +67,128 @@ def run_script(target_image_path):
         print(f"Error: {str(e)}")
 
 
-def click_submit():
-    """点击提交按钮"""
-    submit_btn_url = "src/icon/submit.png"
-    submit_btn_image = cv2.imread(submit_btn_url)
-    target_height, target_width = submit_btn_image.shape[:2]
+SUBMIT_ICON = "src/icon/submit.png"
 
-    screenshot = pyautogui.screenshot()
-    screenshot = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
-    
-    result = cv2.matchTemplate(screenshot, submit_btn_image, cv2.TM_CCOEFF_NORMED)
-    min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
 
-    
-    threshold = 0.8
-    if max_val >= threshold:
-        top_left = max_loc
-        center_x = top_left[0] + target_width // 2
-        center_y = top_left[1] + target_height // 2
-        pyautogui.moveTo(center_x, center_y)
-        pyautogui.click()
\ No newline at end of file
+class SubmitLocator:
+    """提交按钮定位器。
+
+    提交按钮在界面上的位置基本固定：记住上一次命中的位置与缩放比例，下次先只截取其周围 margin 像素的
+    小块匹配，未命中时才退回整屏搜索。整屏搜索先试上次命中的比例，再依次试 scales 中的其余比例
+    （应对浏览器 / 系统缩放），图标按比例缩放后的模板由 template_cache 缓存。
+
+    path: 按钮图标路径
+    scales: 整屏搜索时尝试的缩放比例
+    threshold: TM_CCOEFF_NORMED 阈值
+    margin: 局部搜索区域向按钮四周扩展的像素数
+    last_box: 上一次命中的屏幕区域 (left, top, width, height)，None 表示尚未找到
+    """
+
+    def __init__(self, path=SUBMIT_ICON, scales=(1.0, 0.8, 0.9, 1.1, 1.25, 1.5), threshold=0.8, margin=32):
+        self.path = path
+        self.scales = scales
+        self.threshold = threshold
+        self.margin = margin
+        self.last_box = None
+        self.last_scale = scales[0]
+        self.roi_hits = 0
+        self.full_searches = 0
+        self._capture = None
+
+    def reset(self):
+        """忘记上一次的位置（例如切换了窗口布局）。"""
+        self.last_box = None
+
+    def _match(self, frame, scale):
+        """在 frame 中匹配 scale 比例的图标，返回 (左上角, 尺寸) 或 None。"""
+        icon = load_template(self.path, scale)
+        if icon is None:
+            raise FileNotFoundError(f"无法加载提交按钮图标: {self.path}")
+        height, width = icon.shape[:2]
+        if frame.shape[0] < height or frame.shape[1] < width:
+            return None
+        result = cv2.matchTemplate(frame, icon, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        if max_val < self.threshold:
+            return None
+        return max_loc, (width, height)
+
+    def _search_roi(self, capture):
+        left, top, width, height = self.last_box
+        origin_x, origin_y = capture.offset
+        x = max(left - self.margin - origin_x, 0)
+        y = max(top - self.margin - origin_y, 0)
+        try:
+            patch = capture.grab_patch(x, y, width + 2 * self.margin, height + 2 * self.margin)
+        except Exception:
+            # 区域超出屏幕等情况下直接整屏搜索
+            return None
+        found = self._match(patch, self.last_scale)
+        if found is None:
+            return None
+        (px, py), size = found
+        return (origin_x + x + px, origin_y + y + py) + size
+
+    def _search_full(self, capture):
+        self.full_searches += 1
+        frame = capture.grab()
+        origin_x, origin_y = capture.offset
+        scales = [self.last_scale] + [s for s in self.scales if s != self.last_scale]
+        for scale in scales:
+            found = self._match(frame, scale)
+            if found is not None:
+                self.last_scale = scale
+                (x, y), size = found
+                return (origin_x + x, origin_y + y) + size
+        return None
+
+    def _full_capture(self, capture):
+        """整屏搜索用的截图后端：capture 限定了区域或为 None 时使用定位器自己创建的全屏后端。"""
+        if capture is not None and capture.region is None:
+            return capture
+        if self._capture is None:
+            from src.auto_paint.capture import create_capture
+
+            self._capture = create_capture()
+        return self._capture
+
+    def locate(self, capture=None):
+        """返回提交按钮中心的屏幕坐标 (x, y)，找不到时返回 None。
+
+        capture: 截图后端（见 src.auto_paint.capture）。局部与整屏搜索都在全屏后端上进行，
+          坐标以屏幕原点为基准；capture 为 None 或限定了区域时改用定位器自己创建的全屏后端。
+        """
+        box = None
+        if self.last_box is not None:
+            box = self._search_roi(self._full_capture(capture))
+        if box is not None:
+            self.roi_hits += 1
+        else:
+            box = self._search_full(self._full_capture(capture))
+            if box is None:
+                return None
+        self.last_box = box
+        left, top, width, height = box
+        return left + width // 2, top + height // 2
+
+
+default_locator = SubmitLocator()
+
+
+def click_submit(capture=None, input_backend=None):
+    """点击提交按钮；返回是否找到并点击了按钮。
+
+    capture: 可选的截图后端（见 src.auto_paint.capture），见 SubmitLocator.locate。
+    input_backend: 可选的输入后端（见 src.auto_paint.input），None 时使用 pyautogui 点击。
+    """
+    center = default_locator.locate(capture)
+    if center is None:
+        return False
+    if input_backend is not None:
+        input_backend.click(*center)
+    else:
+        import pyautogui
+
+        pyautogui.moveTo(*center)
+        pyautogui.click()
+    return True
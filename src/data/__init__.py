@@ -1,11 +1,17 @@
 import json
 import os
 
+from src import generate_color
+
 __all__ = ["load_color_map"]
 
 
 def load_color_map():
-    """加载 colors.json 并返回一个映射 color_name -> src/color/<color>.png"""
+    """加载 colors.json 并返回一个映射 color_name -> src/color/<color>.png
+
+    若存在调色板图集索引（generate_color.ATLAS_INDEX），其中的颜色也会加入映射；
+    对应的 .png 路径只作为键使用，模板缓存会优先从图集中读取。
+    """
     here = os.path.dirname(__file__)
     path = os.path.join(here, "colors.json")
     try:
@@ -14,7 +20,14 @@ def load_color_map():
     except Exception:
         colors = []
 
+    try:
+        with open(generate_color.ATLAS_INDEX, "r", encoding="utf-8") as f:
+            atlas_names = json.load(f).get("names", [])
+    except Exception:
+        atlas_names = []
+    colors = colors + [c for c in atlas_names if c not in colors]
+
     color_map = {}
     for c in colors:
-        color_map[c] = os.path.join("src", "color", f"{c}.png")
+        color_map[c] = os.path.join(generate_color.PIXELS_DIR, f"{c}.png")
     return color_map
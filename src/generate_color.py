@@ -1,6 +1,19 @@
+"""调色板与色块模板生成。
+
+导入本模块没有副作用：持久化的背景色在第一次访问 BACKGROUND 时才读取，
+numpy / PIL 也只在真正生成或加载模板时才导入。
+"""
+from __future__ import annotations
+
+from collections import namedtuple
 from pathlib import Path
-from PIL import Image
+from typing import TYPE_CHECKING
 import json
+import os
+
+if TYPE_CHECKING:
+    # 只用于类型注解；运行时 numpy 在函数内按需导入
+    import numpy as np
 
 COLORS_MAP = [
     {"name": "Transparent", "rgb": (0, 0, 0)},
@@ -76,39 +89,166 @@ ALL_COLORS: dict[str, tuple[int, int, int]] = {
 }
 
 
+def color_key(name: str) -> str:
+    """把 ALL_COLORS 中的颜色名转换为 colors.json / 模板文件使用的键，例如 "Dark Gray" -> "darkgray"。"""
+    return "".join(map(str.lower, name.split()))
+
+
+def palette_colors() -> dict[str, tuple[int, int, int]]:
+    """{颜色键: (r, g, b)}，顺序与 ALL_COLORS 一致；调色板分类、查找表与图稿量化共用。"""
+    return {color_key(name): rgb for name, rgb in ALL_COLORS.items()}
+
+
 PIXELS_DIR = Path("src/color")
-PIXELS_DIR.mkdir(exist_ok=True)
 UNIT_SIZE = 8
 PIXEL_SIZE = UNIT_SIZE * 3
-BACKGROUND = (158, 189, 255)
+DEFAULT_BACKGROUND = (158, 189, 255)
+# 模板生成批次，每次重新生成模板后递增，供模板缓存判断失效
+GENERATION = 0
 
 # 配置文件，用于持久化背景色
 BG_CONFIG = PIXELS_DIR / "background.json"
 
-# 如果存在配置文件，则读取持久化的 BACKGROUND
-if BG_CONFIG.exists():
+
+def load_background() -> tuple[int, int, int]:
+    """读取持久化的背景色，配置文件不存在或无效时返回 DEFAULT_BACKGROUND。"""
+    if BG_CONFIG.exists():
+        try:
+            with open(BG_CONFIG, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+                if isinstance(data, dict) and 'background' in data:
+                    b = data['background']
+                    if (isinstance(b, (list, tuple)) and len(b) == 3
+                            and all(isinstance(c, int) for c in b)):
+                        return (b[0], b[1], b[2])
+        except Exception:
+            # 读取失败则忽略，使用默认 BACKGROUND
+            pass
+    return DEFAULT_BACKGROUND
+
+
+def get_background() -> tuple[int, int, int]:
+    """返回当前背景色；第一次调用时才读取配置文件。"""
+    global BACKGROUND
+    try:
+        return BACKGROUND
+    except NameError:
+        BACKGROUND = load_background()
+        return BACKGROUND
+
+
+def __getattr__(name):
+    # 模块属性 BACKGROUND 惰性初始化：generate_color.BACKGROUND 首次访问时读取配置
+    if name == "BACKGROUND":
+        return get_background()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# 调色板图集：所有模板存放在一个 (N, PIXEL_SIZE, PIXEL_SIZE, 3) 的 BGR 数组文件中，
+# 另有一个索引文件记录颜色键顺序、背景色和 unit
+ATLAS_PATH = PIXELS_DIR / "atlas.npy"
+ATLAS_INDEX = PIXELS_DIR / "atlas.json"
+
+# templates 为只读内存映射数组；index 为 颜色键 -> 下标
+Atlas = namedtuple("Atlas", "templates names index background unit")
+
+
+def make_template(rgb: tuple[int, int, int],
+                  background: tuple[int, int, int] | None = None,
+                  unit: int = UNIT_SIZE) -> np.ndarray:
+    """在内存中生成一个 (unit*3)×(unit*3) 的色块模板，不写文件。
+
+    返回 BGR uint8 数组，与 cv2.imread 读取的模板格式一致。
+    """
+    import numpy as np
+
+    if background is None:
+        background = get_background()
+    template = np.empty((unit * 3, unit * 3, 3), dtype=np.uint8)
+    template[:] = background[::-1]
+    template[unit:unit * 2, unit:unit * 2] = rgb[::-1]
+    return template
+
+
+def build_atlas(background: tuple[int, int, int] | None = None,
+                unit: int = UNIT_SIZE) -> tuple[list[str], np.ndarray]:
+    """一次向量化生成全部调色板模板，返回 (颜色键列表, (N, unit*3, unit*3, 3) BGR 数组)。"""
+    import numpy as np
+
+    if background is None:
+        background = get_background()
+    names = [color_key(name) for name in ALL_COLORS]
+    palette = np.array([rgb[::-1] for rgb in ALL_COLORS.values()], dtype=np.uint8)
+    size = unit * 3
+    atlas = np.empty((len(names), size, size, 3), dtype=np.uint8)
+    atlas[:] = np.asarray(background[::-1], dtype=np.uint8)
+    atlas[:, unit:unit * 2, unit:unit * 2] = palette[:, None, None, :]
+    return names, atlas
+
+
+_atlas_cache = {"stamp": None, "atlas": None}
+
+
+def write_atlas(background: tuple[int, int, int] | None = None, unit: int = UNIT_SIZE) -> None:
+    """生成图集并写入 ATLAS_PATH / ATLAS_INDEX。"""
+    import numpy as np
+
+    if background is None:
+        background = get_background()
+    names, atlas = build_atlas(background, unit)
+    PIXELS_DIR.mkdir(parents=True, exist_ok=True)
+    # Windows 下被映射的文件无法替换，先释放本模块持有的映射
+    _atlas_cache["stamp"] = None
+    _atlas_cache["atlas"] = None
+    # 先写临时文件再替换，避免读取方映射到写了一半的文件
+    tmp = ATLAS_PATH.with_suffix(".tmp.npy")
+    np.save(tmp, atlas)
+    os.replace(tmp, ATLAS_PATH)
+    with open(ATLAS_INDEX, 'w', encoding='utf-8') as f:
+        json.dump({'names': names, 'background': list(background), 'unit': unit}, f)
+
+
+def load_atlas() -> Atlas | None:
+    """以内存映射方式加载图集；不存在或损坏时返回 None。文件未变化时复用上一次的映射。"""
+    import numpy as np
+
+    try:
+        st = os.stat(ATLAS_PATH)
+        st_index = os.stat(ATLAS_INDEX)
+    except OSError:
+        return None
+    stamp = (st.st_mtime_ns, st.st_size, st_index.st_mtime_ns)
+    if _atlas_cache["stamp"] == stamp:
+        return _atlas_cache["atlas"]
+
     try:
-        with open(BG_CONFIG, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            if isinstance(data, dict) and 'background' in data:
-                b = data['background']
-                if (isinstance(b, (list, tuple)) and len(b) == 3
-                        and all(isinstance(c, int) for c in b)):
-                    BACKGROUND = (b[0], b[1], b[2])
+        with open(ATLAS_INDEX, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        templates = np.load(ATLAS_PATH, mmap_mode="r")
+        names = list(meta["names"])
+        if templates.ndim != 4 or len(templates) != len(names):
+            return None
+        atlas = Atlas(templates, names, {n: i for i, n in enumerate(names)},
+                      tuple(meta["background"]), int(meta["unit"]))
     except Exception:
-        # 读取失败则忽略，使用默认 BACKGROUND
-        pass
+        return None
+    _atlas_cache["stamp"] = stamp
+    _atlas_cache["atlas"] = atlas
+    return atlas
+
 
-def generate_color_by_background(backgroundcolor: tuple[int, int, int]) -> None:
-    """根据传入的 backgroundcolor 重新生成色块图并持久化 BACKGROUND 配置。
+def generate_color_by_background(backgroundcolor: tuple[int, int, int], write_png: bool = False) -> None:
+    """根据传入的 backgroundcolor 重新生成色块图集并持久化 BACKGROUND 配置。
 
     Args:
         backgroundcolor: (r, g, b) 三元组
+        write_png: 是否同时写出旧格式的逐颜色 PNG（src/color/<color>.png）
     """
-    global BACKGROUND
+    global BACKGROUND, GENERATION
     BACKGROUND = backgroundcolor
 
     # 持久化到配置文件，供下次程序启动读取
+    PIXELS_DIR.mkdir(parents=True, exist_ok=True)
     try:
         with open(BG_CONFIG, 'w', encoding='utf-8') as f:
             json.dump({'background': list(BACKGROUND)}, f)
@@ -116,8 +256,14 @@ def generate_color_by_background(backgroundcolor: tuple[int, int, int]) -> None:
         # 写入失败不阻止后续图片生成
         pass
 
-    im = Image.new("RGB", (PIXEL_SIZE, PIXEL_SIZE), BACKGROUND)
-    for name, (r, g, b) in ALL_COLORS.items():
-        name = "".join(map(str.lower, name.split()))
-        im.paste((r, g, b), (UNIT_SIZE, UNIT_SIZE, UNIT_SIZE * 2, UNIT_SIZE * 2))
-        im.save(PIXELS_DIR / f"{name}.png")
\ No newline at end of file
+    write_atlas(BACKGROUND)
+
+    if write_png:
+        from PIL import Image
+
+        im = Image.new("RGB", (PIXEL_SIZE, PIXEL_SIZE), BACKGROUND)
+        for name, (r, g, b) in ALL_COLORS.items():
+            name = color_key(name)
+            im.paste((r, g, b), (UNIT_SIZE, UNIT_SIZE, UNIT_SIZE * 2, UNIT_SIZE * 2))
+            im.save(PIXELS_DIR / f"{name}.png")
+    GENERATION += 1
@@ -1,3 +1,9 @@
-from .app import AutoPainterApp
-
 __all__ = ["AutoPainterApp"]
+
+
+def __getattr__(name):
+    # 惰性导入：只有真正使用 GUI 时才加载 tkinter / keyboard / pyautogui 等依赖
+    if name == "AutoPainterApp":
+        from .app import AutoPainterApp
+        return AutoPainterApp
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,16 +1,21 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import threading
 import sys
 import keyboard
 from rapidfuzz import fuzz, process
 import time
 import pyautogui
-import ctypes
 from src.auto_paint.auto_painter import AutoPainter
 from src.data import load_color_map
 from src import color_tackle
 from src import generate_color
+from src.gui.picker import PatchSampler, ClickWatcher
+
+# 颜色吸管：光标移动时的轮询间隔、静止时的轮询间隔与重新取色间隔（秒）
+PICKER_POLL = 0.05
+PICKER_IDLE_POLL = 0.2
+PICKER_RESAMPLE = 0.5
 
 
 class AutoPainterApp:
@@ -53,6 +58,8 @@ class AutoPainterApp:
         self.predicted_color = None
         # 颜色吸管是否活动的标志（避免未初始化访问）
         self.color_picker_active = False
+        self._picker_lock = threading.Lock()
+        self._picker_pending = None
         # 存放通过吸管选择的背景颜色 (r, g, b)
         self.background_color = generate_color.BACKGROUND
 
@@ -202,16 +209,27 @@ class AutoPainterApp:
         )
         self.color_preview.pack(side=tk.LEFT, padx=5)
         
-        # 在第5行添加「生成背景色块」按钮
+        # 在第5行添加「生成背景色块」与「导出统计」按钮
+        tools_frame = tk.Frame(main_frame)
+        tools_frame.grid(row=5, column=0, pady=6)
         self.generate_bg_btn = tk.Button(
-            main_frame,
+            tools_frame,
             text="生成颜色模版",
             command=self.on_generate_by_background,
             bg="white",
             height=1,
             width=14
         )
-        self.generate_bg_btn.grid(row=5, column=0, pady=6)
+        self.generate_bg_btn.pack(side=tk.LEFT, padx=5)
+        self.export_metrics_btn = tk.Button(
+            tools_frame,
+            text="导出统计",
+            command=self.export_metrics,
+            bg="white",
+            height=1,
+            width=10
+        )
+        self.export_metrics_btn.pack(side=tk.LEFT, padx=5)
 
         # 状态标签（第6行）
         self.status_var = tk.StringVar()
@@ -352,30 +370,65 @@ class AutoPainterApp:
         self.root.deiconify()
     
     def color_picker_loop(self):
+        # 光标不动时只每隔 PICKER_RESAMPLE 秒重新取色（画面可能变化）；界面只在颜色或坐标变化时更新
+        sampler = watcher = None
         try:
+            sampler = PatchSampler(screen_size=tuple(pyautogui.size()))
+            watcher = ClickWatcher()
+            if watcher.mode == "enter":
+                self.root.after(0, self.status_var.set, "颜色吸管已启动 - 移动鼠标查看颜色，按 Enter 确认")
+            # 钩子模式下点击会立即唤醒等待，可以睡得更久
+            poll = PICKER_POLL if watcher.mode == "poll" else PICKER_IDLE_POLL
+            shown = None
+            position = None
+            since_sample = 0.0
             while self.color_picker_active and not self.running:
                 if keyboard.is_pressed('esc'):
                     self.stop_color_picker()
                     break
-                
+
                 x, y = pyautogui.position()
-                rgb = pyautogui.pixel(x, y)
-                
-                try:
-                    if ctypes.windll.user32.GetAsyncKeyState(0x01) & 0x8000:
-                        self.background_color = rgb
-                        self.root.after(0, lambda: self.on_color_click(rgb, x, y))
-                        break
-                except Exception:
-                    pass
+                moved = (x, y) != position
+                if moved or since_sample >= PICKER_RESAMPLE:
+                    position = (x, y)
+                    rgb = sampler.sample(x, y)
+                    since_sample = 0.0
+                    if (rgb, x, y) != shown:
+                        shown = (rgb, x, y)
+                        self._post_color_display(rgb, x, y)
+
+                timeout = PICKER_POLL if moved else poll
+                if watcher.wait(timeout):
+                    x, y = pyautogui.position()
+                    rgb = sampler.sample(x, y)
+                    self.background_color = rgb
+                    self.root.after(0, lambda: self.on_color_click(rgb, x, y))
+                    break
+                since_sample += timeout
 
-                self.root.after(0, self.update_color_display, rgb, x, y)
-                time.sleep(0.05)
-                
         except Exception as e:
             print(f"颜色吸管错误: {e}")
             self.stop_color_picker()
-    
+        finally:
+            if watcher is not None:
+                watcher.close()
+            if sampler is not None:
+                sampler.close()
+
+    def _post_color_display(self, rgb, x, y):
+        """合并界面更新：主线程还没处理上一次更新时只替换待显示的值，不再排队。"""
+        with self._picker_lock:
+            pending = self._picker_pending is not None
+            self._picker_pending = (rgb, x, y)
+        if not pending:
+            self.root.after(0, self._flush_color_display)
+
+    def _flush_color_display(self):
+        with self._picker_lock:
+            latest, self._picker_pending = self._picker_pending, None
+        if latest is not None:
+            self.update_color_display(*latest)
+
     def update_color_display(self, rgb, x, y):
         if not self.color_picker_active:
             return
@@ -431,6 +484,27 @@ class AutoPainterApp:
 
             self.thread = threading.Thread(target=self._run_painter, daemon=True)
             self.thread.start()
+            self.root.after(500, self._refresh_metrics)
+
+    def _refresh_metrics(self):
+        # 运行期间每 0.5 秒在状态栏显示一次分阶段统计
+        if not self.running:
+            return
+        self.status_var.set(f"运行中 | {self.painter.metrics.status_line()}")
+        self.root.after(500, self._refresh_metrics)
+
+    def export_metrics(self):
+        path = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json"), ("CSV", "*.csv")],
+        )
+        if not path:
+            return
+        try:
+            self.painter.metrics.export(path)
+            self.status_var.set(f"统计已导出: {path}")
+        except Exception as e:
+            messagebox.showerror("错误", f"导出统计失败: {e}")
 
     def _run_painter(self):
         self.painter.run(lambda: self.target_image_path, lambda: self.running)
@@ -438,7 +512,8 @@ class AutoPainterApp:
         try:
             self.root.after(0, lambda: self.start_btn.config(state=tk.NORMAL))
             self.root.after(0, lambda: self.root.deiconify())
-            self.root.after(0, lambda: self.status_var.set("已停止"))
+            summary = self.painter.metrics.status_line()
+            self.root.after(0, lambda: self.status_var.set(f"已停止 | {summary}"))
         except Exception:
             pass
 
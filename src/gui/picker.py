@@ -0,0 +1,93 @@
+"""颜色吸管的取色与点击检测。
+
+原实现每 50 毫秒调用一次 pyautogui.pixel(x, y)（多数平台上会截取整个屏幕只为读一个像素），
+并用 ctypes.windll 轮询左键，只能在 Windows 上使用。这里：
+- PatchSampler 只截取光标周围 (2 * radius + 1) 见方的小块，取各通道中位数，抗锯齿边缘与噪声
+- ClickWatcher 用 mouse 库的全局钩子检测左键按下（Windows / Linux），等待时线程处于阻塞状态；
+  钩子不可用时在 Windows 上退回 GetAsyncKeyState 轮询，其余平台退回 Enter 键确认
+"""
+import sys
+import threading
+
+import numpy as np
+
+from src.auto_paint.capture import create_capture
+
+__all__ = ["PatchSampler", "ClickWatcher"]
+
+
+class PatchSampler:
+    """截取屏幕坐标 (x, y) 周围的小块并返回其中位色 (r, g, b)。
+
+    capture: 截图后端，默认 create_capture("auto")（优先 mss）
+    radius: 小块半径，1 像素的色块边缘会被中位数过滤掉
+    screen_size: (宽, 高)，用于把小块限制在屏幕内；None 表示不限制
+    """
+
+    def __init__(self, capture=None, radius=2, screen_size=None):
+        self.capture = create_capture("auto") if capture is None else capture
+        self.radius = radius
+        self.screen_size = screen_size
+
+    def sample(self, x, y):
+        size = 2 * self.radius + 1
+        left, top = x - self.radius, y - self.radius
+        if self.screen_size is not None:
+            width, height = self.screen_size
+            left = min(max(left, 0), max(width - size, 0))
+            top = min(max(top, 0), max(height - size, 0))
+        patch = self.capture.grab_patch(left, top, size, size)
+        bgr = np.median(patch.reshape(-1, 3), axis=0)
+        return tuple(int(c) for c in bgr[::-1])
+
+    def close(self):
+        self.capture.close()
+
+
+class ClickWatcher:
+    """全局左键按下检测。
+
+    wait(timeout) 阻塞至多 timeout 秒，期间左键按下（或回退模式下按 Enter）则返回 True。
+    mode: "hook"（mouse 钩子）、"poll"（Windows GetAsyncKeyState）或 "enter"（键盘确认）
+    """
+
+    def __init__(self):
+        self.event = threading.Event()
+        self._unhook = None
+        self._poll = None
+        try:
+            import mouse
+
+            handler = mouse.on_button(self.event.set, buttons=(mouse.LEFT,), types=(mouse.DOWN,))
+            self._unhook = lambda: mouse.unhook(handler)
+            self.mode = "hook"
+        except Exception:
+            if sys.platform == "win32":
+                import ctypes
+
+                state = ctypes.windll.user32.GetAsyncKeyState
+                self._poll = lambda: bool(state(0x01) & 0x8000)
+                self.mode = "poll"
+            else:
+                import keyboard
+
+                handler = keyboard.add_hotkey("enter", self.event.set)
+                self._unhook = lambda: keyboard.remove_hotkey(handler)
+                self.mode = "enter"
+
+    def wait(self, timeout):
+        if self._poll is not None:
+            if self._poll():
+                self.event.set()
+            else:
+                self.event.wait(timeout)
+            return self.event.is_set()
+        return self.event.wait(timeout)
+
+    def close(self):
+        if self._unhook is not None:
+            try:
+                self._unhook()
+            except Exception:
+                pass
+            self._unhook = None
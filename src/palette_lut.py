@@ -0,0 +1,141 @@
+"""RGB -> 调色板下标查找表。
+
+检测、校验、图稿量化都要对大量像素做同一件事：找最近的调色板颜色。这里把结果预先算好：
+以 (b, g, r) 各取高 bits 位拼成的整数为下标，每项存 uint16，低 8 位为调色板下标，
+高 8 位为该像素与所选颜色的最大通道差（与各检测器 color_tolerance 的含义一致）。
+
+bits=8 时为完整的 2^24 项（32 MB），bits=5 时为 2^15 项，每项按桶中心计算（距离为近似值）。
+表只生成一次，以 .npy 写入 src/color/lut_<bits>_<调色板哈希>.npy，之后以内存映射方式加载；
+调色板变化时哈希随之变化，不会读到过期的表。整帧分类只需一次花式索引：table[key(frame)]。
+"""
+import hashlib
+import os
+import threading
+
+import numpy as np
+
+from src import generate_color
+
+__all__ = ["PaletteLUT", "palette_hash", "build_table", "load_lut"]
+
+# 每次处理的 RGB 项数，限制生成时的临时内存
+_CHUNK = 1 << 18
+
+
+def palette_hash(palette, bits):
+    """调色板（BGR uint8）与位数的短哈希，用作缓存文件名的一部分。"""
+    digest = hashlib.blake2b(np.ascontiguousarray(palette, dtype=np.uint8).tobytes(), digest_size=8)
+    digest.update(bytes([bits]))
+    return digest.hexdigest()
+
+
+def build_table(palette, bits=8):
+    """向量化生成查找表，返回长度 2^(3*bits) 的 uint16 数组。"""
+    if not 1 <= bits <= 8:
+        raise ValueError(f"bits 必须在 1..8 之间: {bits}")
+    palette = np.asarray(palette, dtype=np.uint8)
+    if len(palette) > 255:
+        raise ValueError("调色板最多 255 种颜色")
+    pal_f = palette.astype(np.float32)
+    pal_sq = (pal_f * pal_f).sum(axis=1)
+    pal_i = palette.astype(np.int16)
+
+    size = 1 << (3 * bits)
+    shift = 8 - bits
+    mask = (1 << bits) - 1
+    # 桶中心；bits=8 时即像素值本身
+    half = (1 << shift) >> 1
+    table = np.empty(size, dtype=np.uint16)
+    for start in range(0, size, _CHUNK):
+        keys = np.arange(start, min(start + _CHUNK, size), dtype=np.int32)
+        bgr = np.stack([(keys >> (2 * bits)) & mask, (keys >> bits) & mask, keys & mask], axis=1)
+        bgr = (bgr << shift) + half
+        # |c - p|^2 去掉与 p 无关的 |c|^2 后只需一次矩阵乘法
+        nearest = (bgr.astype(np.float32) @ (-2 * pal_f.T) + pal_sq).argmin(axis=1)
+        dist = np.abs(bgr.astype(np.int16) - pal_i[nearest]).max(axis=1)
+        table[start:start + len(keys)] = nearest | (np.minimum(dist, 255).astype(np.uint16) << 8)
+    return table
+
+
+class PaletteLUT:
+    """已生成（或已映射）的查找表。
+
+    table: build_table 的结果，可以是只读内存映射
+    names: 调色板颜色键，顺序与下标一致
+    palette: (n, 3) BGR
+    """
+
+    def __init__(self, table, names, palette, bits):
+        self.table = table
+        self.names = list(names)
+        self.palette = np.asarray(palette, dtype=np.uint8)
+        self.bits = bits
+
+    def keys(self, frame):
+        """把 BGR 帧（或任意 (..., 3) 数组）转换为查找表下标。"""
+        shift = 8 - self.bits
+        pixels = np.asarray(frame)
+        b = pixels[..., 0].astype(np.int32) >> shift
+        g = pixels[..., 1].astype(np.int32) >> shift
+        r = pixels[..., 2].astype(np.int32) >> shift
+        return (b << (2 * self.bits)) | (g << self.bits) | r
+
+    def lookup(self, frame):
+        """返回原始表项 (...,) uint16：低 8 位为下标、高 8 位为距离。"""
+        return self.table[self.keys(frame)]
+
+    def classify(self, frame, tolerance=None):
+        """返回 (下标, 距离)，均为 frame.shape[:-1] 的 uint8 数组。
+
+        tolerance 不为 None 时，距离超过 tolerance 的像素下标记为 255（不属于调色板）。
+        """
+        entries = self.lookup(frame)
+        indices = (entries & 0xFF).astype(np.uint8)
+        distances = (entries >> 8).astype(np.uint8)
+        if tolerance is not None:
+            indices[distances > tolerance] = 255
+        return indices, distances
+
+
+_lock = threading.Lock()
+_loaded = {}
+
+
+def load_lut(bits=8, colors=None, directory=None):
+    """返回调色板对应的 PaletteLUT：已有缓存文件时内存映射加载，否则生成并写入。
+
+    colors: {颜色键: (r, g, b)}，默认 generate_color.palette_colors()
+    directory: 缓存目录，默认 generate_color.PIXELS_DIR；写入失败时只保留在内存中
+    """
+    if colors is None:
+        colors = generate_color.palette_colors()
+    names = list(colors.keys())
+    palette = np.array([rgb[::-1] for rgb in colors.values()], dtype=np.uint8)
+    directory = generate_color.PIXELS_DIR if directory is None else directory
+    path = os.path.join(directory, f"lut_{bits}_{palette_hash(palette, bits)}.npy")
+
+    with _lock:
+        lut = _loaded.get(path)
+        if lut is not None:
+            return lut
+        table = None
+        if os.path.exists(path):
+            try:
+                table = np.load(path, mmap_mode="r")
+                if table.shape != (1 << (3 * bits),) or table.dtype != np.uint16:
+                    table = None
+            except Exception:
+                table = None
+        if table is None:
+            table = build_table(palette, bits)
+            try:
+                os.makedirs(directory, exist_ok=True)
+                tmp = path + ".tmp.npy"
+                np.save(tmp, table)
+                os.replace(tmp, path)
+                table = np.load(path, mmap_mode="r")
+            except OSError:
+                pass
+        lut = PaletteLUT(table, names, palette, bits)
+        _loaded[path] = lut
+        return lut
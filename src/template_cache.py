@@ -0,0 +1,147 @@
+"""模板图像的内存缓存。
+
+切换颜色时不再每次 cv2.imread，提交按钮图标也只解码一次。缓存按
+(路径, 背景色, 缩放比例, 模板生成批次) 作为键，LRU 淘汰；generate_color_by_background
+重新生成模板后批次号变化，旧条目自然失效。文件被外部修改（mtime/大小变化）时也会重新加载。
+按屏幕缩放在内存中生成的模板（synthesize）按 (颜色, 背景色, unit) 缓存。
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from src import generate_color
+
+__all__ = ["CachedTemplate", "TemplateCache", "default_cache", "load_template", "synth_template"]
+
+
+class CachedTemplate:
+    """解码后的模板。
+
+    image: BGR uint8（只读）
+    stamp: 来源文件（或图集）的 (mtime, 大小)，用于判断是否需要重新加载
+    """
+
+    __slots__ = ("image", "stamp")
+
+    def __init__(self, image, stamp=None):
+        image.setflags(write=False)
+        self.image = image
+        self.stamp = stamp
+
+    @property
+    def shape(self):
+        return self.image.shape
+
+
+def _file_stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _atlas_slot(path):
+    """返回 (图集, 下标)；图集不可用、没有该颜色或背景色已过期时返回 (None, None)。
+
+    只有 generate_color.PIXELS_DIR 下的路径才对应图集中的模板，其他目录中的同名文件按文件读取。
+    """
+    if os.path.dirname(os.path.abspath(path)) != os.path.abspath(generate_color.PIXELS_DIR):
+        return None, None
+    atlas = generate_color.load_atlas()
+    if atlas is None or tuple(atlas.background) != tuple(generate_color.BACKGROUND):
+        return None, None
+    name = os.path.splitext(os.path.basename(path))[0]
+    slot = atlas.index.get(name)
+    if slot is None:
+        return None, None
+    return atlas, slot
+
+
+class TemplateCache:
+    """线程安全的 LRU 模板缓存。"""
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path, scale=1.0):
+        """返回 path 对应的 CachedTemplate；文件不存在或无法解码时返回 None。
+
+        若调色板图集中有同名（文件名去掉扩展名）且背景色与当前 BACKGROUND 一致的模板，优先从图集读取。
+        """
+        path = os.path.abspath(path)
+        key = (path, tuple(generate_color.BACKGROUND), scale, generate_color.GENERATION)
+        atlas, slot = _atlas_slot(path)
+        stamp = ("atlas", _file_stamp(generate_color.ATLAS_PATH)) if atlas is not None else _file_stamp(path)
+        if stamp is None:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.stamp == stamp:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        image = np.array(atlas.templates[slot]) if atlas is not None else cv2.imread(path)
+        if image is None:
+            return None
+        if scale != 1.0:
+            # 色块模板是像素画，用最近邻缩放保持边缘锐利
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_NEAREST)
+        entry = CachedTemplate(image, stamp)
+
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def synthesize(self, color, background, unit):
+        """返回在内存中按 unit 生成的色块模板（颜色均为 BGR），按缩放尺寸分别缓存。"""
+        key = ("synth", tuple(color), tuple(background), unit)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        image = generate_color.make_template(tuple(color)[::-1], tuple(background)[::-1], unit)
+        entry = CachedTemplate(image)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = entry
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+default_cache = TemplateCache()
+
+
+def load_template(path, scale=1.0):
+    """从默认缓存中取模板图像（BGR，只读），失败返回 None。"""
+    entry = default_cache.get(path, scale)
+    return None if entry is None else entry.image
+
+
+def synth_template(color, background, unit):
+    """从默认缓存中取内存生成的色块模板（BGR，只读）。"""
+    return default_cache.synthesize(color, background, unit).image
@@ -0,0 +1,104 @@
+"""测试公共部分：无显示器运行 AutoPainter 所需的替身与合成场景。"""
+import time
+
+import pytest
+
+from benchmarks.synthetic import make_screen, make_template, paint_cell, palette
+from src import color_tackle, generate_color
+from src.auto_paint import auto_painter
+from src.auto_paint.auto_painter import AutoPainter
+from src.auto_paint.capture import FakeCapture
+from src.auto_paint.input import RecordingInput
+from src.palette_lut import load_lut
+
+
+@pytest.fixture(autouse=True)
+def submits(monkeypatch):
+    """屏蔽 ESC 检测与真实的提交按钮点击；返回每次提交时传入的 capture 列表。"""
+    calls = []
+    monkeypatch.setattr(auto_painter, "_esc_pressed", lambda: False)
+    monkeypatch.setattr(color_tackle, "click_submit",
+                        lambda capture=None, input_backend=None: calls.append(capture) or True)
+    return calls
+
+
+@pytest.fixture(scope="session")
+def colors():
+    """只含 black、red 的小调色板 {颜色键: (r, g, b)}，生成查找表只需一两秒。"""
+    return {name: rgb for name, rgb in generate_color.palette_colors().items() if name in ("black", "red")}
+
+
+@pytest.fixture(scope="session")
+def lut_dir(tmp_path_factory):
+    return tmp_path_factory.mktemp("lut")
+
+
+@pytest.fixture(scope="session")
+def lut(colors, lut_dir):
+    return load_lut(colors=colors, directory=lut_dir)
+
+
+@pytest.fixture
+def small_palette(monkeypatch, colors, lut, lut_dir):
+    """让默认调色板（及其查找表缓存目录）变为 colors，用于不显式传入 colors 的代码路径。"""
+    monkeypatch.setattr(generate_color, "palette_colors", lambda: dict(colors))
+    monkeypatch.setattr(generate_color, "PIXELS_DIR", str(lut_dir))
+    return colors
+
+
+class ScenePainter(AutoPainter):
+    """直接使用内存中的模板，不读模板文件。"""
+
+    def __init__(self, template, **kwargs):
+        kwargs.setdefault("use_gui", False)
+        super().__init__(**kwargs)
+        self._template = template
+
+    def _load_target_image(self, path):
+        return self._template
+
+
+class Scene:
+    """一帧合成屏幕：点击目标色块后把该格涂成背景色，模拟绘制效果。
+
+    hits: 点在仍未绘制的目标上的次数；misses: 其余点击（误点或重复点击）
+    """
+
+    def __init__(self, width=480, height=360, density=0.1, clutter=0.0, background=None,
+                 color="black", seed=0, capture_cls=FakeCapture):
+        self.screen, targets = make_screen(width, height, density, (color,), background,
+                                           clutter=clutter, seed=seed)
+        self.targets = targets[color]
+        self.background = background
+        self.color = palette([color])[color]
+        self.template = make_template(color)
+        self.capture = capture_cls([self.screen])
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def total(self):
+        return len(self.targets)
+
+    def on_click(self, x, y):
+        if tuple(self.screen[y, x]) == self.color:
+            self.hits += 1
+        else:
+            self.misses += 1
+        paint_cell(self.screen, x, y, self.background)
+
+    def painter(self, **kwargs):
+        kwargs.setdefault("input_backend", RecordingInput(on_click=self.on_click))
+        return ScenePainter(self.template, capture=self.capture, **kwargs)
+
+    def paint(self, time_limit=15.0, **kwargs):
+        """运行 AutoPainter.run 直到全部目标被点中或超时，返回 painter。"""
+        painter = self.painter(**kwargs)
+        deadline = time.monotonic() + time_limit
+        painter.run(lambda: "synthetic", lambda: self.hits < self.total and time.monotonic() < deadline)
+        return painter
+
+
+@pytest.fixture
+def scene():
+    return Scene
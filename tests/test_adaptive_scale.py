@@ -0,0 +1,43 @@
+"""按帧中推断的缩放在内存中生成模板。"""
+import cv2
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import make_screen, make_template
+from src.auto_paint import lattice as lattice_module
+from src.auto_paint.auto_painter import AutoPainter
+from src.auto_paint.lattice import Lattice
+
+
+@pytest.mark.parametrize("density", (0.01, 0.03))
+def test_sparse_screen_keeps_matching_at_native_zoom(density):
+    screen, targets = make_screen(1920, 1080, density)
+    template = make_template()
+    painter = AutoPainter(use_gui=False, adaptive_scale=True)
+    scaled = painter._scaled_template(screen, template)
+    assert scaled.shape == template.shape
+    assert len(painter._get_matches(screen, scaled)) == len(targets["black"])
+
+
+def test_scaled_template_follows_zoom():
+    screen, targets = make_screen(1920, 1080, 0.03)
+    screen = cv2.resize(screen, None, fx=0.625, fy=0.625, interpolation=cv2.INTER_NEAREST)
+    painter = AutoPainter(use_gui=False, adaptive_scale=True)
+    scaled = painter._scaled_template(screen, make_template())
+    assert scaled.shape[:2] == (15, 15)
+    assert len(painter._get_matches(screen, scaled)) == len(targets["black"])
+
+
+@pytest.mark.parametrize("bad", (Lattice(8.0, 24.0, 4.0, 12.0), Lattice(9.0, 9.0, 4.0, 4.0)))
+def test_unverified_lattice_keeps_stored_template(monkeypatch, bad):
+    screen, _ = make_screen(960, 540, 0.02)
+    template = make_template()
+    monkeypatch.setattr(lattice_module, "estimate_lattice", lambda frame: bad)
+    painter = AutoPainter(use_gui=False, adaptive_scale=True)
+    assert painter._scaled_template(screen, template) is template
+
+
+def test_empty_screen_keeps_stored_template():
+    screen = np.full((540, 960, 3), 255, dtype=np.uint8)
+    template = make_template()
+    assert AutoPainter(use_gui=False, adaptive_scale=True)._scaled_template(screen, template) is template
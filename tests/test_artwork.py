@@ -0,0 +1,62 @@
+"""按图稿绘制。"""
+import numpy as np
+import pytest
+
+from src.auto_paint.artwork import ArtworkPlan
+from src.auto_paint.auto_painter import AutoPainter
+from src.auto_paint.capture import FakeCapture
+from src.auto_paint.input import RecordingInput
+
+
+def _artwork(colors):
+    image = np.empty((6, 6, 3), dtype=np.uint8)
+    image[:, :3] = colors["black"][::-1]
+    image[:, 3:] = colors["red"][::-1]
+    return image
+
+
+def _paint(plan, colors, capsys, select=True, names=None):
+    frame = np.full((240, 320, 3), 255, dtype=np.uint8)
+    # 没有 select_color 时 wplace 中选中的是 black
+    current = {"name": "black"}
+
+    def on_click(x, y):
+        frame[y, x] = colors[current["name"]][::-1]
+
+    inp = RecordingInput(on_click=on_click)
+    painter = AutoPainter(capture=FakeCapture([frame]), input_backend=inp, use_gui=False)
+    painter.unmatched_threshold = 3
+    select_color = (lambda name: current.update(name=name)) if select else None
+    painter.run_artwork(plan, lambda: True, select_color=select_color, names=names)
+    return inp, capsys.readouterr().out
+
+
+def test_artwork_paints_every_pixel(colors, lut, capsys):
+    plan = ArtworkPlan.from_image(_artwork(colors), (40, 40), pitch=4, colors=colors, lut=lut)
+    assert plan.counts() == {"black": 18, "red": 18}
+    inp, out = _paint(plan, colors, capsys)
+    assert inp.click_count == 36
+    assert "图稿已全部绘制完成" in out
+
+
+def test_offscreen_artwork_is_not_reported_done(colors, lut, capsys):
+    plan = ArtworkPlan.from_image(_artwork(colors), (5000, 5000), pitch=4, colors=colors, lut=lut)
+    inp, out = _paint(plan, colors, capsys)
+    assert inp.click_count == 0
+    assert "图稿已全部绘制完成" not in out
+
+
+def test_multicolor_artwork_requires_select_color(colors, lut):
+    plan = ArtworkPlan.from_image(_artwork(colors), (40, 40), pitch=4, colors=colors, lut=lut)
+    painter = AutoPainter(capture=FakeCapture([np.zeros((8, 8, 3), np.uint8)]),
+                          input_backend=RecordingInput(), use_gui=False)
+    with pytest.raises(ValueError):
+        painter.run_artwork(plan, lambda: True)
+    assert painter.input_backend.click_count == 0
+
+
+def test_single_color_without_select_color(colors, lut, capsys):
+    plan = ArtworkPlan.from_image(_artwork(colors), (40, 40), pitch=4, colors=colors, lut=lut)
+    inp, out = _paint(plan, colors, capsys, select=False, names=["black"])
+    assert inp.click_count == 18
+    assert "图稿已全部绘制完成" in out
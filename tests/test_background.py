@@ -0,0 +1,73 @@
+"""从实时画面估计背景色。"""
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import make_screen, make_template
+from src.auto_paint.background import BackgroundTracker, dominant_color
+
+STALE = (200, 210, 220)
+
+
+def test_dominant_color_picks_exact_mode_within_bucket():
+    pixels = np.array([[10, 20, 30]] * 5 + [[11, 20, 30]] * 3 + [[200, 0, 0]] * 4, dtype=np.uint8)
+    color, share = dominant_color(pixels)
+    assert color == (10, 20, 30)
+    assert share == pytest.approx(8 / 12)
+
+
+def test_dominant_color_of_nothing():
+    assert dominant_color(np.empty((0, 3), dtype=np.uint8)) == (None, 0.0)
+
+
+def test_estimate_reads_background_around_targets():
+    frame, _ = make_screen(480, 360, 0.1, background=STALE, clutter=0.2, seed=1)
+    background, share = BackgroundTracker().estimate(frame, make_template())
+    assert background == STALE[::-1]
+    assert share > 0.9
+
+
+def test_estimate_without_candidates():
+    frame, _ = make_screen(480, 360, 0.0, background=STALE)
+    tracker = BackgroundTracker()
+    assert tracker.estimate(frame, make_template()) == (None, 0.0)
+    assert not tracker.update(frame, make_template())
+    assert tracker.background is None
+
+
+def test_update_regenerates_template_for_new_background():
+    frame, _ = make_screen(480, 360, 0.1, background=STALE, seed=1)
+    template = make_template()
+    tracker = BackgroundTracker()
+    assert tracker.apply(template) is template
+    assert tracker.update(frame, template)
+    assert np.array_equal(tracker.apply(template), make_template(background=STALE))
+    # 新模板的背景已与画面一致
+    assert not tracker.update(frame, tracker.apply(template))
+
+
+def test_matching_background_is_not_drift():
+    frame, _ = make_screen(480, 360, 0.1, seed=1)
+    tracker = BackgroundTracker()
+    assert not tracker.update(frame, make_template())
+    assert tracker.background is None
+
+
+def test_update_rechecks_every_few_misses():
+    frame, _ = make_screen(480, 360, 0.1, background=STALE, seed=1)
+    tracker = BackgroundTracker(recheck=10)
+    for misses in range(1, 22):
+        tracker.update(frame, make_template(), misses)
+    assert tracker.estimates == 3
+
+
+def test_low_share_is_not_trusted():
+    frame, _ = make_screen(480, 360, 0.1, background=STALE, seed=1)
+    tracker = BackgroundTracker(min_share=1.01)
+    assert not tracker.update(frame, make_template())
+
+
+@pytest.mark.parametrize("pipeline", (False, True))
+def test_auto_background_recovers_from_stale_background(scene, pipeline):
+    s = scene(background=STALE)
+    s.paint(engine="grid", batch_size=8, auto_background=True, pipeline=pipeline)
+    assert s.hits == s.total
@@ -0,0 +1,49 @@
+"""每帧批量点击。"""
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import make_screen, make_template
+from src.auto_paint.auto_painter import AutoPainter
+from src.auto_paint.capture import FakeCapture
+from src.auto_paint.input import RecordingInput
+
+
+@pytest.mark.parametrize("order", ("row", "serpentine", "nearest"))
+@pytest.mark.parametrize("verify", (True, False))
+def test_batch_mode_clicks_several_targets_per_frame(scene, order, verify):
+    s = scene()
+    painter = s.paint(engine="grid", batch_size=8, batch_verify=verify, order=order)
+    assert s.hits == s.total
+    assert s.misses == 0
+    assert painter.metrics.frame_count < s.total
+
+
+@pytest.mark.parametrize("verify, clicks", ((True, 1), (False, 8)))
+def test_batch_verify_stops_when_view_changes(verify, clicks):
+    screen, _ = make_screen(480, 360, 0.3)
+    capture = FakeCapture([screen])
+
+    def open_popup(x, y):
+        # 第一次点击后弹出的窗口盖住了整个画布
+        capture.frames[0] = np.full_like(screen, 64)
+
+    painter = AutoPainter(capture=capture, input_backend=RecordingInput(on_click=open_popup),
+                          use_gui=False, engine="grid", batch_size=8, batch_verify=verify)
+    template = make_template()
+    frame = painter._screenshot()
+    matches = painter._get_matches(frame, template)
+    painter._run_click_plan(frame, matches, template.shape[:2], lambda: True)
+    assert painter.input_backend.click_count == clicks
+
+
+def test_clicks_are_mapped_through_region_and_offset():
+    screen, targets = make_screen(480, 360, 0.3)
+    capture = FakeCapture([screen], region=(48, 24, 240, 192))
+    painter = AutoPainter(capture=capture, input_backend=RecordingInput(), use_gui=False,
+                          engine="grid", batch_size=100, click_offset_x=1, click_offset_y=-2)
+    template = make_template()
+    frame = painter._screenshot()
+    painter._run_click_plan(frame, painter._get_matches(frame, template), template.shape[:2], lambda: True)
+    clicked = {(x, y) for _, x, y in painter.input_backend.clicks}
+    inside = [(x, y) for x, y in targets["black"].tolist() if 48 <= x <= 264 and 24 <= y <= 192]
+    assert clicked == {(x + 12 + 1, y + 12 - 2) for x, y in inside}
@@ -0,0 +1,114 @@
+"""charge 预算。"""
+import time
+
+import pytest
+
+from src.auto_paint.budget import ChargeBudget
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_spend_and_regenerate(clock):
+    budget = ChargeBudget(3, max_charges=5, regen_seconds=10, clock=clock, sleep=clock.sleep)
+    assert budget.available() == 3
+    budget.spend(2)
+    assert budget.available() == 1
+    assert budget.pending == 2
+    clock.now += 25
+    assert budget.available() == 3
+    # 恢复不超过上限
+    clock.now += 1000
+    assert budget.available() == 5
+
+
+def test_overspending_does_not_go_negative(clock):
+    budget = ChargeBudget(1, regen_seconds=10, clock=clock)
+    budget.spend(3)
+    assert budget.available() == 0
+    assert budget.pending == 3
+    assert budget.time_until(1) == pytest.approx(10)
+
+
+def test_time_until_is_capped_at_max_charges(clock):
+    budget = ChargeBudget(0, max_charges=4, regen_seconds=2, clock=clock)
+    assert budget.time_until(2) == pytest.approx(4)
+    assert budget.time_until(100) == pytest.approx(8)
+    clock.now += 3
+    assert budget.time_until(2) == pytest.approx(1)
+    assert budget.time_until(1) == 0
+
+
+def test_resume_at_defaults_to_max_charges():
+    assert ChargeBudget(2, max_charges=10).resume_at == 10
+    assert ChargeBudget(2, max_charges=10, resume_at=4).resume_at == 4
+    assert ChargeBudget(2, max_charges=10, resume_at=40).resume_at == 10
+
+
+def test_mark_submitted_clears_pending(clock):
+    budget = ChargeBudget(5, clock=clock)
+    budget.spend()
+    budget.spend()
+    budget.mark_submitted()
+    assert budget.pending == 0
+    assert budget.available() == 3
+
+
+def test_budget_submits_and_waits_when_charges_run_out(scene, submits):
+    s = scene(density=0.05)
+    budget = ChargeBudget(5, regen_seconds=0.05)
+    s.paint(engine="grid", batch_size=8, batch_verify=False, budget=budget)
+    assert s.hits == s.total
+    assert len(submits) >= s.total // 5 - 1
+    assert budget.pending <= 5
+
+
+def test_budget_confirms_done_after_few_frames(scene, submits):
+    s = scene(density=0.0)
+    painter = s.painter(budget=ChargeBudget(10, confirm_frames=2))
+    painter.run(lambda: "synthetic", lambda: True)
+    assert painter.metrics.frame_count == 3
+    # 没有点击过，不需要提交
+    assert submits == []
+
+
+class SkewedTime:
+    """sleep 不真正等待而是把 monotonic 拨快，用于跳过 charge 恢复等待。"""
+
+    def __init__(self):
+        self.offset = 0.0
+
+    def monotonic(self):
+        return time.monotonic() + self.offset
+
+    def sleep(self, seconds):
+        self.offset += seconds
+        time.sleep(0.001)
+
+
+def test_pipeline_drops_frames_captured_before_recharge(scene, monkeypatch):
+    from src.auto_paint import auto_painter, pipeline
+
+    skewed = SkewedTime()
+    monkeypatch.setattr(auto_painter, "time", skewed)
+    monkeypatch.setattr(pipeline, "time", skewed)
+    s = scene()
+    budget = ChargeBudget(5, regen_seconds=1.3, clock=skewed.monotonic)
+    s.paint(engine="grid", pipeline=True, batch_size=8, budget=budget)
+    assert s.hits == s.total
+    assert s.misses == 0
@@ -0,0 +1,53 @@
+"""截图后端。"""
+import numpy as np
+import pytest
+
+from src.auto_paint.capture import FakeCapture, create_capture
+
+
+@pytest.fixture
+def frames():
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, (60, 80, 3), dtype=np.uint8) for _ in range(3)]
+
+
+def test_grab_reuses_buffer(frames):
+    capture = FakeCapture(frames)
+    first = capture.grab()
+    assert np.array_equal(first, frames[0])
+    second = capture.grab()
+    assert second is first
+    assert np.array_equal(second, frames[1])
+
+
+def test_region_crops_and_sets_offset(frames):
+    capture = FakeCapture(frames, region=(10, 5, 30, 20))
+    assert capture.offset == (10, 5)
+    assert np.array_equal(capture.grab(), frames[0][5:25, 10:40])
+    capture.set_region(None)
+    assert capture.offset == (0, 0)
+    assert capture.grab().shape == (60, 80, 3)
+
+
+def test_replay_holds_last_frame_or_loops(frames):
+    held = FakeCapture(frames)
+    looped = FakeCapture(frames, loop=True)
+    for _ in range(4):
+        held.grab()
+        looped.grab()
+    assert np.array_equal(held.grab(), frames[2])
+    assert np.array_equal(looped.grab(), frames[1])
+    assert held.grab_count == 5
+
+
+def test_grab_patch_reads_current_frame_without_advancing(frames):
+    capture = FakeCapture(frames, region=(10, 5, 30, 20))
+    frame = capture.grab().copy()
+    patch = capture.grab_patch(4, 3, 6, 2)
+    assert np.array_equal(patch, frame[3:5, 4:10])
+    assert capture.index == 1
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_capture("nope")
@@ -0,0 +1,115 @@
+"""命令行入口。"""
+import json
+
+import cv2
+import numpy as np
+import pytest
+
+from src import cli
+
+
+@pytest.fixture
+def artwork(tmp_path, small_palette):
+    image = np.empty((4, 4, 3), dtype=np.uint8)
+    image[:, :2] = small_palette["black"][::-1]
+    image[:, 2:] = small_palette["red"][::-1]
+    path = tmp_path / "art.png"
+    cv2.imwrite(str(path), image)
+    return str(path)
+
+
+@pytest.fixture
+def no_backends(monkeypatch):
+    """参数检查应在创建截图与输入后端之前完成。"""
+    def fail(options):
+        raise AssertionError("make_painter 不应被调用")
+
+    monkeypatch.setattr(cli, "make_painter", fail)
+
+
+def test_multicolor_artwork_needs_color(artwork, no_backends):
+    with pytest.raises(SystemExit, match="--color"):
+        cli.main(["--artwork", artwork, "--anchor", "40,40"])
+
+
+def test_artwork_color_must_be_in_artwork(artwork, no_backends):
+    with pytest.raises(SystemExit, match="没有颜色"):
+        cli.main(["--artwork", artwork, "--anchor", "40,40", "--color", "white"])
+
+
+def test_artwork_paints_selected_color(artwork, monkeypatch):
+    calls = []
+
+    class Painter:
+        recorder = None
+        metrics = type("Metrics", (), {"status_line": lambda self: ""})()
+
+        def run_artwork(self, plan, running, names=None):
+            calls.append((plan.counts(), names))
+
+    monkeypatch.setattr(cli, "make_painter", lambda options: Painter())
+    assert cli.main(["--artwork", artwork, "--anchor", "40,40", "--color", "red"]) == 0
+    assert calls == [({"black": 8, "red": 8}, ["red"])]
+
+
+@pytest.mark.parametrize("colors", ("black,red", "all", ["black", "red"]))
+def test_several_palette_colors_are_rejected(colors, no_backends):
+    with pytest.raises(SystemExit, match="--colors"):
+        cli.parse_colors({"colors": colors})
+    if isinstance(colors, str):
+        with pytest.raises(SystemExit, match="--colors"):
+            cli.main(["--colors", colors])
+
+
+@pytest.mark.parametrize("colors", ("red", " red ", ["red"]))
+def test_single_palette_color_is_accepted(colors):
+    assert cli.parse_colors({"colors": colors}) == ["red"]
+
+
+@pytest.fixture
+def config(tmp_path):
+    def write(data):
+        path = tmp_path / "painter.json"
+        path.write_text(json.dumps(data), encoding="utf-8")
+        return str(path)
+    return write
+
+
+def test_options_default_without_config():
+    assert cli.load_options([]) == cli.DEFAULTS
+
+
+def test_config_overrides_defaults(config):
+    options = cli.load_options(["--config", config({"threshold": 0.9, "batch_size": 4, "pipeline": True})])
+    assert options["threshold"] == 0.9
+    assert options["batch_size"] == 4
+    assert options["pipeline"] is True
+    assert options["engine"] == cli.DEFAULTS["engine"]
+
+
+def test_command_line_overrides_config(config):
+    path = config({"threshold": 0.9, "batch_size": 4, "engine": "lattice"})
+    options = cli.load_options(["--config", path, "--batch-size", "16", "--engine", "grid"])
+    assert options["batch_size"] == 16
+    assert options["engine"] == "grid"
+    assert options["threshold"] == 0.9
+
+
+def test_absent_flags_keep_config_values(config):
+    # 命令行没有给出开关时，不能用 argparse 的默认值覆盖配置文件
+    options = cli.load_options(["--config", config({"batch_verify": False, "incremental": True})])
+    assert options["batch_verify"] is False
+    assert options["incremental"] is True
+    options = cli.load_options(["--config", config({"batch_verify": True}), "--no-batch-verify"])
+    assert options["batch_verify"] is False
+
+
+def test_unknown_config_keys_are_rejected(config):
+    with pytest.raises(SystemExit, match="batchsize"):
+        cli.load_options(["--config", config({"batchsize": 4})])
+
+
+@pytest.mark.parametrize("text", ("1,2,3", "1"))
+def test_malformed_offset_is_rejected(text):
+    with pytest.raises(SystemExit, match="--offset"):
+        cli._ints(text, 2, "offset")
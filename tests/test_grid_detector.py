@@ -0,0 +1,36 @@
+"""精确颜色网格检测器。"""
+import pytest
+
+from benchmarks.synthetic import make_screen, make_template
+from src.auto_paint.grid_detector import GridColorDetector
+
+
+def _points(matches):
+    return set(zip(matches["x"].tolist(), matches["y"].tolist()))
+
+
+@pytest.mark.parametrize("clutter", (0.0, 0.3))
+def test_grid_reports_exact_top_left(scene, clutter):
+    s = scene(width=960, height=540, clutter=clutter, seed=1)
+    found = _points(s.painter(engine="grid")._get_matches(s.screen, s.template))
+    assert found == set(map(tuple, s.targets.tolist()))
+
+
+def test_grid_tolerates_small_color_noise():
+    screen, targets = make_screen(960, 540, 0.1, noise=0.6, seed=2)
+    found = _points(GridColorDetector().detect(screen, make_template(), 0.8))
+    assert found == set(map(tuple, targets["black"].tolist()))
+
+
+def test_grid_ignores_blocks_without_background_ring():
+    screen, _ = make_screen(240, 192, 0.0)
+    # 与模板中央颜色相同但四周不是背景色的色块（例如 UI 元素）
+    screen[24:48, 24:48] = 0
+    assert len(GridColorDetector().detect(screen, make_template(), 0.8)) == 0
+
+
+def test_grid_run_ignores_other_colors(scene):
+    s = scene(clutter=0.3)
+    s.paint(engine="grid", batch_size=16, batch_verify=False)
+    assert s.hits == s.total
+    assert s.misses == 0
@@ -0,0 +1,92 @@
+"""脏块增量匹配。"""
+import cv2
+import pytest
+
+from benchmarks.synthetic import make_screen, make_template, paint_cell
+from src.auto_paint.incremental import IncrementalMatcher
+from src.auto_paint.matches import peaks_from_result
+
+THRESHOLD = 0.8
+
+
+def _match(frame, template, threshold):
+    result = cv2.matchTemplate(frame, template, cv2.TM_CCOEFF_NORMED)
+    return peaks_from_result(result, threshold, template.shape[:2])
+
+
+def _points(matches):
+    return set(zip(matches["x"].tolist(), matches["y"].tolist()))
+
+
+@pytest.fixture
+def screen():
+    frame, targets = make_screen(480, 360, 0.2, colors=("black", "red"), seed=3)
+    return frame, targets
+
+
+def test_unchanged_frame_reuses_matches(screen):
+    frame, targets = screen
+    template = make_template()
+    matcher = IncrementalMatcher(_match)
+    first = matcher.match(frame, template, THRESHOLD)
+    assert matcher.last_dirty == matcher.last_total
+    again = matcher.match(frame.copy(), template, THRESHOLD)
+    assert matcher.last_dirty == 0
+    assert _points(again) == _points(first) == set(map(tuple, targets["black"].tolist()))
+
+
+def test_painted_target_is_dropped(screen):
+    frame, targets = screen
+    template = make_template()
+    matcher = IncrementalMatcher(_match)
+    matcher.match(frame, template, THRESHOLD)
+    x, y = targets["black"][0].tolist()
+    paint_cell(frame, x + 12, y + 12)
+    matches = matcher.match(frame, template, THRESHOLD)
+    assert 0 < matcher.last_dirty < matcher.last_total
+    assert (x, y) not in _points(matches)
+    assert _points(matches) == _points(_match(frame, template, THRESHOLD))
+
+
+def test_new_target_is_found_across_tile_edges():
+    # 格子 (120, 120) 跨越 128 像素分块的边界
+    frame, _ = make_screen(480, 360, 0.0)
+    template = make_template()
+    matcher = IncrementalMatcher(_match)
+    assert not len(matcher.match(frame, template, THRESHOLD))
+    other, _ = make_screen(480, 360, 1.0)
+    frame[120:144, 120:144] = other[120:144, 120:144]
+    matches = matcher.match(frame, template, THRESHOLD)
+    assert matcher.last_dirty < matcher.last_total
+    assert _points(matches) == {(120, 120)}
+
+
+def test_other_colour_change_keeps_old_matches(screen):
+    frame, targets = screen
+    template = make_template()
+    matcher = IncrementalMatcher(_match)
+    matcher.match(frame, template, THRESHOLD)
+    x, y = targets["red"][0].tolist()
+    paint_cell(frame, x + 12, y + 12)
+    matches = matcher.match(frame, template, THRESHOLD)
+    assert _points(matches) == set(map(tuple, targets["black"].tolist()))
+
+
+def test_template_change_matches_full_frame(screen):
+    frame, targets = screen
+    matcher = IncrementalMatcher(_match)
+    matcher.match(frame, make_template(), THRESHOLD)
+    matches = matcher.match(frame, make_template("red"), THRESHOLD)
+    assert matcher.last_dirty == matcher.last_total
+    assert _points(matches) == set(map(tuple, targets["red"].tolist()))
+
+
+def test_mostly_dirty_frame_matches_full_frame(screen):
+    frame, _ = screen
+    template = make_template()
+    matcher = IncrementalMatcher(_match, full_ratio=0.5)
+    matcher.match(frame, template, THRESHOLD)
+    other, targets = make_screen(480, 360, 0.2, seed=4)
+    matches = matcher.match(other, template, THRESHOLD)
+    assert matcher.last_dirty == matcher.last_total
+    assert _points(matches) == set(map(tuple, targets["black"].tolist()))
@@ -0,0 +1,44 @@
+"""像素网格推断与按格采样检测。"""
+import cv2
+import pytest
+
+from benchmarks.synthetic import make_screen, make_template
+from src.auto_paint.lattice import LatticeDetector, estimate_lattice
+
+
+def _points(matches):
+    return set(zip(matches["x"].tolist(), matches["y"].tolist()))
+
+
+@pytest.mark.parametrize("clutter", (0.0, 0.3))
+def test_lattice_engine_reports_exact_top_left(scene, clutter):
+    s = scene(width=960, height=540, clutter=clutter, seed=1)
+    found = _points(s.painter(engine="lattice")._get_matches(s.screen, s.template))
+    assert found == set(map(tuple, s.targets.tolist()))
+
+
+def test_lattice_engine_ignores_other_colors(scene):
+    s = scene(clutter=0.3)
+    s.paint(engine="lattice", batch_size=16, batch_verify=False)
+    assert s.hits == s.total
+    assert s.misses == 0
+
+
+@pytest.mark.parametrize("density", (0.005, 0.01, 0.03, 0.3))
+@pytest.mark.parametrize("seed", (0, 1))
+def test_sparse_screen_infers_cell_pitch(density, seed):
+    screen, targets = make_screen(1920, 1080, density, seed=seed)
+    lattice = estimate_lattice(screen)
+    assert lattice.pitch_x == pytest.approx(24, abs=0.05)
+    assert lattice.pitch_y == pytest.approx(24, abs=0.05)
+    matches = LatticeDetector().detect(screen, make_template(), 0.8)
+    assert len(matches) == len(targets["black"])
+
+
+@pytest.mark.parametrize("scale", (0.6, 0.75, 1.3))
+def test_sparse_screen_infers_fractional_pitch(scale):
+    screen, _ = make_screen(1920, 1080, 0.02, seed=4)
+    screen = cv2.resize(screen, None, fx=scale, fy=scale, interpolation=cv2.INTER_NEAREST)
+    lattice = estimate_lattice(screen)
+    assert lattice.pitch_x == pytest.approx(24 * scale, abs=0.05)
+    assert lattice.pitch_y == pytest.approx(24 * scale, abs=0.05)
@@ -0,0 +1,57 @@
+"""匹配结构化数组与非极大值抑制。"""
+import numpy as np
+import pytest
+
+from src.auto_paint.matches import (MATCH_DTYPE, make_matches, next_row_major, peaks_from_result,
+                                    row_major)
+
+
+def _points(matches):
+    return set(zip(matches["x"].tolist(), matches["y"].tolist()))
+
+
+def test_template_engine_returns_exact_top_left(scene):
+    s = scene(width=960, height=540)
+    matches = s.painter(engine="template")._get_matches(s.screen, s.template)
+    assert matches.dtype == MATCH_DTYPE
+    assert _points(matches) == set(map(tuple, s.targets.tolist()))
+
+
+def test_peaks_keep_stronger_neighbour():
+    result = np.zeros((40, 60), dtype=np.float32)
+    result[2, 2] = 0.85
+    result[2, 16] = 0.95
+    peaks = peaks_from_result(result, 0.8, (24, 24))
+    assert (16, 2) in _points(peaks)
+
+
+def test_peaks_keep_targets_one_window_apart():
+    result = np.zeros((40, 80), dtype=np.float32)
+    result[5, [2, 26, 50]] = 0.9
+    assert _points(peaks_from_result(result, 0.8, (24, 24))) == {(2, 5), (26, 5), (50, 5)}
+
+
+def test_peaks_merge_plateau():
+    result = np.zeros((40, 60), dtype=np.float32)
+    result[5, 22:26] = 0.9
+    peaks = peaks_from_result(result, 0.8, (24, 24))
+    assert _points(peaks) == {(22, 5)}
+
+
+def test_peaks_below_threshold_are_dropped():
+    result = np.full((10, 10), 0.5, dtype=np.float32)
+    assert len(peaks_from_result(result, 0.8, (3, 3))) == 0
+
+
+@pytest.mark.parametrize("last, expected", (
+    (None, 0),
+    ((5, 0), 0),
+    ((20, 0), 1),
+    ((5, 10), 1),
+    ((7, 30), 2),
+    ((50, 30), 0),
+))
+def test_next_row_major_continues_after_last_found(last, expected):
+    matches = row_major(make_matches([40, 10, 0], [30, 0, 30], [1, 1, 1]))
+    assert matches["x"].tolist() == [10, 0, 40]
+    assert next_row_major(matches, last) == expected
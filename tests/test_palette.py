@@ -0,0 +1,70 @@
+"""单次遍历的多颜色分类与 run_palette。"""
+import pytest
+
+from benchmarks.synthetic import make_screen, paint_cell
+from src.auto_paint.auto_painter import AutoPainter
+from src.auto_paint.capture import FakeCapture
+from src.auto_paint.input import RecordingInput
+from src.auto_paint.palette_classifier import PaletteClassifier
+
+
+def _painter(frame, on_click=None, **kwargs):
+    painter = AutoPainter(capture=FakeCapture([frame]), input_backend=RecordingInput(on_click=on_click),
+                          use_gui=False, **kwargs)
+    painter.unmatched_threshold = 2
+    return painter
+
+
+@pytest.fixture
+def screen(small_palette):
+    return make_screen(480, 360, 0.2, ("black", "red"), seed=2)
+
+
+def test_classifier_finds_every_color(screen):
+    frame, targets = screen
+    found = PaletteClassifier().classify(frame, 0.8)
+    for name, expected in targets.items():
+        got = set(zip(found[name]["x"].tolist(), found[name]["y"].tolist()))
+        assert got == set(map(tuple, expected.tolist()))
+
+
+def test_palette_paints_each_color_with_its_swatch(screen, small_palette):
+    frame, targets = screen
+    current = {}
+    wrong = []
+
+    def on_click(x, y):
+        if tuple(frame[y, x][::-1].tolist()) != tuple(small_palette[current["name"]]):
+            wrong.append((x, y))
+        paint_cell(frame, x, y)
+
+    painter = _painter(frame, on_click)
+    painter.run_palette(lambda: None, lambda: True, select_color=lambda name: current.update(name=name))
+    assert wrong == []
+    assert painter.input_backend.click_count == sum(len(t) for t in targets.values())
+
+
+def test_palette_without_select_color_rejects_several_colors(screen):
+    frame, _ = screen
+    painter = _painter(frame)
+    with pytest.raises(ValueError):
+        painter.run_palette(lambda: ["black", "red"], lambda: True)
+    assert painter.input_backend.click_count == 0
+
+
+def test_palette_without_select_color_paints_one_color(screen):
+    frame, targets = screen
+    painter = _painter(frame, lambda x, y: paint_cell(frame, x, y))
+    painter.run_palette(lambda: ["red"], lambda: True)
+    assert painter.input_backend.click_count == len(targets["red"])
+
+
+@pytest.mark.parametrize("order", ("row", "serpentine"))
+def test_palette_clicks_follow_order(small_palette, order):
+    frame, _ = make_screen(120, 72, 1.0, ("black",))
+    painter = _painter(frame, lambda x, y: paint_cell(frame, x, y), order=order)
+    painter.run_palette(lambda: ["black"], lambda: True)
+    cells = [(x // 24, y // 24) for _, x, y in painter.input_backend.clicks]
+    assert [row for _, row in cells] == [0] * 5 + [1] * 5 + [2] * 5
+    second_row = [col for col, _ in cells[5:10]]
+    assert second_row == ([0, 1, 2, 3, 4] if order == "row" else [4, 3, 2, 1, 0])
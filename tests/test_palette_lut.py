@@ -0,0 +1,108 @@
+"""RGB -> 调色板下标查找表。"""
+import os
+
+import numpy as np
+import pytest
+
+from src import generate_color, palette_lut
+from src.palette_lut import build_table, load_lut, palette_hash
+
+
+def _brute_force(pixels, palette):
+    """逐像素计算最近调色板颜色（平方欧氏距离，并列时取下标小的）与最大通道差。"""
+    diff = pixels[:, None, :].astype(np.int32) - palette[None, :, :].astype(np.int32)
+    nearest = (diff * diff).sum(axis=2).argmin(axis=1)
+    return nearest, np.abs(diff[np.arange(len(pixels)), nearest]).max(axis=1)
+
+
+@pytest.fixture
+def pixels():
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, (20000, 3), dtype=np.uint8)
+
+
+def test_full_table_matches_brute_force(lut, pixels):
+    samples = np.concatenate([pixels, lut.palette, np.clip(lut.palette.astype(int) + 3, 0, 255).astype(np.uint8)])
+    indices, distances = lut.classify(samples)
+    nearest, dist = _brute_force(samples, lut.palette)
+    assert np.array_equal(indices, nearest)
+    assert np.array_equal(distances, np.minimum(dist, 255))
+
+
+def test_palette_colors_classify_exactly(lut):
+    indices, distances = lut.classify(lut.palette)
+    assert indices.tolist() == list(range(len(lut.names)))
+    assert not distances.any()
+
+
+def test_tolerance_marks_other_colors(lut):
+    black = lut.palette[lut.names.index("black")].astype(int)
+    samples = np.array([black, black + 2, black + 40], dtype=np.uint8)
+    indices, _ = lut.classify(samples, tolerance=2)
+    assert indices.tolist() == [lut.names.index("black")] * 2 + [255]
+
+
+@pytest.mark.parametrize("bits", (3, 5))
+def test_coarse_table_matches_brute_force_at_bucket_centres(bits):
+    palette = np.array([rgb[::-1] for rgb in generate_color.palette_colors().values()], dtype=np.uint8)
+    table = build_table(palette, bits)
+    shift = 8 - bits
+    lut = palette_lut.PaletteLUT(table, range(len(palette)), palette, bits)
+    levels = (np.arange(1 << bits) << shift) + ((1 << shift) >> 1)
+    centres = np.stack(np.meshgrid(levels, levels, levels, indexing="ij"), axis=-1).reshape(-1, 3).astype(np.uint8)
+    indices, distances = lut.classify(centres)
+    nearest, dist = _brute_force(centres, palette)
+    assert np.array_equal(indices, nearest)
+    assert np.array_equal(distances, dist)
+    # 同一个桶内的像素与桶中心查到同一项
+    assert np.array_equal(lut.lookup(centres - ((1 << shift) >> 1)), lut.lookup(centres))
+
+
+@pytest.mark.parametrize("bits", (0, 9))
+def test_bits_out_of_range_are_rejected(bits):
+    with pytest.raises(ValueError):
+        build_table(np.zeros((1, 3), dtype=np.uint8), bits)
+
+
+def test_palette_hash_depends_on_palette_and_bits():
+    palette = np.array([[0, 0, 0], [255, 255, 255]], dtype=np.uint8)
+    assert palette_hash(palette, 8) == palette_hash(palette.copy(), 8)
+    assert palette_hash(palette, 8) != palette_hash(palette, 5)
+    assert palette_hash(palette, 8) != palette_hash(palette[::-1], 8)
+
+
+def test_cache_file_is_reused(colors, tmp_path, monkeypatch):
+    first = load_lut(bits=4, colors=colors, directory=tmp_path)
+    assert load_lut(bits=4, colors=colors, directory=tmp_path) is first
+    path = tmp_path / f"lut_4_{palette_hash(first.palette, 4)}.npy"
+    assert path.exists()
+
+    # 新进程（内存缓存为空）直接映射已有文件，不再生成
+    monkeypatch.setattr(palette_lut, "_loaded", {})
+
+    def fail(palette, bits):
+        raise AssertionError("不应重新生成查找表")
+
+    monkeypatch.setattr(palette_lut, "build_table", fail)
+    again = load_lut(bits=4, colors=colors, directory=tmp_path)
+    assert isinstance(again.table, np.memmap)
+    assert np.array_equal(again.table, first.table)
+    assert again.names == list(colors)
+
+
+def test_changed_palette_uses_another_cache_file(colors, tmp_path):
+    load_lut(bits=4, colors=colors, directory=tmp_path)
+    fewer = {"black": colors["black"]}
+    lut = load_lut(bits=4, colors=fewer, directory=tmp_path)
+    assert lut.names == ["black"]
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_corrupt_cache_file_is_rebuilt(colors, tmp_path, monkeypatch):
+    monkeypatch.setattr(palette_lut, "_loaded", {})
+    palette = np.array([rgb[::-1] for rgb in colors.values()], dtype=np.uint8)
+    path = tmp_path / f"lut_4_{palette_hash(palette, 4)}.npy"
+    np.save(path, np.zeros(10, dtype=np.uint16))
+    lut = load_lut(bits=4, colors=colors, directory=tmp_path)
+    assert np.array_equal(lut.table, build_table(palette, 4))
+    assert np.load(path).shape == (1 << 12,)
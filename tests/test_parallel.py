@@ -0,0 +1,58 @@
+"""多线程分带模板匹配。"""
+import cv2
+import pytest
+
+from benchmarks.synthetic import make_screen, make_template
+from src.auto_paint.matches import peaks_from_result
+from src.auto_paint.parallel import ParallelMatcher
+
+THRESHOLD = 0.8
+
+
+def _match(frame, template, threshold):
+    result = cv2.matchTemplate(frame, template, cv2.TM_CCOEFF_NORMED)
+    return peaks_from_result(result, threshold, template.shape[:2])
+
+
+def _points(matches):
+    return list(zip(matches["x"].tolist(), matches["y"].tolist()))
+
+
+@pytest.mark.parametrize("bands", (2, 3, 7))
+def test_split_covers_every_row_once(bands):
+    ranges = ParallelMatcher(_match, workers=1, bands=bands).split(360, 24)
+    assert len(ranges) == bands
+    assert ranges[0][0] == 0 and ranges[-1][1] == 360 - 24 + 1
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+
+
+def test_split_limits_bands_to_template_height():
+    matcher = ParallelMatcher(_match, workers=1, bands=8)
+    assert len(matcher.split(60, 24)) == 1
+    assert matcher.split(20, 24) == []
+
+
+@pytest.mark.parametrize("bands", (2, 3, 5))
+@pytest.mark.parametrize("density", (0.3, 1.0))
+def test_targets_on_band_seams_are_found_once(bands, density):
+    frame, targets = make_screen(480, 360, density, seed=8)
+    template = make_template()
+    matcher = ParallelMatcher(_match, workers=2, bands=bands)
+    try:
+        ranges = matcher.split(frame.shape[0], template.shape[0])
+        # 至少有一个目标的左上角与接缝相距不到一个模板高度
+        assert any(abs(y - edge) < 24 for _, y in targets["black"].tolist() for edge, _ in ranges[1:])
+        points = _points(matcher.match(frame, template, THRESHOLD))
+    finally:
+        matcher.close()
+    assert len(points) == len(set(points))
+    assert set(points) == set(_points(_match(frame, template, THRESHOLD)))
+    assert set(points) == set(map(tuple, targets["black"].tolist()))
+
+
+def test_single_band_calls_match_fn_directly():
+    frame, targets = make_screen(240, 48, 0.5, seed=9)
+    matcher = ParallelMatcher(_match, workers=4)
+    points = _points(matcher.match(frame, make_template(), THRESHOLD))
+    assert matcher._pool is None
+    assert set(points) == set(map(tuple, targets["black"].tolist()))
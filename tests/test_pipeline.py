@@ -0,0 +1,140 @@
+"""截图 / 匹配 / 点击 三段流水线。"""
+import itertools
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import make_screen, make_template, paint_cell, palette
+from src.auto_paint.auto_painter import AutoPainter
+from src.auto_paint.capture import FakeCapture
+from src.auto_paint.input import RecordingInput
+from src.auto_paint.matches import make_matches
+from src.auto_paint.pipeline import PaintPipeline, _keys
+
+
+@pytest.mark.parametrize("engine", ("template", "grid", "lattice"))
+def test_pipeline_paints_without_duplicate_clicks(scene, engine):
+    s = scene()
+    s.paint(engine=engine, pipeline=True, batch_size=8)
+    assert s.hits == s.total
+    assert s.misses == 0
+
+
+def test_pipeline_keeps_capture_on_one_thread(scene, submits):
+    threads = set()
+
+    class ThreadCapture(FakeCapture):
+        def grab(self):
+            threads.add(threading.current_thread().name)
+            return super().grab()
+
+    s = scene(density=0.0, capture_cls=ThreadCapture)
+    painter = s.painter(pipeline=True)
+    painter.unmatched_threshold = 3
+    painter.run(lambda: "synthetic", lambda: True)
+    assert len(threads) == 1
+    assert threading.current_thread().name not in threads
+    # 流水线模式下提交不使用截图线程的后端
+    assert submits == [None]
+
+
+@pytest.mark.parametrize("pipeline", (False, True))
+def test_clicks_follow_target_switch(pipeline):
+    screen, targets = make_screen(480, 360, 0.2, ("black", "red"), seed=3)
+    bgr = palette(("black", "red"))
+    state = {"path": "black", "clicks": 0}
+    wrong = []
+
+    def on_click(x, y):
+        if tuple(screen[y, x].tolist()) != bgr[state["path"]]:
+            wrong.append((state["path"], x, y))
+        paint_cell(screen, x, y)
+        state["clicks"] += 1
+        if state["clicks"] == 10:
+            state["path"] = "red"
+
+    class SwitchingPainter(AutoPainter):
+        def _load_target_image(self, path):
+            return make_template(path)
+
+    painter = SwitchingPainter(capture=FakeCapture([screen]), input_backend=RecordingInput(on_click=on_click),
+                               use_gui=False, engine="grid", pipeline=pipeline)
+    painter.unmatched_threshold = 3
+    painter.run(lambda: state["path"], lambda: True)
+    assert wrong == []
+    assert state["clicks"] == 10 + len(targets["red"])
+
+
+def test_pipeline_frames_carry_the_template_of_their_epoch():
+    screen, _ = make_screen(240, 192, 0.2, ("black", "red"), seed=3)
+    templates = {name: make_template(name) for name in ("black", "red")}
+
+    class SwitchingPainter(AutoPainter):
+        def _load_target_image(self, path):
+            return templates[path]
+
+    painter = SwitchingPainter(capture=FakeCapture([screen]), input_backend=RecordingInput(),
+                               use_gui=False, engine="grid")
+    pipe = PaintPipeline(painter)
+    published = {}
+    tagged = []
+    publish, put = pipe._publish, pipe._put
+
+    def record_publish(template):
+        publish(template)
+        published[pipe._current[0]] = template
+
+    def record_put(q, item):
+        if len(item) == 4:
+            tagged.append((item[0], item[3]))
+        return put(q, item)
+
+    pipe._publish, pipe._put = record_publish, record_put
+    switches = itertools.count()
+    deadline = time.monotonic() + 0.5
+    # 每次取路径都切换颜色，让截图线程与主线程的更新尽量交错
+    pipe.run(lambda: ("black", "red")[next(switches) % 2], lambda: time.monotonic() < deadline, lambda: False)
+    assert tagged
+    assert all(published[epoch] is template for epoch, template in tagged)
+
+
+def test_pipeline_reloads_template_after_empty_path(scene):
+    # 目标要多于暂停前已在流水线中的几批，才能看出是否重新加载了模板
+    s = scene(density=0.3)
+    blanks = itertools.count()
+
+    def path():
+        # 第一批点完后暂时没有目标路径，再回到同一路径
+        if s.hits >= 8 and next(blanks) < 3:
+            return ""
+        return "synthetic"
+
+    painter = s.painter(pipeline=True, batch_size=8)
+    deadline = time.monotonic() + 5
+    painter.run(path, lambda: s.hits < s.total and time.monotonic() < deadline)
+    assert s.hits == s.total
+
+
+def _points(matches):
+    return set(zip(matches["x"].tolist(), matches["y"].tolist()))
+
+
+def test_fresh_drops_targets_clicked_after_capture():
+    pipe = PaintPipeline(painter=None, settle=0.5)
+    now = time.monotonic()
+    pipe._clicked[int(_keys(np.array([24]), np.array([48]))[0])] = now
+    matches = make_matches([24, 48], [48, 0], [1.0, 1.0])
+    assert _points(pipe._fresh(matches, now - 0.1)) == {(48, 0)}
+    # settle 内截取的帧仍可能看不到点击效果
+    assert _points(pipe._fresh(matches, now + 0.3)) == {(48, 0)}
+    assert _points(pipe._fresh(matches, now + 1.0)) == {(24, 48), (48, 0)}
+
+
+def test_fresh_forgets_old_clicks():
+    pipe = PaintPipeline(painter=None, settle=0.5)
+    pipe._clicked[int(_keys(np.array([24]), np.array([48]))[0])] = time.monotonic() - 10
+    matches = make_matches([24], [48], [1.0])
+    assert _points(pipe._fresh(matches, time.monotonic() - 20)) == {(24, 48)}
+    assert pipe._clicked == {}
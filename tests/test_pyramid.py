@@ -0,0 +1,59 @@
+"""由粗到细的金字塔模板匹配。"""
+import pytest
+
+from benchmarks.synthetic import make_screen, make_template
+from src.auto_paint.matches import MATCH_DTYPE
+from src.auto_paint.pyramid import PyramidMatcher
+
+THRESHOLD = 0.8
+
+
+def _points(matches):
+    return set(zip(matches["x"].tolist(), matches["y"].tolist()))
+
+
+@pytest.mark.parametrize("levels", (1, 2))
+@pytest.mark.parametrize("clutter", (0.0, 0.1))
+def test_pyramid_matches_full_search(levels, clutter):
+    frame, targets = make_screen(960, 540, 0.1, colors=("black", "red"), clutter=clutter, seed=5)
+    template = make_template()
+    matcher = PyramidMatcher(levels=levels)
+    matches = matcher.match(frame, template, THRESHOLD)
+    assert not matcher.last_fallback
+    assert _points(matches) == _points(PyramidMatcher._full(frame, template, THRESHOLD))
+    assert _points(matches) >= set(map(tuple, targets["black"].tolist()))
+
+
+def test_no_coarse_candidates_falls_back_to_full_search():
+    # 粗匹配阈值放到 1 以上，粗层找不到任何候选
+    frame, targets = make_screen(480, 360, 0.1, seed=6)
+    template = make_template()
+    matcher = PyramidMatcher(levels=1, coarse_ratio=2.0)
+    matches = matcher.match(frame, template, THRESHOLD)
+    assert matcher.last_fallback
+    assert _points(matches) == set(map(tuple, targets["black"].tolist()))
+
+
+def test_fallback_disabled_returns_nothing():
+    frame, _ = make_screen(480, 360, 0.1, seed=6)
+    matcher = PyramidMatcher(levels=1, coarse_ratio=2.0, fallback=False)
+    matches = matcher.match(frame, make_template(), THRESHOLD)
+    assert not matcher.last_fallback
+    assert not len(matches)
+
+
+def test_template_too_small_for_levels_uses_full_search():
+    frame, targets = make_screen(480, 360, 0.1, seed=7)
+    template = make_template()
+    matcher = PyramidMatcher(levels=5)
+    matches = matcher.match(frame, template, THRESHOLD)
+    assert _points(matches) == set(map(tuple, targets["black"].tolist()))
+
+
+def test_empty_screen_has_no_matches():
+    frame, _ = make_screen(480, 360, 0.0)
+    matcher = PyramidMatcher(levels=1)
+    matches = matcher.match(frame, make_template(), THRESHOLD)
+    assert matcher.last_fallback
+    assert not len(matches)
+    assert matches.dtype == MATCH_DTYPE
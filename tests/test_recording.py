@@ -0,0 +1,107 @@
+"""绘制会话的录制与回放。"""
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import make_screen, make_template, paint_cell
+from src.auto_paint.recording import (CLICK, FRAME, SUMMARY, TEMPLATE, FrameLogReader, FrameRecorder,
+                                      ReplayCapture, replay_matches)
+
+
+def _session(count=8):
+    """逐帧涂掉一个目标的帧序列，中间夹一帧不变的和一帧尺寸不同的。"""
+    screen, targets = make_screen(240, 192, 0.3, seed=2)
+    frames = []
+    for i, (x, y) in enumerate(targets["black"][:count].tolist()):
+        frames.append(screen.copy())
+        if i == 2:
+            frames.append(screen.copy())
+        if i == 5:
+            frames.append(make_screen(120, 96, 0.3, seed=3)[0])
+        paint_cell(screen, x + 12, y + 12)
+    frames.append(screen.copy())
+    return frames
+
+
+@pytest.mark.parametrize("keyframe_interval", (300, 3))
+def test_frames_round_trip(tmp_path, keyframe_interval):
+    path = tmp_path / "session.wplog"
+    frames = _session()
+    with FrameRecorder(path, keyframe_interval=keyframe_interval) as recorder:
+        for frame in frames:
+            recorder.frame(frame)
+    assert recorder.frame_count == len(frames)
+
+    replayed = list(FrameLogReader(path).frames())
+    assert len(replayed) == len(frames)
+    # 读出的帧在读取后续帧后保持不变
+    for (meta, got), want in zip(replayed, frames):
+        assert np.array_equal(got, want)
+        assert not got.flags.writeable
+    metas = [meta for meta, _ in replayed]
+    assert metas[0]["key"] and metas[7]["key"]
+    assert metas[3]["box"] is None
+    if keyframe_interval == 300:
+        assert sum(meta["key"] for meta in metas) == 3
+
+
+def test_changed_box_covers_only_the_painted_cell(tmp_path):
+    path = tmp_path / "session.wplog"
+    screen, targets = make_screen(240, 192, 0.3, seed=2)
+    x, y = targets["black"][0].tolist()
+    with FrameRecorder(path) as recorder:
+        recorder.frame(screen)
+        paint_cell(screen, x + 12, y + 12)
+        recorder.frame(screen)
+    _, (meta, _) = FrameLogReader(path).frames()
+    assert meta["box"] == [x + 8, y + 8, 8, 8]
+
+
+def test_templates_clicks_and_summary_round_trip(tmp_path):
+    path = tmp_path / "session.wplog"
+    template = make_template()
+    with FrameRecorder(path) as recorder:
+        recorder.template(template, "black")
+        recorder.click((24, 48), (36, 60))
+        recorder.close({"frames": 0})
+    reader = FrameLogReader(path)
+    [(meta, image)] = reader.templates()
+    assert meta["name"] == "black"
+    assert np.array_equal(image, template)
+    [click] = reader.clicks()
+    assert (click["x"], click["y"], click["screen"]) == (24, 48, [36, 60])
+    assert [kind for kind, _, _ in reader] == [TEMPLATE, CLICK, SUMMARY]
+    assert list(reader)[-1][1] == {"frames": 0}
+
+
+def test_not_a_log_file_is_rejected(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"PNG....")
+    with pytest.raises(ValueError):
+        list(FrameLogReader(path))
+
+
+def test_recorded_run_replays(scene, tmp_path):
+    path = tmp_path / "session.wplog"
+    s = scene()
+    with FrameRecorder(path) as recorder:
+        painter = s.paint(engine="grid", batch_size=8, recorder=recorder)
+    assert s.hits == s.total
+
+    reader = FrameLogReader(path)
+    kinds = [kind for kind, _, _ in reader]
+    assert kinds.count(FRAME) == painter.metrics.frame_count
+    assert len(reader.clicks()) == s.hits
+    results = replay_matches(path, s.painter(engine="grid"))
+    assert len(results) == painter.metrics.frame_count
+    assert {(int(m["x"]), int(m["y"])) for m in results[0][1]} == set(map(tuple, s.targets.tolist()))
+    # 最后一帧截取后点完剩下的目标，运行随即结束
+    last = {(int(m["x"]), int(m["y"])) for m in results[-1][1]}
+    assert last == {(c["x"], c["y"]) for c in reader.clicks()[-len(last):]}
+
+    capture = ReplayCapture(path, region=(24, 24, 120, 96))
+    for _ in range(painter.metrics.frame_count):
+        assert capture.grab().shape == (96, 120, 3)
+    assert not capture.exhausted
+    capture.grab()
+    assert capture.exhausted
+    assert capture.grab_patch(0, 0, 24, 24).shape == (24, 24, 3)
@@ -0,0 +1,21 @@
+"""在 FakeCapture + RecordingInput 上跑完整的 AutoPainter.run。"""
+import pytest
+
+ENGINES = ("template", "grid", "lattice")
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_engine_paints_every_target(scene, engine):
+    s = scene()
+    s.paint(engine=engine)
+    assert s.hits == s.total
+    assert s.misses == 0
+
+
+def test_without_budget_gives_up_after_unmatched_threshold(scene, submits):
+    s = scene(density=0.0)
+    painter = s.painter()
+    painter.unmatched_threshold = 5
+    painter.run(lambda: "synthetic", lambda: True)
+    assert painter.metrics.frame_count == 6
+    assert len(submits) == 1
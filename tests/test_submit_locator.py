@@ -0,0 +1,114 @@
+"""提交按钮定位。"""
+import cv2
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import make_screen
+from src import color_tackle
+from src.auto_paint.capture import FakeCapture
+from src.auto_paint.input import RecordingInput
+from src.color_tackle import SubmitLocator
+
+# 模块导入时取得真实函数，autouse 的 submits 夹具只替换 color_tackle.click_submit
+click_submit = color_tackle.click_submit
+
+
+@pytest.fixture
+def icon(tmp_path):
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, (24, 40, 3), dtype=np.uint8)
+    path = tmp_path / "submit.png"
+    cv2.imwrite(str(path), image)
+    return str(path), image
+
+
+def _screen(image, x, y, scale=1.0):
+    screen, _ = make_screen(640, 480, 0.1, seed=0)
+    if scale != 1.0:
+        image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_NEAREST)
+    height, width = image.shape[:2]
+    screen[y:y + height, x:x + width] = image
+    return screen
+
+
+def test_second_locate_searches_only_around_last_hit(icon):
+    path, image = icon
+    capture = FakeCapture([_screen(image, 500, 420)])
+    locator = SubmitLocator(path)
+    assert locator.locate(capture) == (520, 432)
+    assert locator.last_box == (500, 420, 40, 24)
+    assert locator.locate(capture) == (520, 432)
+    assert (locator.roi_hits, locator.full_searches) == (1, 1)
+    # 局部搜索只截取小块，不再整屏截图
+    assert capture.grab_count == 1
+
+
+def test_moved_button_falls_back_to_full_search(icon):
+    path, image = icon
+    capture = FakeCapture([_screen(image, 500, 420)])
+    locator = SubmitLocator(path)
+    locator.locate(capture)
+    capture.frames[0] = _screen(image, 40, 30)
+    assert locator.locate(capture) == (60, 42)
+    assert (locator.roi_hits, locator.full_searches) == (0, 2)
+    assert locator.last_box == (40, 30, 40, 24)
+
+
+def test_roi_at_screen_edge_is_clipped(icon):
+    path, image = icon
+    capture = FakeCapture([_screen(image, 0, 0)])
+    locator = SubmitLocator(path)
+    assert locator.locate(capture) == (20, 12)
+    assert locator.locate(capture) == (20, 12)
+    assert locator.roi_hits == 1
+
+
+def test_scaled_button_is_found_and_scale_remembered(icon):
+    path, image = icon
+    capture = FakeCapture([_screen(image, 300, 200, scale=1.25)])
+    locator = SubmitLocator(path)
+    assert locator.locate(capture) == (325, 215)
+    assert locator.last_scale == 1.25
+    locator.reset()
+    assert locator.locate(capture) == (325, 215)
+    assert locator.full_searches == 2
+
+
+def test_missing_button_returns_none(icon):
+    path, _ = icon
+    screen, _ = make_screen(640, 480, 0.1, seed=0)
+    locator = SubmitLocator(path)
+    assert locator.locate(FakeCapture([screen])) is None
+    assert locator.last_box is None
+
+
+def test_missing_icon_file_raises(tmp_path):
+    screen, _ = make_screen(640, 480, 0.1, seed=0)
+    with pytest.raises(FileNotFoundError):
+        SubmitLocator(str(tmp_path / "missing.png")).locate(FakeCapture([screen]))
+
+
+def test_region_capture_uses_full_screen_backend(icon):
+    path, image = icon
+    screen = _screen(image, 500, 420)
+    locator = SubmitLocator(path)
+    full = FakeCapture([screen])
+    locator._capture = full
+    region = FakeCapture([screen], region=(0, 0, 320, 240))
+    assert locator.locate(region) == (520, 432)
+    assert locator.locate(region) == (520, 432)
+    assert region.grab_count == 0
+    assert full.grab_count == 1
+
+
+def test_click_submit_clicks_button_center(icon, monkeypatch):
+    path, image = icon
+    monkeypatch.setattr(color_tackle, "default_locator", SubmitLocator(path))
+    backend = RecordingInput()
+    assert click_submit(FakeCapture([_screen(image, 500, 420)]), backend)
+    assert [(x, y) for _, x, y in backend.clicks] == [(520, 432)]
+
+    screen, _ = make_screen(640, 480, 0.1, seed=0)
+    monkeypatch.setattr(color_tackle, "default_locator", SubmitLocator(path))
+    assert not click_submit(FakeCapture([screen]), backend)
+    assert len(backend.clicks) == 1
@@ -0,0 +1,139 @@
+"""模板缓存与调色板图集的失效。"""
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from src import generate_color
+from src.template_cache import TemplateCache
+
+BACKGROUND = (158, 189, 255)
+
+
+@pytest.fixture
+def pixels(tmp_path, monkeypatch):
+    """把模板目录、图集与背景配置都指向临时目录。"""
+    directory = tmp_path / "color"
+    directory.mkdir()
+    monkeypatch.setattr(generate_color, "PIXELS_DIR", directory)
+    monkeypatch.setattr(generate_color, "ATLAS_PATH", directory / "atlas.npy")
+    monkeypatch.setattr(generate_color, "ATLAS_INDEX", directory / "atlas.json")
+    monkeypatch.setattr(generate_color, "BG_CONFIG", directory / "background.json")
+    monkeypatch.setattr(generate_color, "BACKGROUND", BACKGROUND, raising=False)
+    monkeypatch.setattr(generate_color, "GENERATION", 0)
+    monkeypatch.setitem(generate_color._atlas_cache, "stamp", None)
+    monkeypatch.setitem(generate_color._atlas_cache, "atlas", None)
+    return directory
+
+
+def _touch(path, bump):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + bump))
+
+
+def test_file_template_is_cached_until_modified(tmp_path, pixels):
+    path = tmp_path / "custom.png"
+    cv2.imwrite(str(path), generate_color.make_template((0, 0, 0), BACKGROUND))
+    cache = TemplateCache()
+    first = cache.get(path)
+    assert cache.get(path) is first
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert not first.image.flags.writeable
+
+    red = generate_color.make_template((255, 0, 0), BACKGROUND)
+    cv2.imwrite(str(path), red)
+    _touch(path, 10 ** 9)
+    again = cache.get(path)
+    assert again is not first
+    assert np.array_equal(again.image, red)
+
+
+def test_missing_file_returns_none(tmp_path, pixels):
+    assert TemplateCache().get(tmp_path / "missing.png") is None
+
+
+def test_scaled_templates_are_cached_separately(tmp_path, pixels):
+    path = tmp_path / "custom.png"
+    cv2.imwrite(str(path), generate_color.make_template((0, 0, 0), BACKGROUND))
+    cache = TemplateCache()
+    assert cache.get(path).shape == (24, 24, 3)
+    assert cache.get(path, scale=0.5).shape == (12, 12, 3)
+    assert len(cache) == 2
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path, pixels):
+    paths = []
+    for i in range(3):
+        paths.append(tmp_path / f"t{i}.png")
+        cv2.imwrite(str(paths[-1]), generate_color.make_template((i, 0, 0), BACKGROUND))
+    cache = TemplateCache(maxsize=2)
+    first = cache.get(paths[0])
+    cache.get(paths[1])
+    assert cache.get(paths[0]) is first
+    cache.get(paths[2])
+    assert len(cache) == 2
+    # paths[1] 最久未使用，已被淘汰
+    cache.get(paths[1])
+    assert cache.misses == 4
+
+
+def test_atlas_serves_palette_templates(pixels):
+    generate_color.write_atlas(BACKGROUND)
+    entry = TemplateCache().get(pixels / "black.png")
+    assert entry is not None
+    assert np.array_equal(entry.image, generate_color.make_template((0, 0, 0), BACKGROUND))
+    assert entry.stamp[0] == "atlas"
+
+
+def test_atlas_only_applies_under_pixels_dir(tmp_path, pixels):
+    generate_color.write_atlas(BACKGROUND)
+    outside = tmp_path / "black.png"
+    red = generate_color.make_template((255, 0, 0), BACKGROUND)
+    cv2.imwrite(str(outside), red)
+    assert np.array_equal(TemplateCache().get(outside).image, red)
+
+
+def test_new_background_invalidates_atlas_templates(pixels):
+    cache = TemplateCache()
+    generate_color.write_atlas(BACKGROUND)
+    old = cache.get(pixels / "black.png")
+    generate_color.generate_color_by_background((10, 20, 30))
+    new = cache.get(pixels / "black.png")
+    assert new is not old
+    assert np.array_equal(new.image, generate_color.make_template((0, 0, 0), (10, 20, 30)))
+
+
+def test_rewritten_atlas_is_reloaded(pixels):
+    cache = TemplateCache()
+    generate_color.write_atlas(BACKGROUND)
+    old = cache.get(pixels / "black.png")
+    # 换一个 unit 重写图集：背景色不变，但文件大小变化
+    generate_color.write_atlas(BACKGROUND, unit=4)
+    new = cache.get(pixels / "black.png")
+    assert new is not old
+    assert new.shape == (12, 12, 3)
+
+
+def test_stale_atlas_background_falls_back_to_file(pixels):
+    generate_color.write_atlas((10, 20, 30))
+    assert TemplateCache().get(pixels / "black.png") is None
+    cv2.imwrite(str(pixels / "black.png"), generate_color.make_template((0, 0, 0), BACKGROUND))
+    entry = TemplateCache().get(pixels / "black.png")
+    assert entry.stamp[0] != "atlas"
+
+
+def test_load_atlas_reuses_mapping_until_files_change(pixels):
+    assert generate_color.load_atlas() is None
+    generate_color.write_atlas(BACKGROUND)
+    atlas = generate_color.load_atlas()
+    assert generate_color.load_atlas() is atlas
+    assert tuple(atlas.background) == BACKGROUND
+    _touch(generate_color.ATLAS_INDEX, 10 ** 9)
+    assert generate_color.load_atlas() is not atlas
+
+
+def test_corrupt_atlas_is_ignored(pixels):
+    generate_color.write_atlas(BACKGROUND)
+    generate_color.ATLAS_INDEX.write_text("{", encoding="utf-8")
+    assert generate_color.load_atlas() is None